@@ -0,0 +1,118 @@
+import asyncio
+import inspect
+from collections import deque
+
+
+class GameActionQueue:
+    """Runs the actions of each game one at a time, in arrival order.
+
+    ``submit(key, action, *args)`` returns a future with the action's result.
+    Actions of the same game never interleave, even across ``await``s; actions
+    of different games run concurrently.
+
+    A game with nothing queued runs a plain (synchronous) action inline, so
+    the common case costs no task. A worker task is created only when an
+    action awaits, and it drains that game's queue and then exits, so idle
+    games hold nothing. The hangman bot keeps every action synchronous:
+    /status and the automatic next round take a snapshot in the queue and
+    do their Discord calls (member lookups, the announcement) after it, so
+    plays never wait on the network.
+    """
+
+    def __init__(self):
+        self._queues = {}
+        self._workers = set()
+        self.submitted = 0
+        self.queued = 0
+        self.workers = 0
+        self.max_depth = 0
+
+    def submit(self, key, action, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.submitted += 1
+
+        queue = self._queues.get(key)
+        if queue is not None:
+            queue.append((action, args, future))
+            self.queued += 1
+            if len(queue) > self.max_depth:
+                self.max_depth = len(queue)
+            return future
+
+        # Coda vuota: si esegue subito, il worker serve solo se l'azione attende
+        try:
+            result = action(*args)
+        except Exception as e:
+            future.set_exception(e)
+            return future
+        if not inspect.isawaitable(result):
+            future.set_result(result)
+            return future
+
+        queue = self._queues[key] = deque()
+        self.workers += 1
+        task = loop.create_task(self._drain(key, queue, result, future))
+        self._workers.add(task)
+        task.add_done_callback(self._workers.discard)
+        return future
+
+    async def _drain(self, key, queue, pending, future):
+        try:
+            await self._settle(pending, future)
+            while queue:
+                action, args, future = queue.popleft()
+                try:
+                    result = action(*args)
+                except Exception as e:
+                    _resolve(future, exception=e)
+                    continue
+                if inspect.isawaitable(result):
+                    await self._settle(result, future)
+                else:
+                    _resolve(future, result)
+        finally:
+            del self._queues[key]
+            # Azioni arrivate dopo un errore imprevisto: non restano appese
+            for _, _, future in queue:
+                future.cancel()
+
+    @staticmethod
+    async def _settle(awaitable, future):
+        try:
+            result = await awaitable
+        except Exception as e:
+            _resolve(future, exception=e)
+        else:
+            _resolve(future, result)
+
+    async def drain(self, timeout=None):
+        """Wait for every game's queued actions to finish (e.g. before shutdown)."""
+        if self._workers:
+            await asyncio.wait(list(self._workers), timeout=timeout)
+
+    def depth(self, key):
+        queue = self._queues.get(key)
+        return len(queue) if queue is not None else 0
+
+    def __len__(self):
+        """Games with a running worker."""
+        return len(self._queues)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "queued": self.queued,
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "busy_games": len(self._queues),
+        }
+
+
+def _resolve(future, result=None, exception=None):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
@@ -0,0 +1,505 @@
+"""Round analytics: a columnar guess log written by the bot, aggregated offline.
+
+The bot records one row per round start, guess (letter or word, including
+refused ones) and round settlement. Rows are buffered in per-column
+``array`` objects and appended by a WriteBehindWriter, so recording a guess
+costs one typed append per column on the event loop and the file writes
+happen in a worker thread.
+
+On disk every column is its own raw, fixed-width file, so appending a batch
+is one ``write`` per column and readers can map the columns straight into
+NumPy arrays::
+
+    <directory>/schema.json           column names, typecodes, byte order
+    <directory>/00000001/ts.col ...   one segment, at most ``segment_rows`` rows
+
+Columns:
+    ts       time of the event (unix seconds)
+    started  start time of the round (together with ``game`` it identifies the round)
+    game     guild id (channel id when games are per channel)
+    user     player (for ``start``, whoever started the round; 0 if none)
+    kind     index in KINDS
+    outcome  index in OUTCOMES
+    mode     1 in lose-points mode, 0 in lives mode
+    code     letter: code point of the normalized letter; word: length of the guess;
+             start: distinct letters to find; settle: players in the round
+    lives    letter/word: lives left after the guess; start: initial lives;
+             settle: eliminated players
+
+Offline statistics (requires NumPy)::
+
+    python analytics.py hangman_analytics
+    python analytics.py hangman_analytics --players-csv players.csv --rounds-csv rounds.csv
+
+The history is read segment by segment in chunks of ``--chunk`` rows; only
+the per-player, per-round and per-letter totals stay in memory.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+
+from guess_engine import normalize_text
+from persistence import save_json
+
+KINDS = ("start", "letter", "word", "settle")
+OUTCOMES = ("correct", "wrong", "repeated", "win", "eliminated", "wait_turn", "ended", "none")
+START, LETTER, WORD, SETTLE = range(len(KINDS))
+OUTCOME_CODES = {name: code for code, name in enumerate(OUTCOMES)}
+
+COLUMNS = (
+    ("ts", "d"),
+    ("started", "d"),
+    ("game", "q"),
+    ("user", "q"),
+    ("kind", "B"),
+    ("outcome", "B"),
+    ("mode", "B"),
+    ("code", "I"),
+    ("lives", "i"),
+)
+SCHEMA_VERSION = 1
+
+
+def letter_code(letter):
+    """Code point of the letter as the game compares it (accents stripped)."""
+    normalized = normalize_text(letter)
+    return ord(normalized[0]) if normalized else ord(letter)
+
+
+def _segment_name(seq):
+    return f"{seq:08d}"
+
+
+class GuessRecorder:
+    """Column buffers for the analytics rows plus the append-only segment writer.
+
+    ``take_batch`` (event loop) and ``write_batch`` (worker thread) are the
+    ``snapshot`` / ``write`` pair of a WriteBehindWriter. A batch that fails
+    to write is cut back off the column files and retried with the next one.
+    """
+
+    def __init__(self, directory, *, segment_rows=1 << 20, clock=time.time):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self._clock = clock
+        self._columns = self._empty()
+        self._retry = None
+        self._segment = None
+        self._segment_rows = 0
+
+        self.rows = 0
+        self.rows_written = 0
+
+    @staticmethod
+    def _empty():
+        return tuple(array(typecode) for _, typecode in COLUMNS)
+
+    # ---------- recording (event loop) ----------
+
+    def record(self, kind, game, started, user, outcome, mode, code=0, lives=0):
+        ts, started_col, game_col, user_col, kind_col, outcome_col, mode_col, code_col, lives_col = self._columns
+        ts.append(self._clock())
+        started_col.append(started)
+        game_col.append(game)
+        user_col.append(user)
+        kind_col.append(kind)
+        outcome_col.append(OUTCOME_CODES[outcome])
+        mode_col.append(mode)
+        code_col.append(code)
+        lives_col.append(lives)
+        self.rows += 1
+
+    def take_batch(self):
+        batch = self._columns
+        self._columns = self._empty()
+        if self._retry is not None:
+            for retried, column in zip(self._retry, batch):
+                retried.extend(column)
+            batch, self._retry = self._retry, None
+        return batch
+
+    # ---------- files (worker thread) ----------
+
+    def write_batch(self, batch):
+        count = len(batch[0])
+        written = 0
+        offset = 0
+        try:
+            while offset < count:
+                if self._segment is None or self._segment_rows >= self.segment_rows:
+                    self._open_segment()
+                take = min(count - offset, self.segment_rows - self._segment_rows)
+                written += self._append(batch, offset, offset + take)
+                offset += take
+        except BaseException:
+            self._retry = tuple(column[offset:] for column in batch)
+            raise
+        self.rows_written += count
+        return written
+
+    def _append(self, batch, start, stop):
+        segment = os.path.join(self.directory, _segment_name(self._segment))
+        written = 0
+        try:
+            for (name, _), column in zip(COLUMNS, batch):
+                with open(os.path.join(segment, f"{name}.col"), "ab") as f:
+                    written += f.write(column[start:stop].tobytes())
+        except BaseException:
+            # Colonne tutte della stessa lunghezza: si taglia quanto scritto a metà
+            _truncate_segment(segment, self._segment_rows)
+            raise
+        self._segment_rows += stop - start
+        return written
+
+    def _open_segment(self):
+        if self._segment is None:
+            os.makedirs(self.directory, exist_ok=True)
+            schema_path = os.path.join(self.directory, "schema.json")
+            if not os.path.exists(schema_path):
+                save_json(schema_path, {
+                    "version": SCHEMA_VERSION,
+                    "byteorder": sys.byteorder,
+                    "columns": [list(column) for column in COLUMNS],
+                    "kinds": list(KINDS),
+                    "outcomes": list(OUTCOMES),
+                })
+            segments = list_segments(self.directory)
+            if segments:
+                # Si riprende l'ultimo segmento, senza le righe lasciate a metà da un crash
+                self._segment = segments[-1]
+                segment = os.path.join(self.directory, _segment_name(self._segment))
+                self._segment_rows = segment_rows(segment)
+                _truncate_segment(segment, self._segment_rows)
+                if self._segment_rows < self.segment_rows:
+                    return
+        self._segment = (self._segment or 0) + 1
+        self._segment_rows = 0
+        os.makedirs(os.path.join(self.directory, _segment_name(self._segment)), exist_ok=True)
+
+    def stats(self):
+        return {
+            "rows": self.rows,
+            "rows_written": self.rows_written,
+            "pending": len(self._columns[0]) + (len(self._retry[0]) if self._retry is not None else 0),
+            "segment": self._segment,
+        }
+
+
+def list_segments(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name) for name in os.listdir(directory) if name.isdigit())
+
+
+def segment_rows(segment):
+    """Complete rows in a segment: the shortest column wins."""
+    rows = None
+    for name, typecode in COLUMNS:
+        path = os.path.join(segment, f"{name}.col")
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        count = size // array(typecode).itemsize
+        rows = count if rows is None else min(rows, count)
+    return rows or 0
+
+
+def _truncate_segment(segment, rows):
+    for name, typecode in COLUMNS:
+        path = os.path.join(segment, f"{name}.col")
+        size = rows * array(typecode).itemsize
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+
+# ================= OFFLINE STATISTICS =================
+
+def iter_chunks(directory, chunk=1 << 20):
+    """Yield ``{column: ndarray}`` chunks of at most ``chunk`` rows, memory-mapped segment by segment."""
+    import numpy as np
+
+    with open(os.path.join(directory, "schema.json"), encoding="utf-8") as f:
+        schema = json.load(f)
+    order = "<" if schema["byteorder"] == "little" else ">"
+    dtypes = {name: np.dtype(typecode).newbyteorder(order) for name, typecode in schema["columns"]}
+
+    for seq in list_segments(directory):
+        segment = os.path.join(directory, _segment_name(seq))
+        rows = segment_rows(segment)
+        if not rows:
+            continue
+        maps = {
+            name: np.memmap(os.path.join(segment, f"{name}.col"), dtype=dtype, mode="r", shape=(rows,))
+            for name, dtype in dtypes.items()
+        }
+        for start in range(0, rows, chunk):
+            yield {name: np.asarray(column[start:start + chunk]) for name, column in maps.items()}
+        del maps
+
+
+class HistoryStats:
+    """Per-player, per-round and per-letter totals, accumulated one chunk at a time.
+
+    Each chunk is grouped with one sort (``lexsort``) and reduced with
+    ``add.reduceat`` / ``maximum.reduceat``; the partial tables are then
+    merged into the running ones the same way. The work per row is
+    vectorized and memory depends on the number of players and rounds, not
+    on the length of the history.
+
+    Tables are ``(key columns, sums, maxes)``: round keys are
+    ``(game, started)``, with ``started`` kept as its float64 bit pattern.
+    """
+
+    PLAYER_FIELDS = ("letters", "words") + OUTCOMES[:6]
+    ROUND_SUMS = ("guesses", "letters", "words", "wrong", "repeated", "refused", "lose_points_rows")
+    # Dalle righe di inizio e chiusura round
+    ROUND_MAXES = ("started_seen", "solved", "ended", "solve_seconds", "players", "eliminated")
+
+    def __init__(self):
+        import numpy as np
+
+        self.np = np
+        self.rows = 0
+        self.players = self._empty(1, len(self.PLAYER_FIELDS))
+        self.rounds = self._empty(2, len(self.ROUND_SUMS), len(self.ROUND_MAXES))
+        self.letters = self._empty(1, 2)
+
+    def _empty(self, keys, sums, maxes=0):
+        np = self.np
+        return (
+            tuple(np.empty(0, np.int64) for _ in range(keys)),
+            np.empty((0, sums), np.int64),
+            np.empty((0, maxes), np.float64),
+        )
+
+    def _group(self, keys, sums, maxes):
+        """Rows with equal keys -> one row: summed ``sums``, maximum of ``maxes``."""
+        np = self.np
+        if not len(keys[0]):
+            return self._empty(len(keys), sums.shape[1], maxes.shape[1])
+        # lexsort ordina per l'ultima chiave: si passano al contrario
+        order = np.lexsort(keys[::-1])
+        change = np.zeros(len(order), dtype=bool)
+        change[0] = True
+        for key in keys:
+            ordered = key[order]
+            change[1:] |= ordered[1:] != ordered[:-1]
+        starts = np.flatnonzero(change)
+        first = order[starts]
+        return (
+            tuple(key[first] for key in keys),
+            np.add.reduceat(sums[order], starts, axis=0, dtype=np.int64),
+            np.maximum.reduceat(maxes[order], starts, axis=0) if maxes.shape[1] else maxes[first],
+        )
+
+    def _merge(self, *tables):
+        np = self.np
+        keys = tuple(np.concatenate(columns).astype(np.int64) for columns in zip(*(table[0] for table in tables)))
+        sums = np.concatenate([table[1] for table in tables]).astype(np.int64)
+        maxes = np.concatenate([table[2] for table in tables]).astype(np.float64)
+        return self._group(keys, sums, maxes)
+
+    def add(self, c):
+        np = self.np
+        self.rows += len(c["kind"])
+        kind, outcome = c["kind"], c["outcome"]
+        is_letter = kind == LETTER
+        is_word = kind == WORD
+        guess = is_letter | is_word
+        accepted = guess & (outcome <= OUTCOME_CODES["win"])
+        wrong = guess & (outcome == OUTCOME_CODES["wrong"])
+        repeated = guess & (outcome == OUTCOME_CODES["repeated"])
+
+        # Giocatori: tentativi per tipo ed esito
+        played = outcome[guess]
+        flags = np.stack(
+            [is_letter[guess], is_word[guess]] + [played == code for code in range(6)], axis=1
+        )
+        players = self._group((c["user"][guess],), flags, np.empty((len(played), 0), np.float64))
+        self.players = self._merge(self.players, players)
+
+        # Round: somme su tutte le righe, massimi solo sulle righe di inizio e chiusura
+        keys = (c["game"], c["started"].view(np.int64))
+        flags = np.stack((
+            accepted, accepted & is_letter, accepted & is_word, wrong, repeated, guess & ~accepted, c["mode"] > 0
+        ), axis=1)
+        plays = self._group(keys, flags, np.empty((len(kind), 0), np.float64))
+
+        bounds = np.flatnonzero((kind == START) | (kind == SETTLE))
+        bound_kind, bound_outcome = kind[bounds], outcome[bounds]
+        settle = bound_kind == SETTLE
+        solved = settle & (bound_outcome == OUTCOME_CODES["win"])
+        maxes = np.stack((
+            bound_kind == START,
+            solved,
+            settle & ~solved,
+            np.where(solved, c["ts"][bounds] - c["started"][bounds], 0.0),
+            np.where(settle, c["code"][bounds], 0),
+            np.where(settle, c["lives"][bounds], 0),
+        ), axis=1).astype(np.float64)
+        boundaries = self._group(
+            tuple(key[bounds] for key in keys), np.zeros((len(bounds), len(self.ROUND_SUMS)), np.int64), maxes
+        )
+        self.rounds = self._merge(
+            self.rounds,
+            (plays[0], plays[1], np.zeros((len(plays[1]), len(self.ROUND_MAXES)), np.float64)),
+            boundaries
+        )
+
+        # Lettere sprecate: sbagliate o ripetute
+        wasted = is_letter & (wrong | repeated)
+        letters = self._group(
+            (c["code"][wasted],), np.stack((wrong[wasted], repeated[wasted]), axis=1),
+            np.empty((int(wasted.sum()), 0), np.float64)
+        )
+        self.letters = self._merge(self.letters, letters)
+
+    # ---------- report ----------
+
+    def summary(self, top=10):
+        np = self.np
+        _, sums, maxes = self.rounds
+        # Solo round iniziati dentro la storia letta (gli altri sono incompleti)
+        complete = maxes[:, 0] > 0
+        sums, maxes = sums[complete], maxes[complete]
+        guesses = sums[:, 0]
+        wasted = sums[:, 3] + sums[:, 4]
+        settled = (maxes[:, 1] + maxes[:, 2]) > 0
+
+        modes = {}
+        for name, selected in (("lives", sums[:, 6] == 0), ("lose_points", sums[:, 6] > 0)):
+            solved = selected & (maxes[:, 1] > 0)
+            modes[name] = {
+                "rounds": int(selected.sum()),
+                "solved": int(solved.sum()),
+                "ended": int((selected & (maxes[:, 2] > 0)).sum()),
+                "solve_rate": _ratio(solved.sum(), (selected & settled).sum()),
+                "guesses_per_round": _mean(np, guesses[selected]),
+                "median_guesses_per_solved_round": _median(np, guesses[solved]),
+                "wasted_per_round": _mean(np, wasted[selected]),
+                "mean_solve_seconds": _mean(np, maxes[solved, 3]),
+                "median_solve_seconds": _median(np, maxes[solved, 3]),
+                "players_per_round": _mean(np, maxes[selected & settled, 4]),
+            }
+
+        (letters,), letter_counts, _ = self.letters
+        order = np.argsort(-letter_counts.sum(axis=1), kind="stable")[:top]
+        wasted_letters = [
+            {"letter": chr(letters[i]), "wrong": int(letter_counts[i, 0]), "repeated": int(letter_counts[i, 1])}
+            for i in order
+        ]
+
+        (users,), player_counts, _ = self.players
+        order = np.argsort(-player_counts[:, :2].sum(axis=1), kind="stable")[:top]
+        players = [self._player_row(users[i], player_counts[i]) for i in order]
+
+        return {
+            "rows": self.rows,
+            "rounds": int(complete.sum()),
+            "players": len(users),
+            "modes": modes,
+            "wasted_letters": wasted_letters,
+            "top_players": players,
+        }
+
+    def _player_row(self, user, counts):
+        row = {"user": int(user)}
+        row.update((field, int(value)) for field, value in zip(self.PLAYER_FIELDS, counts))
+        accepted = row["correct"] + row["wrong"] + row["repeated"] + row["win"]
+        row["accuracy"] = _ratio(row["correct"] + row["win"], accepted)
+        return row
+
+    def write_players_csv(self, path):
+        import csv
+
+        (users,), counts, _ = self.players
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("user",) + self.PLAYER_FIELDS + ("accuracy",))
+            for user, row in zip(users, counts):
+                player = self._player_row(user, row)
+                writer.writerow([player["user"]] + [player[field] for field in self.PLAYER_FIELDS] + [player["accuracy"]])
+
+    def write_rounds_csv(self, path):
+        import csv
+
+        (games, started), sums, maxes = self.rounds
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("game", "started") + self.ROUND_SUMS + self.ROUND_MAXES)
+            for game, when, row_sums, row_maxes in zip(
+                games.tolist(), started.view(self.np.float64).tolist(), sums.tolist(), maxes.tolist()
+            ):
+                writer.writerow([game, when] + row_sums + row_maxes)
+
+
+def _ratio(part, whole):
+    return round(float(part) / float(whole), 4) if whole else None
+
+
+def _mean(np, values):
+    return round(float(values.mean()), 3) if len(values) else None
+
+
+def _median(np, values):
+    return round(float(np.median(values)), 3) if len(values) else None
+
+
+def print_summary(summary):
+    print(f"{summary['rows']} rows, {summary['rounds']} rounds, {summary['players']} players")
+    for mode, stats in summary["modes"].items():
+        print(f"\n[{mode}]")
+        for key, value in stats.items():
+            print(f"  {key:32} {value}")
+    print("\nMost wasted letters (wrong / repeated):")
+    for row in summary["wasted_letters"]:
+        print(f"  {row['letter']}  {row['wrong']:>8} {row['repeated']:>8}")
+    print("\nMost active players:")
+    for row in summary["top_players"]:
+        print(
+            f"  {row['user']:>20}  letters {row['letters']:>6}  words {row['words']:>5}"
+            f"  wins {row['win']:>5}  accuracy {row['accuracy']}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate the hangman guess log (requires NumPy)")
+    parser.add_argument("directory", nargs="?", default="hangman_analytics")
+    parser.add_argument("--chunk", type=int, default=1 << 20, help="rows per vectorized chunk")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--players-csv", help="write per-player totals to this file")
+    parser.add_argument("--rounds-csv", help="write per-round totals to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("❌ The offline statistics need NumPy: pip install numpy")
+        return 1
+    if not os.path.exists(os.path.join(args.directory, "schema.json")):
+        print(f"❌ No guess log in {args.directory}")
+        return 1
+
+    stats = HistoryStats()
+    started = time.perf_counter()
+    for chunk in iter_chunks(args.directory, args.chunk):
+        stats.add(chunk)
+    summary = stats.summary(args.top)
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+
+    if args.players_csv:
+        stats.write_players_csv(args.players_csv)
+    if args.rounds_csv:
+        stats.write_rounds_csv(args.rounds_csv)
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        print_summary(summary)
+        print(f"\n⏱️ {summary['elapsed_seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,992 @@
+"""Offline load test for both bots.
+
+Drives the real command handlers through fake Discord objects, without a
+gateway connection, and prints a JSON report (latency percentiles per handler,
+ops/sec, persistence writes, peak memory).
+
+    python bench_bots.py --players 50 --rounds 20 --guilds 4 --output bench.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+PHRASES = [
+    ("La vita è bella", "Film"),
+    ("Perché sì", "Risposta"),
+    ("Ciao come stai", "Saluto"),
+    ("Il gatto sul tetto che scotta", "Teatro"),
+    ("Tre civette sul comò", "Filastrocca"),
+    ("Buongiorno principessa", "Citazione"),
+    ("Pizza margherita", "Cibo"),
+    ("Sakura no hana", "Fiori"),
+]
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZÈÉÀÒÙ"
+# Ordine globale delle risposte (FakeResponse.order)
+REPLY_ORDER = itertools.count()
+
+
+# ================= FAKE DISCORD =================
+
+class FakeRole:
+    def __init__(self, role_id, name):
+        self.id = role_id
+        self.name = name
+
+
+class FakeUser:
+    def __init__(self, user_id, name, roles=(), bot=False):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.roles = list(roles)
+        self._roles_by_id = {role.id: role for role in self.roles}
+        self.bot = bot
+
+    def get_role(self, role_id):
+        return self._roles_by_id.get(role_id)
+
+
+class FakeGuild:
+    def __init__(self, guild_id, owner, members=(), fetch_latency=0.0, cached_ratio=1.0, roles=()):
+        self.id = guild_id
+        self.owner_id = owner.id
+        self.roles = list(roles)
+        self.fetch_latency = fetch_latency
+        self.fetches = 0
+        self._members = {m.id: m for m in members}
+        self._members[owner.id] = owner
+        self._cached = {
+            uid for uid in self._members
+            if random.random() < cached_ratio
+        }
+
+    def get_member(self, user_id):
+        if user_id in self._cached:
+            return self._members.get(user_id)
+        return None
+
+    async def fetch_member(self, user_id):
+        self.fetches += 1
+        if self.fetch_latency:
+            await asyncio.sleep(self.fetch_latency)
+        member = self._members.get(user_id)
+        if member is None:
+            raise LookupError(user_id)
+        return member
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+
+
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+        self.deferred = False
+        self.content = None
+        self.embed = None
+        self.ephemeral = False
+        self.order = None
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, content=None, *, embed=None, ephemeral=False, **kwargs):
+        self._done = True
+        self.order = next(REPLY_ORDER)
+        self.content = content
+        self.embed = embed
+        self.ephemeral = ephemeral
+
+    async def defer(self, *, ephemeral=False, thinking=False):
+        self._done = True
+        self.deferred = True
+        self.order = next(REPLY_ORDER)
+        self.ephemeral = ephemeral
+
+    async def edit_message(self, *, embed=None, view=None, **kwargs):
+        self._done = True
+        self.embed = embed
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent = 0
+        self.content = None
+        self.embed = None
+        self.ephemeral = False
+        self.order = None
+
+    async def send(self, content=None, *, embed=None, ephemeral=False, **kwargs):
+        self.sent += 1
+        self.order = next(REPLY_ORDER)
+        self.content = content
+        self.embed = embed
+        self.ephemeral = ephemeral
+
+
+class FakeInteraction:
+    def __init__(self, user, guild, channel):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.channel = channel
+        self.channel_id = channel.id if channel else None
+        self.guild_locale = None
+        self.locale = None
+        self.extras = {}
+        self.deleted = False
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+    async def original_response(self):
+        return None
+
+    async def delete_original_response(self):
+        self.deleted = True
+
+    @property
+    def answer(self):
+        """What the user got: the followup after a defer, otherwise the response."""
+        return self.followup if self.followup.sent else self.response
+
+
+class FakeMessage:
+    def __init__(self, author, content, guild, channel):
+        self.author = author
+        self.content = content
+        self.guild = guild
+        self.channel = channel
+        self._state = None
+
+
+# ================= RECORDING =================
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    async def call(self, name, coro):
+        started = time.perf_counter()
+        await coro
+        self.samples[name].append(time.perf_counter() - started)
+
+    def summary(self):
+        report = {}
+        for name, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            count = len(ordered)
+            total = sum(ordered)
+            report[name] = {
+                "count": count,
+                "mean_us": total / count * 1e6,
+                "p50_us": percentile(ordered, 50) * 1e6,
+                "p90_us": percentile(ordered, 90) * 1e6,
+                "p99_us": percentile(ordered, 99) * 1e6,
+                "max_us": ordered[-1] * 1e6,
+                "ops_per_sec": count / total if total else None,
+            }
+        return report
+
+    @property
+    def total_ops(self):
+        return sum(len(s) for s in self.samples.values())
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ================= SCENARIOS =================
+
+def callback(command):
+    """App commands are ``app_commands.Command`` objects; benchmark their callbacks directly."""
+    return getattr(command, "callback", command)
+
+
+async def run_hangman(args, recorder, workdir):
+    import boia_bot
+    from ranking_store import JsonRankingStore
+
+    boia_bot.data_loaded = True
+    boia_bot.rankings = JsonRankingStore()
+    boia_bot.DATA_FILE = os.path.join(workdir, "hangman_data.json")
+    boia_bot.STATE_FILE = os.path.join(workdir, "hangman_state.json")
+    boia_bot.journal.directory = os.path.join(workdir, "hangman_journal")
+    boia_bot.guess_log.directory = os.path.join(workdir, "hangman_analytics")
+    boia_bot.data_writer.start()
+    boia_bot.state_writer.start()
+    boia_bot.analytics_writer.start()
+
+    start_game = callback(boia_bot.start_game)
+    guess_letter = callback(boia_bot.guess_letter)
+    guess_word = callback(boia_bot.guess_word)
+    status = callback(boia_bot.status)
+    ranking = callback(boia_bot.ranking)
+    end_game = callback(boia_bot.end_game)
+
+    async def play_guild(guild_index):
+        owner = FakeUser(10_000 + guild_index, f"owner{guild_index}")
+        players = [
+            FakeUser(1_000_000 + guild_index * 10_000 + i, f"player{guild_index}-{i}")
+            for i in range(args.players)
+        ]
+        guild = FakeGuild(
+            900 + guild_index, owner, players,
+            fetch_latency=args.fetch_latency, cached_ratio=args.cached_ratio
+        )
+        channel = FakeChannel(5000 + guild_index)
+        rng = random.Random(guild_index)
+
+        def interaction(user):
+            return FakeInteraction(user, guild, channel)
+
+        for _ in range(args.rounds):
+            secret, hint = rng.choice(PHRASES)
+            await recorder.call("start_game", start_game(interaction(owner), secret, hint, args.lives))
+            game = boia_bot.get_game(interaction(owner))
+
+            players_done = asyncio.Event()
+
+            async def player_loop(player):
+                uid = str(player.id)
+                for _ in range(args.max_guesses):
+                    state = game.players.get(uid)
+                    if not game.active or (state is not None and state.eliminated):
+                        break
+                    roll = rng.random()
+                    if roll < 0.02:
+                        guess = secret if rng.random() < 0.3 else "sbagliato"
+                        await recorder.call("guess_word", guess_word(interaction(player), guess))
+                    else:
+                        await recorder.call("guess_letter", guess_letter(interaction(player), rng.choice(ALPHABET)))
+                    await asyncio.sleep(0)
+
+            async def players_phase():
+                await asyncio.gather(*(player_loop(p) for p in players))
+                players_done.set()
+
+            async def owner_loop():
+                while not players_done.is_set():
+                    await recorder.call("status", status(interaction(owner)))
+                    await recorder.call("ranking", ranking(interaction(owner), "daily"))
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(owner_loop(), players_phase())
+            if game.active:
+                await recorder.call("end_game", end_game(interaction(owner)))
+
+        return guild.fetches
+
+    fetches = await asyncio.gather(*(play_guild(i) for i in range(args.guilds)))
+
+    for i in range(args.direct_points):
+        started = time.perf_counter()
+        boia_bot.add_points_to_player(5_000_000 + i % args.players, f"direct{i % args.players}", 1)
+        recorder.samples["add_points_to_player"].append(time.perf_counter() - started)
+
+    burst = await run_guess_burst(args) if args.burst else None
+
+    await boia_bot.data_writer.close()
+    await boia_bot.state_writer.close()
+    await boia_bot.analytics_writer.close()
+    boia_bot.journal.close()
+    return {
+        "persistence": boia_bot.data_writer.stats(),
+        "state_persistence": boia_bot.state_writer.stats(),
+        "journal": {"appends": boia_bot.journal.appends, "bytes_written": boia_bot.journal.bytes_written},
+        "member_fetches": sum(fetches),
+        "member_names": boia_bot.member_names.stats(),
+        "analytics": dict(boia_bot.guess_log.stats(), **boia_bot.analytics_writer.stats()),
+        "burst": burst,
+    }
+
+
+async def run_guess_burst(args):
+    """Thousands of /l and /w landing in the same tick on a few games.
+
+    Every 50th call is an owner /status, whose member lookups (half the
+    members are not cached) run after its snapshot, outside the game's
+    action queue. Checks that every interaction is acknowledged and
+    answered, that no game has more than one winner, and that each game's
+    interactions are acknowledged in submission order.
+    """
+    import boia_bot
+
+    rng = random.Random(args.seed)
+    start_game = callback(boia_bot.start_game)
+    guess_letter = callback(boia_bot.guess_letter)
+    guess_word = callback(boia_bot.guess_word)
+    status = callback(boia_bot.status)
+
+    guilds = []
+    for g in range(args.burst_games):
+        owner = FakeUser(20_000 + g, f"burst-owner{g}")
+        players = [FakeUser(3_000_000 + g * 10_000 + i, f"burst{g}-{i}") for i in range(args.players)]
+        guild = FakeGuild(7000 + g, owner, players, fetch_latency=args.fetch_latency or 0.001, cached_ratio=0.5)
+        channel = FakeChannel(8000 + g)
+        secret, hint = rng.choice(PHRASES)
+        await start_game(FakeInteraction(owner, guild, channel), secret, hint, args.lives)
+        guilds.append((guild, channel, players, secret))
+
+    interactions = []
+    calls = []
+    statuses = 0
+    for i in range(args.burst):
+        guild, channel, players, secret = guilds[i % len(guilds)]
+        if i % 50 == 49:
+            interaction = FakeInteraction(FakeUser(guild.owner_id, "owner"), guild, channel)
+            interactions.append(interaction)
+            calls.append(status(interaction))
+            statuses += 1
+            continue
+        interaction = FakeInteraction(rng.choice(players), guild, channel)
+        interactions.append(interaction)
+        if rng.random() < 0.01:
+            calls.append(guess_word(interaction, secret))
+        else:
+            calls.append(guess_letter(interaction, rng.choice(ALPHABET)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - started
+
+    winners = defaultdict(int)
+    for interaction in interactions:
+        if interaction.answer.embed is not None and interaction.user.id != interaction.guild.owner_id:
+            winners[interaction.guild.id] += 1
+
+    # Conferme di ogni partita nell'ordine di invio: nessuna giocata aspetta un /status
+    order = defaultdict(list)
+    for interaction in interactions:
+        order[interaction.guild.id].append(interaction.response.order)
+
+    return {
+        "guesses": args.burst,
+        "games": len(guilds),
+        "seconds": elapsed,
+        "guesses_per_sec": args.burst / elapsed if elapsed else None,
+        "replied": sum(1 for interaction in interactions if interaction.response.is_done()),
+        "answered": sum(1 for interaction in interactions if interaction.followup.sent or not interaction.response.deferred),
+        "max_winners_per_game": max(winners.values(), default=0),
+        "statuses": statuses,
+        "in_order": all(None not in seq and seq == sorted(seq) for seq in order.values()),
+        "queue": boia_bot.game_actions.stats(),
+    }
+
+
+async def run_ditto(args, recorder):
+    import ditto_bot
+
+    on_message = ditto_bot.on_message
+    turn_on = callback(ditto_bot.turn_on)
+
+    async def chat_guild(guild_index):
+        owner = FakeUser(20_000 + guild_index, f"owner{guild_index}")
+        authors = [FakeUser(2_000_000 + guild_index * 10_000 + i, f"user{guild_index}-{i}") for i in range(args.players)]
+        guild = FakeGuild(1900 + guild_index, owner, authors)
+        channel = FakeChannel(6000 + guild_index)
+        rng = random.Random(guild_index)
+
+        await recorder.call("ditto_on", turn_on(FakeInteraction(owner, guild, channel)))
+        for _ in range(args.messages):
+            author = rng.choice(authors)
+            if rng.random() < 0.5:
+                content = rng.choice(ALPHABET)
+            else:
+                content = "ciao a tutti, come va?"
+            await recorder.call("on_message", on_message(FakeMessage(author, content, guild, channel)))
+        return channel
+
+    channels = await asyncio.gather(*(chat_guild(i) for i in range(args.guilds)))
+    await ditto_bot.outbound.drain()
+    return {
+        "channel_sends": sum(channel.sent for channel in channels),
+        "outbound": ditto_bot.outbound.stats(),
+    }
+
+
+async def run_ditto_traffic(args):
+    """High-traffic server: mostly chatter, other bots and inactive channels.
+
+    Messages are built up front so only dispatch is timed.
+    """
+    import ditto_bot
+
+    on_message = ditto_bot.on_message
+    turn_on = callback(ditto_bot.turn_on)
+    rng = random.Random(args.seed)
+
+    owner = FakeUser(30_000, "traffic-owner")
+    authors = [FakeUser(3_000_000 + i, f"chatter{i}") for i in range(args.players)]
+    other_bot = FakeUser(3_999_999, "otherbot", bot=True)
+    active_guild = FakeGuild(2900, owner, authors)
+    quiet_guild = FakeGuild(2901, owner, authors)
+    channels = [FakeChannel(7000 + i) for i in range(4)]
+    await turn_on(FakeInteraction(owner, active_guild, channels[0]))
+
+    chatter = ["ciao a tutti, come va?", "lol", "ok", "https://example.com/some/long/link", "buongiorno!!"]
+    messages = []
+    for _ in range(args.traffic):
+        roll = rng.random()
+        channel = rng.choice(channels)
+        if roll < 0.1:
+            messages.append(FakeMessage(other_bot, rng.choice(ALPHABET), active_guild, channel))
+        elif roll < 0.3:
+            messages.append(FakeMessage(rng.choice(authors), rng.choice(chatter), quiet_guild, channel))
+        elif roll < 0.4:
+            messages.append(FakeMessage(rng.choice(authors), rng.choice(ALPHABET), active_guild, channel))
+        elif roll < 0.42:
+            messages.append(FakeMessage(rng.choice(authors), f" {rng.choice(ALPHABET)} ", active_guild, channel))
+        else:
+            messages.append(FakeMessage(rng.choice(authors), rng.choice(chatter), active_guild, channel))
+
+    handled_before = sum(ditto_bot.letter_counter.values.values())
+    started = time.perf_counter()
+    for message in messages:
+        await on_message(message)
+    elapsed = time.perf_counter() - started
+    handled = sum(ditto_bot.letter_counter.values.values()) - handled_before
+
+    await ditto_bot.outbound.drain(timeout=10)
+    return {
+        "messages": len(messages),
+        "letters_handled": handled,
+        "filtered": len(messages) - handled,
+        "elapsed_seconds": elapsed,
+        "messages_per_sec": len(messages) / elapsed if elapsed else None,
+        "mean_ns": elapsed / len(messages) * 1e9 if messages else None,
+    }
+
+
+def bench_letter_state(args):
+    """Microbenchmark: letter state during a round and its packed snapshot form."""
+    from letterset import pack_letters, unpack_letters
+    from state import HangmanGame
+
+    rng = random.Random(args.seed)
+    letters = [rng.choice(ALPHABET[:26]) for _ in range(64)]
+    user_ids = [rng.randrange(10**17, 10**18) for _ in range(8)]
+    names = [f"user{i}" for i in range(8)]
+
+    def play_round():
+        # Lo stesso percorso di /l, vite abbastanza per non essere eliminati
+        game = HangmanGame()
+        game.start("Ciao come stai", "", 999)
+        for i, letter in enumerate(letters):
+            game.last_player = None
+            game.guess_letter(names[i % 8], letter)
+        return game
+
+    def claim_dicts():
+        # Formato precedente: un dict per lettera
+        claims = {}
+        for i, letter in enumerate(letters):
+            if letter not in claims:
+                claims[letter] = {"user_id": user_ids[i % 8], "username": names[i % 8]}
+        return claims
+
+    def claim_tuples():
+        # Come ditto_bot.record_letter
+        claims = {}
+        for i, letter in enumerate(letters):
+            if claims.get(letter) is None:
+                claims[letter] = (user_ids[i % 8], names[i % 8])
+        return claims
+
+    def timed(func, repeat=20_000):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat * 1e6
+
+    def footprint(func, count=args.letter_games):
+        tracemalloc_was_on = tracemalloc.is_tracing()
+        if not tracemalloc_was_on:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [func() for _ in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - before
+        if not tracemalloc_was_on:
+            tracemalloc.stop()
+        del kept
+        return used / count
+
+    game = play_round()
+    found, wrong = game.letters_found, game.wrong_letters
+    packed = {"letters_found": pack_letters(found), "wrong_letters": pack_letters(wrong)}
+    assert unpack_letters(packed["letters_found"]) == found
+
+    return {
+        "hangman_round_us": timed(play_round, repeat=2_000),
+        "claims_64_messages_us": {"dicts": timed(claim_dicts), "tuples": timed(claim_tuples)},
+        "claims_bytes_per_game": {"dicts": footprint(claim_dicts), "tuples": footprint(claim_tuples)},
+        "snapshot_letter_bytes": {
+            "lists": len(json.dumps({"letters_found": sorted(found), "wrong_letters": sorted(wrong)})),
+            "packed": len(json.dumps(packed)),
+        },
+        "pack_us": timed(lambda: pack_letters(found)),
+        "unpack_us": timed(lambda: unpack_letters(packed["letters_found"])),
+    }
+
+
+def bench_permissions(args):
+    """Moderator check: the old per-call role-name scan versus PermissionResolver."""
+    from permissions import PermissionResolver
+
+    role_name = "Guardians of Sakura (Moderators)"
+    roles = [FakeRole(900_000 + i, f"Role {i}") for i in range(200)]
+    moderator_role = FakeRole(999_999, role_name)
+    roles.append(moderator_role)
+    owner = FakeUser(1, "owner")
+    moderator = FakeUser(2, "moderator", roles=roles[:15] + [moderator_role])
+    member = FakeUser(3, "member", roles=roles[:15])
+    guild = FakeGuild(4242, owner, [moderator, member], roles=roles)
+    channel = FakeChannel(1)
+    resolver = PermissionResolver(role_names=(role_name,))
+
+    def name_scan(interaction):
+        if interaction.guild is None:
+            return False
+        if interaction.user.id == interaction.guild.owner_id:
+            return True
+        for role in interaction.user.roles:
+            if role.name.lower() == role_name.lower():
+                return True
+        return False
+
+    report = {}
+    n = args.permission_checks
+    for who, user in (("owner", owner), ("moderator", moderator), ("member", member)):
+        interaction = FakeInteraction(user, guild, channel)
+        for variant, check in (("name_scan", name_scan), ("resolver", resolver.is_owner_or_moderator)):
+            assert check(interaction) == (user is not member)
+            started = time.perf_counter()
+            for _ in range(n):
+                check(interaction)
+            report.setdefault(who, {})[f"{variant}_ns"] = (time.perf_counter() - started) / n * 1e9
+    report["resolver"] = resolver.stats()
+    return report
+
+
+def bench_analytics(args):
+    """Guess log: recording cost on the loop, segment writes, and the offline
+    aggregation (NumPy, chunked) against a plain Python loop over the same rows."""
+    from array import array
+
+    from analytics import COLUMNS, LETTER, SETTLE, START, WORD, GuessRecorder, HistoryStats, iter_chunks
+
+    rng = random.Random(args.seed)
+    outcomes = ("correct", "wrong", "repeated", "wrong", "correct", "wait_turn")
+    report = {"rows": args.analytics_rows}
+    with tempfile.TemporaryDirectory() as workdir:
+        log = GuessRecorder(os.path.join(workdir, "analytics"), segment_rows=args.analytics_rows // 4 + 1)
+        plays = [
+            (rng.choice((LETTER, LETTER, LETTER, WORD)), rng.choice(outcomes), ord(rng.choice(ALPHABET)))
+            for _ in range(1024)
+        ]
+        n = args.analytics_rows
+        started = time.perf_counter()
+        round_started = 0.0
+        for i in range(n):
+            game = 900 + i % 50
+            if i % 2000 < 50:
+                round_started = 1_700_000_000.0 + i // 2000
+                log.record(START, game, round_started, 1, "none", i % 3 == 0, 12, 5)
+            elif i % 2000 >= 1950:
+                log.record(SETTLE, game, round_started, 1_000_000 + i % 40, "win", i % 3 == 0, 20, 2)
+            else:
+                kind, outcome, code = plays[i & 1023]
+                log.record(kind, game, round_started, 1_000_000 + i % 997, outcome, i % 3 == 0, code, 3)
+        report["record_ns"] = (time.perf_counter() - started) / n * 1e9
+
+        started = time.perf_counter()
+        written = log.write_batch(log.take_batch())
+        report["write_seconds"] = time.perf_counter() - started
+        report["bytes_per_row"] = written / n
+        report["segments"] = log.stats()["segment"]
+
+        # Riferimento: conteggi per giocatore con un ciclo Python sulle colonne lette con array
+        started = time.perf_counter()
+        per_player = defaultdict(lambda: [0, 0])
+        directory = os.path.join(workdir, "analytics")
+        for segment in sorted(os.listdir(directory)):
+            if not segment.isdigit():
+                continue
+            columns = {}
+            for name, typecode in COLUMNS:
+                if name in ("user", "kind", "outcome"):
+                    column = columns[name] = array(typecode)
+                    with open(os.path.join(directory, segment, f"{name}.col"), "rb") as f:
+                        column.frombytes(f.read())
+            for user, kind, outcome in zip(columns["user"], columns["kind"], columns["outcome"]):
+                if kind == LETTER or kind == WORD:
+                    counts = per_player[user]
+                    counts[0] += 1
+                    counts[1] += outcome == 1
+        report["python_loop_seconds"] = time.perf_counter() - started
+
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            report["numpy"] = None
+            return report
+        started = time.perf_counter()
+        stats = HistoryStats()
+        for chunk in iter_chunks(directory, args.analytics_chunk):
+            stats.add(chunk)
+        summary = stats.summary()
+        report["numpy_seconds"] = time.perf_counter() - started
+        report["numpy_rows_per_sec"] = n / report["numpy_seconds"]
+        report["rounds"] = summary["rounds"]
+        report["players"] = summary["players"]
+        counts = dict(zip(stats.players[0].tolist(), stats.players[1][:, :2].sum(axis=1).tolist()))
+        assert counts == {user: value[0] for user, value in per_player.items()}
+    return report
+
+
+def bench_word_bank(args):
+    """Word bank: compile once, then open and draw at two bank sizes (draws should not grow with the bank)."""
+    from word_bank import RecentWindow, WordBank, compile_bank
+
+    rng = random.Random(args.seed)
+    syllables = ("ca", "so", "la", "me", "ti", "ro", "bu", "zo", "ne", "vi", "qu", "fa", "gi", "pe")
+    report = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (args.bank_entries // 10, args.bank_entries):
+            source = os.path.join(workdir, f"bank{size}.tsv")
+            with open(source, "w", encoding="utf-8") as f:
+                for i in range(size):
+                    words = " ".join(
+                        "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+                        for _ in range(rng.randint(1, 4))
+                    )
+                    f.write(f"{words}\thint {i}\t{rng.choice(('it', 'en', 'es'))}\n")
+
+            started = time.perf_counter()
+            compile_bank(source, source + ".idx")
+            compile_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            bank = WordBank(source + ".idx")
+            open_seconds = time.perf_counter() - started
+
+            recent = RecentWindow()
+            draws = 50_000
+            started = time.perf_counter()
+            for _ in range(draws):
+                entry = bank.draw(recent, rng=rng, difficulty="medium", language="it")
+                bank.entry(entry)
+                recent.add(entry, 200)
+            report[str(size)] = {
+                "compile_seconds": compile_seconds,
+                "open_ms": open_seconds * 1000,
+                "draw_us": (time.perf_counter() - started) / draws * 1e6,
+                "index_bytes": os.path.getsize(source + ".idx"),
+                **bank.stats(),
+            }
+            bank.close()
+    return report
+
+
+def bench_ranking_io(args):
+    """Ranking export/import pipelines: rows per second, traced memory above the
+    store itself and the longest single chunk (how long one step holds the
+    event loop), for both ranking stores."""
+    import ranking_io
+    from ranking_store import JsonRankingStore, SQLiteRankingStore
+
+    rng = random.Random(args.seed)
+    n = args.ranking_players
+    deltas = {str(10 ** 17 + i): [f"player{i}", rng.randrange(10_000)] for i in range(n)}
+
+    def timed_chunks(chunks, steps):
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            steps.append(time.perf_counter() - started)
+            if chunk is None:
+                return
+            yield chunk
+
+    report = {"players": n, "chunk": args.ranking_chunk}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in ("json", "sqlite"):
+            if backend == "json":
+                store = JsonRankingStore()
+            else:
+                store = SQLiteRankingStore(os.path.join(workdir, "rankings.db"))
+            store.add_many(deltas)
+            if backend == "sqlite":
+                store.flush()
+            path = os.path.join(workdir, f"{backend}.csv")
+
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            steps = []
+            started = time.perf_counter()
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                pages = timed_chunks(ranking_io.iter_ranking(store, "historical_ranking", args.ranking_chunk), steps)
+                for block in ranking_io.encode_csv(pages):
+                    f.write(block)
+            export_seconds = time.perf_counter() - started
+            export_peak = tracemalloc.get_traced_memory()[1] - base
+
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            apply_steps = []
+            started = time.perf_counter()
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                for entries in ranking_io.chunk_entries(ranking_io.parse_rows(f), True, args.ranking_chunk):
+                    step = time.perf_counter()
+                    store.import_entries("daily_ranking", entries, True)
+                    if backend == "sqlite":
+                        store.flush()
+                    apply_steps.append(time.perf_counter() - step)
+            import_seconds = time.perf_counter() - started
+            # Al netto di quanto cresce lo store stesso (nuovi nomi e chiavi)
+            current, peak = tracemalloc.get_traced_memory()
+            import_peak = peak - max(base, current)
+            if not tracing:
+                tracemalloc.stop()
+
+            report[backend] = {
+                "export_rows_per_sec": n / export_seconds,
+                "export_peak_kb": export_peak / 1024,
+                "export_max_chunk_ms": max(steps) * 1000,
+                "import_rows_per_sec": n / import_seconds,
+                "import_peak_kb": import_peak / 1024,
+                "import_max_apply_ms": max(apply_steps) * 1000,
+                "file_bytes": os.path.getsize(path),
+            }
+            store.close()
+    return report
+
+
+def bench_ranking_pages(args):
+    """/ranking pages and "my rank": time per lookup for a deep page and for a
+    player's place, from the store's order structure versus sorting the
+    whole ranking (what a naive paginator would do)."""
+    from ranking_store import JsonRankingStore, SQLiteRankingStore
+
+    rng = random.Random(args.seed)
+    n = args.ranking_players
+    deltas = {str(10 ** 17 + i): [f"player{i}", rng.randrange(10_000)] for i in range(n)}
+    uids = rng.sample(list(deltas), 200)
+
+    def per_call_us(func, calls):
+        started = time.perf_counter()
+        for i in range(calls):
+            func(i)
+        return (time.perf_counter() - started) / calls * 1e6
+
+    report = {"players": n}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in ("json", "sqlite"):
+            if backend == "json":
+                store = JsonRankingStore()
+            else:
+                store = SQLiteRankingStore(os.path.join(workdir, "rankings.db"))
+            store.add_many(deltas)
+            if backend == "sqlite":
+                store.flush()
+            middle = n // 2
+            report[backend] = {
+                "page_first_us": per_call_us(lambda i: store.page("daily_ranking", 0, 10), 200),
+                "page_middle_us": per_call_us(lambda i: store.page("daily_ranking", middle, 10), 200),
+                "position_of_us": per_call_us(lambda i: store.position_of("daily_ranking", uids[i]), len(uids)),
+            }
+            store.close()
+
+    entries = {uid: {"name": name, "points": points} for uid, (name, points) in deltas.items()}
+    report["sorted_page_us"] = per_call_us(
+        lambda i: sorted(entries.items(), key=lambda item: -item[1]["points"])[n // 2:n // 2 + 10], 5
+    )
+    return report
+
+
+def bench_responses(args):
+    """Per-response construction time: inline f-strings/Embeds (as the handlers
+    used to do) versus the response catalog, with and without an extra locale."""
+    import discord
+    from responses import Catalog, catalog
+
+    mention, secret, lives = "<@123456789012345678>", "LA VITA È BELLA", 3
+    n = args.responses
+
+    def inline_ok():
+        return {"content": "✓", "ephemeral": True}
+
+    def inline_wait_turn():
+        return {
+            "content": f"⏳ {mention} wait for another player's turn! / aspetta il turno di un altro giocatore!",
+            "ephemeral": True,
+        }
+
+    def inline_repeated():
+        return {"content": (
+            f"🔁 {mention} that letter was already said! -1 life ❤️ / "
+            f"quella lettera è già stata detta! -1 vita ❤️\n"
+            f"Lives remaining / Vite rimanenti: **{lives}**"
+        )}
+
+    def inline_victory():
+        embed = discord.Embed(
+            title="🎉 VICTORY! / VITTORIA! 🎉",
+            description=f"**{mention}** found the last letter! / ha trovato l'ultima lettera!",
+            color=discord.Color.gold()
+        )
+        embed.add_field(name="Answer / Risposta", value=f"**{secret}**", inline=False)
+        embed.add_field(name="Points / Punti", value="+5 🌟", inline=False)
+        return {"embed": embed}
+
+    def catalog_cases(cat, locale):
+        return {
+            "ok": lambda: cat.reply("ok", locale, ephemeral=True),
+            "wait_turn": lambda: cat.reply("wait_turn", locale, ephemeral=True, mention=mention),
+            "repeated": lambda: cat.reply("repeated_lives", locale, mention=mention, lives=lives),
+            "victory_embed": lambda: cat.embed_reply("victory_letter", locale, mention=mention, secret=secret, points=5),
+        }
+
+    # Catalogo con una lingua in più, per vedere che le traduzioni non costano nei handler
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump({"es": {
+            "wait_turn": "⏳ {mention} ¡espera el turno de otro jugador!",
+            "victory_title": "🎉 ¡VICTORIA! 🎉",
+        }}, f)
+    localized = Catalog()
+    localized.load(f.name)
+    os.unlink(f.name)
+    interaction = FakeInteraction(FakeUser(1, "player"), None, None)
+    interaction.guild_locale = "es-ES"
+    spanish = localized.locale_of(interaction)
+
+    variants = {
+        "inline": {"ok": inline_ok, "wait_turn": inline_wait_turn, "repeated": inline_repeated, "victory_embed": inline_victory},
+        "catalog": catalog_cases(catalog, catalog.locale_of(None)),
+        "catalog_es": catalog_cases(localized, spanish),
+    }
+    report = {}
+    for variant, cases in variants.items():
+        for name, build in cases.items():
+            build()
+            started = time.perf_counter()
+            for _ in range(n):
+                build()
+            report.setdefault(name, {})[f"{variant}_ns"] = (time.perf_counter() - started) / n * 1e9
+    return report
+
+
+async def main_async(args):
+    results = {}
+    recorder = Recorder()
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.perf_counter()
+        if "hangman" in args.bots:
+            results["hangman"] = await run_hangman(args, recorder, workdir)
+        if "ditto" in args.bots:
+            results["ditto"] = await run_ditto(args, recorder)
+            if args.traffic:
+                results["ditto_traffic"] = await run_ditto_traffic(args)
+        elapsed = time.perf_counter() - started
+    if args.letter_games:
+        results["letter_state"] = bench_letter_state(args)
+    if args.responses:
+        results["responses"] = bench_responses(args)
+    if args.permission_checks:
+        results["permissions"] = bench_permissions(args)
+    if args.analytics_rows:
+        results["analytics"] = bench_analytics(args)
+    if args.bank_entries:
+        results["word_bank"] = bench_word_bank(args)
+    if args.ranking_players:
+        results["ranking_io"] = bench_ranking_io(args)
+        results["ranking_pages"] = bench_ranking_pages(args)
+    results["handlers"] = recorder.summary()
+    results["total_ops"] = recorder.total_ops
+    results["elapsed_seconds"] = elapsed
+    results["ops_per_sec"] = recorder.total_ops / elapsed if elapsed else None
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bots", nargs="+", default=["hangman", "ditto"], choices=["hangman", "ditto"])
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--guilds", type=int, default=1)
+    parser.add_argument("--lives", type=int, default=5)
+    parser.add_argument("--max-guesses", type=int, default=200, help="guess cap per player per round")
+    parser.add_argument("--messages", type=int, default=5000, help="messages per guild for the letter bot")
+    parser.add_argument("--traffic", type=int, default=200_000, help="messages for the letter bot throughput run (0 = skip)")
+    parser.add_argument("--letter-games", type=int, default=10_000, help="games for the letter-state microbenchmark (0 = skip)")
+    parser.add_argument("--responses", type=int, default=100_000, help="iterations of the response construction microbenchmark (0 = skip)")
+    parser.add_argument("--permission-checks", type=int, default=100_000, help="iterations of the moderator check microbenchmark (0 = skip)")
+    parser.add_argument("--analytics-rows", type=int, default=1_000_000, help="rows for the guess log benchmark (0 = skip)")
+    parser.add_argument("--analytics-chunk", type=int, default=1 << 18, help="rows per aggregation chunk")
+    parser.add_argument("--bank-entries", type=int, default=200_000, help="puzzles in the larger word bank benchmark (0 = skip)")
+    parser.add_argument("--ranking-players", type=int, default=200_000, help="players for the ranking export/import and page benchmarks (0 = skip)")
+    parser.add_argument("--ranking-chunk", type=int, default=2000, help="players per export/import chunk")
+    parser.add_argument("--burst", type=int, default=5000, help="concurrent guesses for the burst run (0 = skip)")
+    parser.add_argument("--burst-games", type=int, default=8, help="games sharing the burst")
+    parser.add_argument("--direct-points", type=int, default=1000, help="extra add_points_to_player calls")
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="simulated fetch_member latency (s)")
+    parser.add_argument("--cached-ratio", type=float, default=1.0, help="share of members in the gateway cache")
+    parser.add_argument("--trace-memory", action="store_true", help="report tracemalloc peak (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    if args.trace_memory:
+        tracemalloc.start()
+
+    report = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "params": vars(args),
+    }
+    report.update(asyncio.run(main_async(args)))
+
+    if args.trace_memory:
+        report["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["peak_rss_bytes"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,35 @@
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
-import json
+from discord.ext import commands
+import aiohttp
+import asyncio
 import os
-from datetime import datetime
-import unicodedata
+import signal
+import tempfile
+import time
+
+import metrics
+import ranking_io
+from action_queue import GameActionQueue
+from analytics import LETTER, SETTLE, START, WORD, GuessRecorder, letter_code
+from guess_engine import normalize_text
+from journal import EventJournal
+from lifecycle import Lifecycle
+from member_cache import DisplayNameResolver
+from permissions import PermissionResolver, parse_role_ids
+from persistence import WriteBehindWriter, load_json, save_json
+from ranking_service import RankingServer, RankingUnavailable, RemoteRankingStore, parse_address
+from command_sync import sync_commands
+from ranking_store import JsonRankingStore, SQLiteRankingStore
+from responses import catalog
+from rules import DEFAULT_RULES, RULES, RuleBook
+from scoring import ScoreBatch
+from scheduler import DailyBoundary, DailyScheduler
+from word_bank import DIFFICULTIES, WordBank
+from state import (
+    CORRECT, ELIMINATED, GAME_EVENTS, REPEATED, WAIT_TURN, WIN,
+    GameRegistry, HangmanGame, decode_key, encode_key
+)
 
 # ================= CONFIG =================
 
@@ -12,396 +37,1033 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Shard assegnati da launcher.py (es. "0,1")
+SHARD_IDS = os.getenv("BOT_SHARD_IDS", "")
+# Numero totale di shard, oppure "auto" per farlo scegliere a Discord
+SHARD_COUNT = os.getenv("BOT_SHARD_COUNT", "")
+
+if SHARD_IDS or SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix="!", intents=intents,
+        shard_ids=[int(s) for s in SHARD_IDS.split(",")] if SHARD_IDS else None,
+        shard_count=int(SHARD_COUNT) if SHARD_COUNT.isdigit() else None
+    )
+else:
+    bot = commands.Bot(command_prefix="!", intents=intents)
 bot.name = "Impiccato"
 
+# Ruolo quando avviato da launcher.py:
+# "standalone" = tutto in un processo, "shard" = classifiche nel processo aggregatore,
+# "rankings" = l'aggregatore stesso (nessuna connessione al gateway)
+ROLE = os.getenv("HANGMAN_ROLE", "standalone")
+# Suffisso dei file di stato per processo (gli shard non condividono partite né journal)
+INSTANCE = os.getenv("HANGMAN_INSTANCE", "")
+RANKING_AGGREGATOR = os.getenv("HANGMAN_RANKING_AGGREGATOR", "127.0.0.1:6010")
+# Chiave condivisa aggregatore/shard (esadecimale): il launcher ne genera una per ogni avvio
+RANKING_AUTHKEY = bytes.fromhex(os.getenv("HANGMAN_RANKING_AUTHKEY", ""))
+
+def instance_path(name):
+    if not INSTANCE:
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{INSTANCE}{ext}"
+
 DATA_FILE = "hangman_data.json"
+STATE_FILE = instance_path("hangman_state.json")
+JOURNAL_DIR = instance_path("hangman_journal")
+SAVE_INTERVAL = float(os.getenv("HANGMAN_SAVE_INTERVAL", "2"))
+SAVE_MAX_DIRTY = int(os.getenv("HANGMAN_SAVE_MAX_DIRTY", "50"))
+# Gli eventi sono già nel journal: gli snapshot completi possono essere rari
+SNAPSHOT_INTERVAL = float(os.getenv("HANGMAN_SNAPSHOT_INTERVAL", "60"))
+SNAPSHOT_EVERY = int(os.getenv("HANGMAN_SNAPSHOT_EVERY", "1000"))
+
+# "json" = hangman_data.json in memoria, "sqlite" = database SQLite indicizzato,
+# "remote" = processo aggregatore (sempre negli shard)
+RANKING_BACKEND = "remote" if ROLE == "shard" else os.getenv("HANGMAN_RANKING_BACKEND", "json")
+RANKING_DB = os.getenv("HANGMAN_RANKING_DB", "hangman_rankings.db")
+# Classifiche archiviate dopo ogni reset (solo backend "json"; SQLite usa la tabella ranking_archive)
+ARCHIVE_DIR = os.getenv("HANGMAN_ARCHIVE_DIR", "hangman_archive")
+# Fuso orario della mezzanotte che azzera la classifica giornaliera (es. "Europe/Rome")
+RESET_TIMEZONE = os.getenv("HANGMAN_RESET_TIMEZONE", "UTC")
+
+# "guild" = una partita per server, "channel" = una partita per canale
+GAME_SCOPE = os.getenv("HANGMAN_GAME_SCOPE", "guild")
+MAX_GAMES = int(os.getenv("HANGMAN_MAX_GAMES", "5000"))
+GAME_IDLE_TTL = float(os.getenv("HANGMAN_GAME_IDLE_TTL", str(6 * 3600)))
+MEMBER_NAME_TTL = float(os.getenv("HANGMAN_MEMBER_NAME_TTL", "300"))
+MEMBER_FETCH_CONCURRENCY = int(os.getenv("HANGMAN_MEMBER_FETCH_CONCURRENCY", "5"))
+METRICS_PORT = int(os.getenv("HANGMAN_METRICS_PORT", "0"))
+# Ruoli che possono usare i comandi del proprietario, per server
+# ("server:ruolo,ruolo;server:ruolo"); di default solo il proprietario
+MODERATOR_ROLES = parse_role_ids(os.getenv("HANGMAN_MODERATOR_ROLES", ""))
+# Traduzioni extra dei messaggi, {locale: {chiave: testo}} (vedi responses.py)
+TRANSLATIONS_FILE = os.getenv("HANGMAN_TRANSLATIONS_FILE", "")
+if TRANSLATIONS_FILE:
+    catalog.load(TRANSLATIONS_FILE)
+# Log colonnare delle giocate per le statistiche offline (analytics.py); "" = disattivato
+ANALYTICS_DIR = os.getenv("HANGMAN_ANALYTICS_DIR", "hangman_analytics")
+if ANALYTICS_DIR:
+    ANALYTICS_DIR = instance_path(ANALYTICS_DIR)
+ANALYTICS_INTERVAL = float(os.getenv("HANGMAN_ANALYTICS_INTERVAL", "5"))
+ANALYTICS_BATCH = int(os.getenv("HANGMAN_ANALYTICS_BATCH", "5000"))
+# Banca di enigmi per /start_game senza parola e per i round automatici (vedi word_bank.py):
+# file di testo, indice compilato (di default <file>.idx) e lingua delle righe che non la indicano
+WORD_BANK = os.getenv("HANGMAN_WORD_BANK", "")
+WORD_BANK_INDEX = os.getenv("HANGMAN_WORD_BANK_INDEX", "")
+WORD_BANK_LANGUAGE = os.getenv("HANGMAN_WORD_BANK_LANGUAGE", "")
+# Enigmi recenti che una partita non rivede e pausa tra un round automatico e il successivo
+PUZZLE_WINDOW = int(os.getenv("HANGMAN_PUZZLE_WINDOW", "200"))
+AUTO_ROUND_DELAY = float(os.getenv("HANGMAN_AUTO_ROUND_DELAY", "10"))
+# /ranking: giocatori per pagina, durata della cache delle pagine oltre la prima e dei pulsanti
+RANKING_PAGE_SIZE = 10
+RANKING_PAGE_TTL = float(os.getenv("HANGMAN_RANKING_PAGE_TTL", "15"))
+RANKING_VIEW_TIMEOUT = float(os.getenv("HANGMAN_RANKING_VIEW_TIMEOUT", "300"))
+# Export / import delle classifiche (/export_ranking, /import_ranking): giocatori per blocco
+RANKING_IO_CHUNK = int(os.getenv("HANGMAN_RANKING_IO_CHUNK", "2000"))
+# Arresto (SIGTERM): secondi per finire i comandi in corso prima di salvare e disconnettersi
+DRAIN_TIMEOUT = float(os.getenv("HANGMAN_DRAIN_TIMEOUT", "8"))
+# Sync dei comandi: "auto" = solo se l'albero è cambiato, "always", "off".
+# Con HANGMAN_SYNC_GUILD (sviluppo) i comandi vanno solo su quel server
+COMMAND_SYNC = os.getenv("HANGMAN_COMMAND_SYNC", "auto")
+SYNC_GUILD = os.getenv("HANGMAN_SYNC_GUILD", "")
+# Condiviso tra gli shard: basta un sync per applicazione
+COMMAND_SYNC_FILE = "hangman_command_sync.json"
+# Regole per server ({"default": {...}, "server": {...}}, vedi rules.py), modificate da /rules;
+# condiviso tra gli shard come il file del sync
+RULES_FILE = os.getenv("HANGMAN_RULES_FILE", "hangman_rules.json")
+
+# Con SQLite i punti sono già persistiti dal database, il journal copre solo le partite;
+# con "remote" li registra l'aggregatore, che a sua volta non ha partite
+JOURNAL_RANKINGS = RANKING_BACKEND == "json"
+JOURNAL_GAMES = ROLE != "rankings"
+RANKING_EVENTS = ("points", "score", "import", "reset", "batch")
 
 # ================= GAME STATE =================
 
-game_state = {
-    "active": False,
-    "secret": "",
-    "hint": "",
-    "secret_normalized": "",
-    "letters_needed": set(),
-    "letters_found": set(),
-    "wrong_letters": set(),
-    "players": {},
-    "last_player": None,
-    "initial_lives": 5,
-    "round_number": 0,
-    "lose_points_mode": False
-}
-
-persistent_data = {
-    "daily_ranking": {},
-    "historical_ranking": {},
-    "last_reset": datetime.now().date().isoformat()
-}
+games = GameRegistry(
+    HangmanGame,
+    max_games=MAX_GAMES,
+    idle_ttl=GAME_IDLE_TTL,
+    per_channel=GAME_SCOPE == "channel"
+)
 
-# ================= UTILITIES =================
+journal = EventJournal(
+    JOURNAL_DIR,
+    consumers=tuple(name for name, on in (("rankings", JOURNAL_RANKINGS), ("games", JOURNAL_GAMES)) if on)
+)
+rankings = JsonRankingStore(archive_dir=ARCHIVE_DIR)
+data_loaded = False
+ready_once = False
+word_bank = None
+daily_boundary = DailyBoundary(RESET_TIMEZONE)
+background_tasks = set()
+auto_rounds = set()
+lifecycle = Lifecycle("hangman", drain_timeout=DRAIN_TIMEOUT)
+ranking_embeds = {}
+# Le azioni di una partita (giocate, start, fine) vengono eseguite una alla volta, in ordine
+game_actions = GameActionQueue()
+permissions = PermissionResolver(role_ids=MODERATOR_ROLES)
+game_rules = RuleBook(RULES_FILE)
+member_names = DisplayNameResolver(ttl=MEMBER_NAME_TTL, concurrency=MEMBER_FETCH_CONCURRENCY)
+
+# ================= METRICS =================
+
+guess_counter = metrics.registry.counter("hangman_guesses_total", "Accepted guesses by kind and outcome")
+elimination_counter = metrics.registry.counter("hangman_eliminations_total", "Players eliminated")
+rounds_counter = metrics.registry.counter("hangman_rounds_total", "Settled rounds by result")
+round_players = metrics.registry.histogram(
+    "hangman_round_players", "Players per settled round",
+    buckets=(1, 2, 3, 5, 10, 25, 50, 100)
+)
+persistence_writes = metrics.registry.counter("hangman_persistence_writes_total", "Snapshot/batch writes")
+persistence_bytes = metrics.registry.counter("hangman_persistence_bytes_total", "Bytes written by snapshots, batches and the journal")
+games_gauge = metrics.registry.gauge("hangman_games", "Games held in memory")
+metrics_server = metrics.MetricsServer(METRICS_PORT) if METRICS_PORT else None
+
+@metrics.registry.collector
+def collect_hangman_metrics():
+    for target, writer in (("rankings", data_writer), ("games", state_writer), ("analytics", analytics_writer)):
+        stats = writer.stats()
+        persistence_writes.set(stats["writes"], target=target)
+        persistence_bytes.set(stats["bytes_written"], target=target)
+    persistence_writes.set(journal.appends, target="journal")
+    persistence_bytes.set(journal.bytes_written, target="journal")
+    games_gauge.set(sum(1 for _, game in games.items() if game.active), state="active")
+    games_gauge.set(len(games), state="registered")
+    games_gauge.set(len(game_actions), state="busy")
+
+def count_guess(kind, outcome):
+    guess_counter.inc(kind=kind, outcome=outcome)
+
+# ================= PERSISTENCE =================
+
+def snapshot_rankings():
+    data = rankings.snapshot()
+    data["journal_seq"] = journal.rotate()
+    return data
+
+def write_rankings(data):
+    written = save_json(DATA_FILE, data)
+    journal.commit("rankings", data["journal_seq"])
+    return written
+
+def snapshot_games():
+    return {
+        "games": [[encode_key(key), game.to_dict()] for key, game in games.items()],
+        "journal_seq": journal.rotate()
+    }
+
+def write_games(data):
+    written = save_json(STATE_FILE, data)
+    journal.commit("games", data["journal_seq"])
+    return written
+
+data_writer = WriteBehindWriter(
+    DATA_FILE, snapshot_rankings, write=write_rankings,
+    interval=SNAPSHOT_INTERVAL, max_dirty=SNAPSHOT_EVERY
+)
+state_writer = WriteBehindWriter(
+    STATE_FILE, snapshot_games, write=write_games,
+    interval=SNAPSHOT_INTERVAL, max_dirty=SNAPSHOT_EVERY
+)
+guess_log = GuessRecorder(ANALYTICS_DIR)
+analytics_writer = WriteBehindWriter(
+    ANALYTICS_DIR, guess_log.take_batch, write=guess_log.write_batch,
+    interval=ANALYTICS_INTERVAL, max_dirty=ANALYTICS_BATCH
+)
+
+def apply_ranking_event(event):
+    if event["e"] == "score":
+        rankings.add_many(event["p"])
+    elif event["e"] == "points":
+        rankings.add_points(event["u"], event["n"], event["d"])
+    elif event["e"] == "import":
+        rankings.import_entries(event["r"], event["p"], event["m"])
+    elif event["e"] == "batch":
+        rankings.record_batch(event["c"], event["s"])
+    else:
+        rankings.reset(event["r"])
+        if "day" in event:
+            rankings.last_reset = event["day"]
 
 def load_data():
-    global persistent_data
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            persistent_data = json.load(f)
+    """Carica l'ultimo snapshot e riapplica gli eventi del journal successivi"""
+    global rankings, data_writer, data_loaded
+    if data_loaded:
+        return
+    data_loaded = True
+    started = time.perf_counter()
+    ranking_embeds.clear()
+
+    if RANKING_BACKEND == "sqlite":
+        rankings = SQLiteRankingStore(RANKING_DB)
+        imported = rankings.migrate_from_json(DATA_FILE)
+        if imported:
+            print(f"📦 Migrated {imported} ranking entries from {DATA_FILE} to {RANKING_DB}")
+        data_writer = WriteBehindWriter(
+            RANKING_DB, rankings.take_batch, write=rankings.write_batch,
+            interval=SAVE_INTERVAL, max_dirty=SAVE_MAX_DIRTY
+        )
+        rankings_seq = None
+    elif RANKING_BACKEND == "remote":
+        rankings = RemoteRankingStore(parse_address(RANKING_AGGREGATOR), RANKING_AUTHKEY)
+        data_writer = WriteBehindWriter(
+            RANKING_AGGREGATOR, rankings.take_batch, write=rankings.write_batch,
+            interval=SAVE_INTERVAL, max_dirty=SAVE_MAX_DIRTY
+        )
+        rankings_seq = None
+    else:
+        rankings = JsonRankingStore.load(DATA_FILE, ARCHIVE_DIR)
+        rankings_seq = rankings.data.pop("journal_seq", 0)
+
+    games_seq = None
+    if JOURNAL_GAMES:
+        state = load_json(STATE_FILE) or {}
+        games_seq = state.get("journal_seq", 0)
+        for key, data in state.get("games", []):
+            games.get(decode_key(key)).load_dict(data)
+
+    replayed = 0
+    seqs = [seq for seq in (games_seq, rankings_seq) if seq is not None]
+    for seq, event in journal.replay(min(seqs)) if seqs else ():
+        if event["e"] in GAME_EVENTS:
+            if games_seq is not None and seq >= games_seq:
+                games.get(decode_key(event["g"])).apply_event(event)
+                replayed += 1
+        elif rankings_seq is not None and seq >= rankings_seq:
+            apply_ranking_event(event)
+            replayed += 1
+
+    if games_seq is not None:
+        journal.commit("games", games_seq)
+    if rankings_seq is not None:
+        journal.commit("rankings", rankings_seq)
+    print(f"📂 State restored in {(time.perf_counter() - started) * 1000:.0f}ms ({len(games)} game(s), {replayed} journal event(s) replayed)")
+    metrics.startup_milestone("hangman", "restored")
 
 def save_data():
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(persistent_data, f, indent=2, ensure_ascii=False)
+    data_writer.mark_dirty()
 
-def normalize_text(text):
-    nfd = unicodedata.normalize("NFD", text.upper())
-    return "".join(c for c in nfd if unicodedata.category(c) != "Mn")
+async def load_word_bank():
+    """Apre l'indice della banca (lo compila in un thread se manca o è più vecchio del file)"""
+    global word_bank
+    if word_bank is not None or not (WORD_BANK or WORD_BANK_INDEX):
+        return
+    try:
+        if WORD_BANK:
+            word_bank = await asyncio.to_thread(WordBank.load, WORD_BANK, WORD_BANK_INDEX or None, WORD_BANK_LANGUAGE)
+        else:
+            word_bank = WordBank(WORD_BANK_INDEX)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Word bank not loaded: {e}")
+        return
+    print(f"📚 Word bank: {len(word_bank)} puzzles in {len(word_bank.buckets)} buckets")
 
-def get_letters_in_phrase(phrase):
-    normalized = normalize_text(phrase)
-    return set(c for c in normalized if c.isalpha())
+def record_play(interaction, game, kind, user, outcome, code=0, lives=0):
+    """Una riga del log delle giocate; i file li scrive analytics_writer in background"""
+    if not ANALYTICS_DIR:
+        return
+    scope = interaction.channel if games.per_channel else interaction.guild
+    guess_log.record(
+        kind, scope.id if scope is not None else 0, game.started_at, user,
+        outcome, game.lose_points_mode, code, lives
+    )
+    analytics_writer.mark_dirty()
+
+def log_game_event(interaction, event, **fields):
+    fields["e"] = event
+    fields["g"] = encode_key(games.key_of(interaction))
+    journal.append(fields)
+    state_writer.mark_dirty()
+
+def reset_ranking(ranking, day=None):
+    retired = rankings.reset(ranking)
+    if retired is not None:
+        started = rankings.last_reset if ranking == "daily_ranking" else None
+        archive_ranking(rankings, ranking, retired, started)
+    event = {"e": "reset", "r": ranking}
+    if day is not None:
+        rankings.last_reset = day
+        event["day"] = day
+    if JOURNAL_RANKINGS:
+        journal.append(event)
+    save_data()
 
-def check_last_letter_win():
-    return len(game_state["letters_needed"]) == 0
+def archive_ranking(store, ranking, retired, started):
+    """Archivia la generazione ritirata in un thread, senza bloccare i comandi"""
+    async def archive():
+        try:
+            # SQLite: i punti della generazione ritirata ancora nel buffer vanno scritti prima
+            await settle_ranking_writes()
+            archived = await asyncio.to_thread(store.archive, ranking, retired, started)
+            print(f"🗄️ Archived {ranking} ({archived})")
+        except Exception as e:
+            print(f"⚠️ Archiving {ranking} failed: {e}")
+
+    task = asyncio.get_running_loop().create_task(archive())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+def reset_daily_if_needed(day):
+    if rankings.last_reset != day:
+        reset_ranking("daily_ranking", day)
+
+daily_reset = DailyScheduler(daily_boundary, reset_daily_if_needed, name="daily reset")
+
+def start_daily_reset():
+    # Recupera un reset perso mentre il bot era spento, poi dorme fino alla mezzanotte
+    reset_daily_if_needed(daily_boundary.today())
+    daily_reset.start()
+
+# ================= RANKING AGGREGATOR =================
+
+def apply_remote_ops(ops, client, seq):
+    """Batch ``seq`` of updates shipped by shard process ``client`` (see RemoteRankingStore)"""
+    try:
+        for op in ops:
+            if op[0] == "points":
+                apply_scores(op[1])
+            elif op[0] == "import":
+                import_ranking_entries(op[1], op[2], op[3])
+            elif op[0] == "reset":
+                reset_ranking(op[1], op[2])
+            elif op[0] == "day":
+                rankings.last_reset = op[1]
+                save_data()
+    finally:
+        # Anche se un'operazione fallisce: rimandato, il batch rifarebbe quelle già applicate
+        rankings.record_batch(client, seq)
+        if JOURNAL_RANKINGS:
+            journal.append({"e": "batch", "c": client, "s": seq})
+        save_data()
 
-def add_points_to_player(user_id, username, points):
-    uid = str(user_id)
+def read_ranking(op, args):
+    if op == "last_reset":
+        return rankings.last_reset
+    return getattr(rankings, op)(*args)
 
-    for ranking in ("daily_ranking", "historical_ranking"):
-        if uid not in persistent_data[ranking]:
-            persistent_data[ranking][uid] = {"name": username, "points": 0}
-        persistent_data[ranking][uid]["points"] += points
-        persistent_data[ranking][uid]["name"] = username
+async def serve_rankings():
+    """Ruolo "rankings": possiede le classifiche e serve gli shard, senza gateway"""
+    load_data()
+    data_writer.start()
+    if metrics_server is not None:
+        await metrics_server.start("hangman-rankings")
+    server = RankingServer(
+        parse_address(RANKING_AGGREGATOR), RANKING_AUTHKEY,
+        apply_remote_ops, read_ranking, rankings.last_batch
+    )
+    server.start()
+    start_daily_reset()
+    print(f"🏆 Ranking aggregator listening on {RANKING_AGGREGATOR}")
+
+    # SIGTERM = uscita ordinata, senza cancellare i task del writer; con launcher.py
+    # SIGTERM è ignorato (arriva anche agli shard) e l'arresto è SIGUSR1, dopo gli shard
+    stop = asyncio.Event()
+    for signum in (signal.SIGTERM, signal.SIGUSR1):
+        if signal.getsignal(signum) is not signal.SIG_IGN:
+            asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        daily_reset.cancel()
+        server.close()
+        await asyncio.gather(*background_tasks)
+        await data_writer.close()
+        print(f"🏆 Ranking aggregator served {server.requests} request(s), {server.ops} update op(s), {server.duplicates} duplicate batch(es) skipped")
 
+# ================= UTILITIES =================
+
+def get_game(interaction: discord.Interaction) -> HangmanGame:
+    return games.get(games.key_of(interaction))
+
+def apply_scores(deltas):
+    """Applica ``{uid: [nome, punti]}`` a entrambe le classifiche: un evento e un salvataggio"""
+    rankings.add_many(deltas)
+    if JOURNAL_RANKINGS:
+        journal.append({"e": "score", "p": deltas})
     save_data()
 
-def get_initial_pattern(secret):
-    return " ".join("_" if c != " " else " " for c in secret.upper())
+def import_ranking_entries(ranking, entries, merge=True):
+    """Scrive un blocco importato ``{uid: [nome, punti]}`` in una sola classifica"""
+    rankings.import_entries(ranking, entries, merge)
+    if JOURNAL_RANKINGS:
+        journal.append({"e": "import", "r": ranking, "p": entries, "m": merge})
+    save_data()
 
-def get_word_lengths(secret):
-    return "+".join(str(len(w)) for w in secret.split())
+async def settle_ranking_writes():
+    """SQLite: le pagine oltre la prima e lo scan leggono solo i batch scritti; il writer scrive il resto in un thread"""
+    if RANKING_BACKEND == "sqlite" and rankings.has_changes():
+        await data_writer.flush()
+
+async def export_ranking_file(ranking, fmt):
+    """Scrive la classifica in un file temporaneo, un blocco alla volta; restituisce il percorso.
+
+    Le letture dallo store avvengono sul loop (lo store json non è thread-safe;
+    con l'aggregatore ogni blocco è un round trip in un thread), la scrittura
+    del blocco in un thread: tra un blocco e l'altro il bot risponde.
+    """
+    await settle_ranking_writes()
+    header, encode = ranking_io.BLOCK_ENCODERS[fmt]
+    numbering = ranking_io.RankNumbering()
+    fd, path = tempfile.mkstemp(prefix=f"{ranking}-", suffix=f".{fmt}")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            await asyncio.to_thread(f.write, header())
+            cursor = None
+            while True:
+                rows, cursor = await query_ranking("scan", ranking, cursor, RANKING_IO_CHUNK)
+                block = numbering.number(rows)
+                if block:
+                    await asyncio.to_thread(f.write, encode(block))
+                if cursor is None:
+                    break
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+async def download_attachment(attachment, path):
+    """Scarica un allegato a pezzi (``Attachment.save`` lo terrebbe tutto in memoria)"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(attachment.url) as response:
+            response.raise_for_status()
+            with open(path, "wb") as f:
+                async for piece in response.content.iter_chunked(1 << 16):
+                    await asyncio.to_thread(f.write, piece)
+
+async def import_ranking_file(path, ranking, merge):
+    """Importa un file CSV/NDJSON: parsing in un thread, un blocco alla volta applicato sul loop"""
+    stats = {}
+    players = 0
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        chunks = ranking_io.chunk_entries(ranking_io.parse_rows(f, stats=stats), merge, RANKING_IO_CHUNK)
+        while True:
+            entries = await asyncio.to_thread(next, chunks, None)
+            if entries is None:
+                break
+            import_ranking_entries(ranking, entries, merge)
+            players += len(entries)
+            if RANKING_BACKEND == "remote":
+                # Un blocco per batch: richieste piccole, e un errore ferma l'import invece di accumulare il file in memoria
+                await data_writer.flush()
+    return stats["rows"], players, stats["skipped"]
+
+def scoring():
+    """Raccoglie i punti di un'interazione: ``with scoring() as score: score.add(...)``"""
+    return ScoreBatch(apply_scores)
 
-def get_current_pattern():
-    """Genera el patrón actual con letras adivinadas"""
-    pattern = []
-    for char in game_state["secret"]:
-        if char == " ":
-            pattern.append(" ")
-        elif normalize_text(char) in game_state["letters_found"]:
-            pattern.append(char)
-        else:
-            pattern.append("_")
-    return " ".join(pattern)
+def add_points_to_player(user_id, username, points):
+    apply_scores({str(user_id): [username, points]})
+
+def draw_puzzle(game, locale, difficulty=None, language=None):
+    """``(secret, hint, entry)`` dalla banca, evitando gli enigmi recenti della partita; None se niente corrisponde"""
+    entry = word_bank.draw(game.recent_puzzles, difficulty=difficulty, language=language)
+    if entry is None:
+        return None
+    secret, hint = word_bank.entry(entry)
+    return secret, hint or default_hint(secret, locale), entry
+
+def default_hint(secret, locale):
+    normalized = normalize_text(secret)
+    return catalog.text("bank_hint", locale, words=len(normalized.split()), letters=sum(c.isalpha() for c in normalized))
+
+def begin_round(interaction, game, secret, hint, lives=None, entry=None):
+    """Avvia il round, lo registra e restituisce i campi del messaggio round_started"""
+    # Le regole del server valgono per tutto il round: /rules cambia solo i round successivi
+    rules = game_rules.compile(interaction.guild_id)
+    if lives is None:
+        lives = rules.lives
+    game.start(secret, hint, lives, rules=rules)
+    event = {"secret": secret, "hint": hint, "lives": lives, "t": game.started_at}
+    if rules is not DEFAULT_RULES:
+        event["rules"] = rules.to_dict()
+    if entry is not None:
+        game.recent_puzzles.add(entry, PUZZLE_WINDOW)
+        event["b"] = entry
+    if game.auto is not None:
+        event["auto"] = game.auto
+    log_game_event(interaction, "start", **event)
+    record_play(interaction, game, START, interaction.user.id, "none", len(game.letters_needed), lives)
+    return {
+        "round": game.round_number,
+        "pattern": game.compiled.pattern,
+        "lengths": game.compiled.word_lengths(),
+        "hint": hint,
+        "lives": lives,
+    }
+
+def schedule_next_round(interaction):
+    # A parte dai background_tasks: all'arresto si annullano invece di aspettarli
+    task = asyncio.get_running_loop().create_task(next_round_later(interaction))
+    auto_rounds.add(task)
+    task.add_done_callback(auto_rounds.discard)
+
+async def next_round_later(interaction):
+    await asyncio.sleep(AUTO_ROUND_DELAY)
+    announcement = await game_actions.submit(games.key_of(interaction), play_next_round, interaction)
+    if announcement is None:
+        return
+    # L'annuncio parte fuori dalla coda: le giocate sul nuovo round non aspettano Discord
+    try:
+        await interaction.channel.send(announcement)
+    except discord.HTTPException as e:
+        print(f"⚠️ Auto round not announced: {e}")
+
+def play_next_round(interaction):
+    """Round automatico successivo, nella coda della partita (salta se /end_game o /start_game sono arrivati prima).
+
+    Restituisce il testo da annunciare, o None se non c'è niente da dire.
+    """
+    game = games.peek(games.key_of(interaction))
+    if game is None or game.active or game.auto is None or word_bank is None:
+        return None
+    locale = catalog.locale_of(interaction)
+    puzzle = draw_puzzle(game, locale, game.auto["difficulty"], game.auto["language"])
+    if puzzle is None:
+        game.auto = None
+        return catalog.text("bank_no_match", locale)
+    secret, hint, entry = puzzle
+    return catalog.text(
+        "round_started", locale, **begin_round(interaction, game, secret, hint, game.auto["lives"], entry)
+    )
+
+async def run_game_action(interaction, action, *args):
+    """Esegue ``action(interaction, *args)`` nella coda della partita e risponde con il suo risultato.
+
+    Con la partita libera l'azione è già finita e la risposta parte subito. Se deve aspettare il
+    suo turno, l'interazione viene confermata prima (Discord concede 3 secondi) e il risultato va nel followup.
+    """
+    future = game_actions.submit(games.key_of(interaction), action, interaction, *args)
+    if future.done():
+        await interaction.response.send_message(**future.result())
+        return
+    await interaction.response.defer()
+    await send_followup(interaction, await future)
+
+async def send_followup(interaction, response):
+    if response.get("ephemeral"):
+        # Il primo followup sostituisce il messaggio pubblico del defer: una risposta privata ne prende il posto
+        await interaction.delete_original_response()
+    await interaction.followup.send(**response)
+
+def settle_round(interaction, game, winner=None):
+    """Chiusura del round (vittoria o /end_game): statistiche calcolate una volta sola"""
+    summary = game.settle(winner)
+    result = "win" if winner is not None else "ended"
+    rounds_counter.inc(result=result)
+    round_players.observe(summary["players"])
+    if summary["eliminated"]:
+        elimination_counter.inc(summary["eliminated"])
+    record_play(
+        interaction, game, SETTLE, int(winner) if winner is not None else 0, result,
+        summary["players"], summary["eliminated"]
+    )
+    if winner is not None and game.auto is not None:
+        schedule_next_round(interaction)
+    return summary
+
+async def query_rankings(*reads):
+    """Risultati di più letture ``(op, *args)``; con l'aggregatore un solo round trip, in un thread"""
+    if RANKING_BACKEND == "remote":
+        return await rankings.read_many(reads)
+    return [read_ranking(op, args) for op, *args in reads]
+
+async def query_ranking(op, *args):
+    return (await query_rankings((op, *args)))[0]
+
+async def reply_rankings_unavailable(interaction):
+    reply = catalog.reply("rankings_unavailable", catalog.locale_of(interaction), ephemeral=True)
+    if interaction.response.is_done():
+        await interaction.followup.send(**reply)
+    else:
+        await interaction.response.send_message(**reply)
+
+def get_ranking_name(daily_entry, historical_entry):
+    """Nome salvato nelle classifiche, se il membro non è raggiungibile"""
+    entry = daily_entry or historical_entry
+    return entry["name"] if entry else "Unknown"
+
+RANKING_TITLES = {"daily_ranking": "ranking_daily_title", "historical_ranking": "ranking_historical_title"}
+
+async def render_ranking_page(key, locale, page, players, highlight=None):
+    """Embed di una pagina: legge solo le sue righe dallo store (niente ordinamento)"""
+    start = page * RANKING_PAGE_SIZE
+    lines = []
+    for i, (user_id, player_data) in enumerate(await query_ranking("page", key, start, RANKING_PAGE_SIZE), start + 1):
+        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+        line = catalog.text("ranking_line", locale, medal=medal, name=player_data["name"], points=player_data["points"])
+        lines.append(catalog.text("ranking_line_me", locale, line=line) if user_id == highlight else line)
+
+    return catalog.embed(
+        "ranking", locale,
+        title=catalog.text(RANKING_TITLES[key], locale),
+        lines="\n".join(lines) + "\n" if lines else catalog.text("no_players", locale),
+        page=page + 1,
+        pages=ranking_page_count(players),
+        players=players
+    )
+
+def ranking_page_count(players):
+    return max(1, -(-players // RANKING_PAGE_SIZE))
+
+async def get_ranking_embed(key, locale, players):
+    """Prima pagina, ricostruita solo quando la top 10 (o il numero di giocatori) cambia"""
+    version = (await query_ranking("top_version", key), players)
+    cached = ranking_embeds.get((key, locale))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    embed = await render_ranking_page(key, locale, 0, players)
+    ranking_embeds[(key, locale)] = (version, embed)
+    return embed
+
+class RankingView(discord.ui.View):
+    """Pulsanti di /ranking: pagina precedente / successiva e "la mia posizione".
+
+    Le pagine si renderizzano solo quando qualcuno ci arriva; oltre la prima
+    (che segue ``top_version``) restano in cache per ``RANKING_PAGE_TTL``
+    secondi in questa vista. "La mia posizione" risponde solo a chi preme,
+    con la sua pagina, senza spostare il messaggio condiviso.
+    """
+
+    def __init__(self, key, locale, players):
+        super().__init__(timeout=RANKING_VIEW_TIMEOUT)
+        self.key = key
+        self.locale = locale
+        self.players = players
+        self.page = 0
+        self.pages = {}
+        self.message = None
+        self.update_buttons()
+
+    async def render(self, page):
+        if page == 0:
+            return await get_ranking_embed(self.key, self.locale, self.players)
+        now = time.monotonic()
+        cached = self.pages.get(page)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        embed = await render_ranking_page(self.key, self.locale, page, self.players)
+        self.pages[page] = (now + RANKING_PAGE_TTL, embed)
+        return embed
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= ranking_page_count(self.players) - 1
+
+    async def show(self, interaction, page):
+        players = await query_ranking("count", self.key)
+        if players != self.players:
+            # Numero di pagine cambiato: i footer in cache sono vecchi
+            self.players = players
+            self.pages.clear()
+        self.page = min(max(page, 0), ranking_page_count(players) - 1)
+        if self.page:
+            await settle_ranking_writes()
+        self.update_buttons()
+        await interaction.response.edit_message(embed=await self.render(self.page), view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page - 1)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
+
+    @discord.ui.button(label="My rank / La mia posizione", emoji="📍", style=discord.ButtonStyle.primary)
+    async def my_rank(self, interaction: discord.Interaction, button: discord.ui.Button):
+        locale = catalog.locale_of(interaction)
+        uid = str(interaction.user.id)
+        position, entry, rank, players = await query_rankings(
+            ("position_of", self.key, uid), ("get", self.key, uid), ("rank_of", self.key, uid), ("count", self.key)
+        )
+        if position is None:
+            await interaction.response.send_message(**catalog.reply("ranking_not_ranked", locale, ephemeral=True))
+            return
+        await settle_ranking_writes()
+        await interaction.response.send_message(
+            **catalog.reply("ranking_my_rank", locale, ephemeral=True, rank=rank, points=entry["points"]),
+            embed=await render_ranking_page(self.key, locale, position // RANKING_PAGE_SIZE, players, highlight=uid)
+        )
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return await accept_interaction(interaction)
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item: discord.ui.Item):
+        if isinstance(error, RankingUnavailable):
+            await reply_rankings_unavailable(interaction)
+            return
+        await super().on_error(interaction, error, item)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+def get_current_pattern(game):
+    """Patrón actual con letras adivinadas (mantenido incrementalmente)"""
+    return game.compiled.pattern
 
 # ================= EVENTS =================
 
 @bot.event
 async def on_ready():
+    # on_ready arriva anche a ogni riconnessione: l'avvio si fa una volta sola
+    global ready_once
+    if ready_once:
+        print(f"Impiccato Bot riconnesso come {bot.user}")
+        return
+    ready_once = True
+
     load_data()
-    check_daily_reset.start()
-    await bot.tree.sync()
+    data_writer.start()
+    state_writer.start()
+    analytics_writer.start()
+    await load_word_bank()
+    if metrics_server is not None:
+        await metrics_server.start("hangman")
+    # Con più shard il reset giornaliero lo fa solo l'aggregatore
+    if ROLE == "standalone":
+        start_daily_reset()
+    metrics.startup_milestone("hangman", "ready")
+    await sync_app_commands()
     print(f"Impiccato Bot conectado como {bot.user}")
 
-@tasks.loop(hours=1)
-async def check_daily_reset():
-    today = datetime.now().date().isoformat()
-    if persistent_data["last_reset"] != today:
-        persistent_data["daily_ranking"] = {}
-        persistent_data["last_reset"] = today
-        save_data()
+@bot.event
+async def on_member_update(before, after):
+    # Nome cambiato: /status non deve mostrare quello vecchio fino alla scadenza del TTL
+    if before.display_name != after.display_name:
+        member_names.forget(after.guild.id, after.id)
+
+@bot.event
+async def on_member_remove(member):
+    member_names.forget(member.guild.id, member.id)
+
+async def sync_app_commands():
+    guild = discord.Object(id=int(SYNC_GUILD)) if SYNC_GUILD else None
+    try:
+        synced = await sync_commands(bot.tree, COMMAND_SYNC_FILE, guild=guild, mode=COMMAND_SYNC)
+    except discord.HTTPException as e:
+        print(f"⚠️ Command sync failed: {e}")
+        return
+    print("🔄 Commands synced" if synced else "✅ Commands unchanged, sync skipped")
+    metrics.startup_milestone("hangman", "commands_synced")
+
+async def accept_interaction(interaction):
+    """Controllo globale: durante l'arresto i nuovi comandi ricevono solo un avviso"""
+    if lifecycle.admit():
+        return True
+    await interaction.response.send_message(**catalog.reply("shutting_down", catalog.locale_of(interaction), ephemeral=True))
+    return False
+
+bot.tree.interaction_check = accept_interaction
+
+async def stop_auto_rounds(timeout):
+    # I round automatici in attesa ripartono dal prossimo /start_game dopo il riavvio
+    for task in list(auto_rounds):
+        task.cancel()
+    await asyncio.gather(*auto_rounds, return_exceptions=True)
+
+async def wait_background_tasks(timeout):
+    if background_tasks:
+        await asyncio.wait(list(background_tasks), timeout=timeout)
+
+lifecycle.on_drain("game_actions", game_actions.drain)
+lifecycle.on_drain("auto_rounds", stop_auto_rounds)
+lifecycle.on_drain("archives", wait_background_tasks)
+lifecycle.on_flush("rankings", lambda: data_writer.close())
+lifecycle.on_flush("games", state_writer.close)
+lifecycle.on_flush("analytics", analytics_writer.close)
+if metrics_server is not None:
+    lifecycle.on_flush("metrics", metrics_server.close)
 
 def is_owner():
     async def predicate(interaction: discord.Interaction):
-        return interaction.guild and interaction.user.id == interaction.guild.owner_id
+        return permissions.is_owner_or_moderator(interaction)
     return app_commands.check(predicate)
 
 # ================= COMMANDS =================
 
 @bot.tree.command(name="start_game", description="Start a new game / Inizia una nuova partita")
 @app_commands.describe(
-    secret="The secret word or phrase / La parola o frase segreta",
+    secret="The secret word or phrase (empty = word bank) / La parola o frase segreta (vuota = banca di parole)",
     hint="Hint for players / Indizio per i giocatori",
-    lives="Initial lives for each player / Vite iniziali per ogni giocatore"
+    lives="Initial lives for each player (empty = server rules) / Vite iniziali per ogni giocatore (vuoto = regole del server)",
+    auto="Start the next round from the word bank after each win / Avvia il round successivo dalla banca dopo ogni vittoria",
+    difficulty="Word bank difficulty / Difficoltà della banca di parole",
+    language="Word bank language code, e.g. it / Lingua della banca di parole, es. it"
 )
+@app_commands.choices(difficulty=[
+    app_commands.Choice(name="Easy / Facile", value="easy"),
+    app_commands.Choice(name="Medium / Media", value="medium"),
+    app_commands.Choice(name="Hard / Difficile", value="hard")
+])
 @is_owner()
-async def start_game(interaction: discord.Interaction, secret: str, hint: str, lives: int = 5):
-    if game_state["active"]:
-        await interaction.response.send_message("❌ There's already an active game!", ephemeral=True)
-        return
-
-    game_state.update({
-        "active": True,
-        "round_number": game_state["round_number"] + 1,
-        "lose_points_mode": False,
-        "secret": secret.upper(),
-        "hint": hint,
-        "secret_normalized": normalize_text(secret),
-        "letters_needed": get_letters_in_phrase(secret),
-        "letters_found": set(),
-        "wrong_letters": set(),
-        "players": {},
-        "last_player": None,
-        "initial_lives": lives
-    })
-
-    pattern = get_initial_pattern(secret)
-    lengths = get_word_lengths(secret)
-
-    await interaction.response.send_message(
-        f"**🎮 ROUND {game_state['round_number']}**\n\n"
-        f"**Parola/frase:** `{pattern}` ({lengths})\n\n"
-        f"**Tips:**\n*{hint}*\n\n"
-        f"Use `/l <letter>` to guess a letter or `/w <phrase>` to guess the word!\n"
-        f"Usa `/l <lettera>` per indovinare una lettera o `/w <frase>` per indovinare la parola!\n\n"
-        f"❤️ Lives / Vite: **{lives}**"
-    )
+@metrics.timed("hangman", "start_game")
+async def start_game(
+    interaction: discord.Interaction, secret: str = None, hint: str = None, lives: int = None,
+    auto: bool = False, difficulty: str = None, language: str = None
+):
+    await run_game_action(interaction, play_start, secret, hint, lives, auto, difficulty, language)
+
+def play_start(interaction, secret, hint, lives, auto=False, difficulty=None, language=None):
+    locale = catalog.locale_of(interaction)
+    game = get_game(interaction)
+    if game.active:
+        return catalog.reply("game_already_active", locale, ephemeral=True)
+    if (secret is None or auto) and word_bank is None:
+        return catalog.reply("bank_missing", locale, ephemeral=True)
+    if difficulty not in (None,) + DIFFICULTIES:
+        difficulty = None
+    language = language.lower() if language else None
+
+    entry = None
+    if secret is None:
+        puzzle = draw_puzzle(game, locale, difficulty, language)
+        if puzzle is None:
+            return catalog.reply("bank_no_match", locale, ephemeral=True)
+        secret, hint, entry = puzzle
+    game.auto = {"lives": lives, "difficulty": difficulty, "language": language} if auto else None
+
+    return catalog.reply("round_started", locale, **begin_round(interaction, game, secret, hint or default_hint(secret, locale), lives, entry))
 
 @bot.tree.command(name="l", description="Guess a letter / Indovina una lettera")
 @app_commands.describe(letter="The letter to guess / La lettera da indovinare")
+@metrics.timed("hangman", "l")
 async def guess_letter(interaction: discord.Interaction, letter: str):
-    if not game_state["active"]:
-        await interaction.response.send_message("❌ No active game! / Nessuna partita attiva!", ephemeral=True)
-        return
-
     if len(letter) != 1 or not letter.isalpha():
-        await interaction.response.send_message("❌ Please provide only one letter! / Fornisci solo una lettera!", ephemeral=True)
+        await interaction.response.send_message(**catalog.reply("one_letter_only", catalog.locale_of(interaction), ephemeral=True))
         return
 
-    uid = str(interaction.user.id)
-
-    if uid not in game_state["players"]:
-        game_state["players"][uid] = {
-            "lives": game_state["initial_lives"],
-            "eliminated": False
-        }
+    await run_game_action(interaction, play_letter, letter)
 
-    player = game_state["players"][uid]
+def play_letter(interaction, letter):
+    """Giocata di /l, eseguita in ordine nella coda della partita"""
+    locale = catalog.locale_of(interaction)
+    game = get_game(interaction)
+    if not game.active:
+        return catalog.reply("no_game", locale, ephemeral=True)
 
-    if player["eliminated"]:
-        await interaction.response.send_message(
-            f"❌ {interaction.user.mention} you are eliminated! Your message doesn't count. / "
-            f"sei eliminato! Il tuo messaggio non conta.",
-            ephemeral=True
-        )
-        return
-
-    if game_state["last_player"] == uid:
-        await interaction.response.send_message(
-            f"⏳ {interaction.user.mention} wait for another player's turn! / aspetta il turno di un altro giocatore!",
-            ephemeral=True
-        )
-        return
-
-    normalized = normalize_text(letter)
-    game_state["last_player"] = uid
+    uid = str(interaction.user.id)
+    mention = interaction.user.mention
+    outcome = game.guess_letter(uid, letter)
+    record_play(interaction, game, LETTER, interaction.user.id, outcome, letter_code(letter), game.players[uid].lives)
+
+    if outcome == ELIMINATED:
+        return catalog.reply("eliminated_no_count", locale, ephemeral=True, mention=mention)
+
+    if outcome == WAIT_TURN:
+        return catalog.reply("wait_turn", locale, ephemeral=True, mention=mention)
+
+    log_game_event(interaction, "letter", u=uid, v=letter)
+    player = game.players[uid]
+    count_guess("letter", outcome)
+    name = interaction.user.display_name
+
+    rules = game.rules
+    with scoring() as score:
+        if outcome in (CORRECT, WIN):
+            score.add(uid, name, rules.letter_points)
+            if outcome == WIN:
+                score.add(uid, name, rules.win_bonus)
+                settle_round(interaction, game, winner=uid)
+        elif game.lose_points_mode and (outcome != REPEATED or rules.repeat_penalty):
+            score.add(uid, name, -rules.wrong_penalty)
+        earned = score.points_of(uid)
 
     # 🔁 REPEATED LETTER
-    if normalized in game_state["letters_found"] or normalized in game_state["wrong_letters"]:
-        if game_state["lose_points_mode"]:
-            add_points_to_player(uid, interaction.user.display_name, -1)
-            await interaction.response.send_message(
-                f"🔁 {interaction.user.mention} that letter was already said! -1 point 🔴 / "
-                f"quella lettera è già stata detta! -1 punto 🔴"
-            )
-        else:
-            player["lives"] -= 1
-            
-            if player["lives"] <= 0:
-                player["eliminated"] = True
-                await interaction.response.send_message(
-                    f"🔁 {interaction.user.mention} that letter was already said! -1 life ❤️ / "
-                    f"quella lettera è già stata detta! -1 vita ❤️\n"
-                    f"💀 {interaction.user.mention} has been eliminated! / è stato eliminato!"
-                )
-            else:
-                await interaction.response.send_message(
-                    f"🔁 {interaction.user.mention} that letter was already said! -1 life ❤️ / "
-                    f"quella lettera è già stata detta! -1 vita ❤️\n"
-                    f"Lives remaining / Vite rimanenti: **{player['lives']}**"
-                )
-        return
+    if outcome == REPEATED:
+        if not rules.repeat_penalty:
+            return catalog.reply("repeated_free", locale, ephemeral=True, mention=mention)
+        if game.lose_points_mode:
+            return catalog.reply("repeated_points", locale, mention=mention, points=rules.wrong_penalty)
+        if player.eliminated:
+            return catalog.reply("repeated_eliminated", locale, mention=mention)
+        return catalog.reply("repeated_lives", locale, mention=mention, lives=player.lives)
 
     # ✅ CORRECT LETTER
-    if normalized in game_state["letters_needed"]:
-        game_state["letters_needed"].remove(normalized)
-        game_state["letters_found"].add(normalized)
-        add_points_to_player(uid, interaction.user.display_name, 1)
-
-        if check_last_letter_win():
-            game_state["active"] = False
-            add_points_to_player(uid, interaction.user.display_name, 4)
-
-            embed = discord.Embed(
-                title="🎉 VICTORY! / VITTORIA! 🎉",
-                description=f"**{interaction.user.mention}** found the last letter! / ha trovato l'ultima lettera!",
-                color=discord.Color.gold()
-            )
-            embed.add_field(name="Answer / Risposta", value=f"**{game_state['secret']}**", inline=False)
-            embed.add_field(name="Points / Punti", value="+5 🌟", inline=False)
-
-            await interaction.response.send_message(embed=embed)
-        else:
-            await interaction.response.send_message("✓", ephemeral=True,)
+    if outcome == WIN:
+        return catalog.embed_reply("victory_letter", locale, mention=mention, secret=game.secret, points=earned)
 
     # ❌ WRONG LETTER
-    else:
-        game_state["wrong_letters"].add(normalized)
-
-        if game_state["lose_points_mode"]:
-            add_points_to_player(uid, interaction.user.display_name, -1)
-            await interaction.response.send_message("✓", ephemeral=True,)
-        else:
-            player["lives"] -= 1
-
-            if player["lives"] <= 0:
-                player["eliminated"] = True
-                await interaction.response.send_message(
-                    f"💀 {interaction.user.mention} has been eliminated! / è stato eliminato!"
-                )
-            else:
-                await interaction.response.send_message("✓", ephemeral=True,)
+    if outcome != CORRECT and not game.lose_points_mode and player.eliminated:
+        return catalog.reply("eliminated", locale, mention=mention)
+    return catalog.reply("ok", locale, ephemeral=True)
 
 @bot.tree.command(name="w", description="Guess the word or phrase / Indovina la parola o frase")
 @app_commands.describe(word="The word or phrase / La parola o frase")
+@metrics.timed("hangman", "w")
 async def guess_word(interaction: discord.Interaction, word: str):
-    if not game_state["active"]:
-        await interaction.response.send_message("❌ No active game! / Nessuna partita attiva!", ephemeral=True)
-        return
+    await run_game_action(interaction, play_word, word)
+
+def play_word(interaction, word):
+    """Giocata di /w, eseguita in ordine nella coda della partita"""
+    locale = catalog.locale_of(interaction)
+    game = get_game(interaction)
+    if not game.active:
+        return catalog.reply("no_game", locale, ephemeral=True)
 
     uid = str(interaction.user.id)
+    mention = interaction.user.mention
+    outcome = game.guess_word(uid, word)
+    record_play(interaction, game, WORD, interaction.user.id, outcome, len(word), game.players[uid].lives)
 
-    if uid not in game_state["players"]:
-        game_state["players"][uid] = {
-            "lives": game_state["initial_lives"],
-            "eliminated": False
-        }
+    if outcome == ELIMINATED:
+        return catalog.reply("eliminated_no_count", locale, ephemeral=True, mention=mention)
 
-    player = game_state["players"][uid]
+    if outcome == WAIT_TURN:
+        return catalog.reply("wait_turn", locale, ephemeral=True, mention=mention)
 
-    if player["eliminated"]:
-        await interaction.response.send_message(
-            f"❌ {interaction.user.mention} you are eliminated! Your message doesn't count. / "
-            f"sei eliminato! Il tuo messaggio non conta.",
-            ephemeral=True
-        )
-        return
-
-    if game_state["last_player"] == uid:
-        await interaction.response.send_message(
-            f"⏳ {interaction.user.mention} wait for another player's turn! / aspetta il turno di un altro giocatore!",
-            ephemeral=True
-        )
-        return
+    log_game_event(interaction, "word", u=uid, v=word)
+    player = game.players[uid]
+    count_guess("word", outcome)
+    name = interaction.user.display_name
 
-    game_state["last_player"] = uid
+    with scoring() as score:
+        if outcome == WIN:
+            score.add(uid, name, game.rules.word_points)
+            settle_round(interaction, game, winner=uid)
+        elif game.lose_points_mode:
+            score.add(uid, name, -game.rules.wrong_penalty)
+        earned = score.points_of(uid)
 
     # ✅ CORRECT WORD
-    if normalize_text(word) == game_state["secret_normalized"]:
-        game_state["active"] = False
-        add_points_to_player(uid, interaction.user.display_name, 5)
-
-        embed = discord.Embed(
-            title="🎉 VICTORY! / VITTORIA! 🎉",
-            description=f"**{interaction.user.mention}** guessed the phrase! / ha indovinato la frase!",
-            color=discord.Color.gold()
-        )
-        embed.add_field(name="Answer / Risposta", value=f"**{game_state['secret']}**", inline=False)
-        embed.add_field(name="Points / Punti", value="+5 🌟", inline=False)
-
-        await interaction.response.send_message(embed=embed)
+    if outcome == WIN:
+        return catalog.embed_reply("victory_word", locale, mention=mention, secret=game.secret, points=earned)
 
     # ❌ WRONG WORD
-    else:
-        if game_state["lose_points_mode"]:
-            add_points_to_player(uid, interaction.user.display_name, -1)
-            await interaction.response.send_message("✓", ephemeral=True,)
-        else:
-            player["lives"] -= 1
-
-            if player["lives"] <= 0:
-                player["eliminated"] = True
-                await interaction.response.send_message(
-                    f"💀 {interaction.user.mention} has been eliminated! / è stato eliminato!"
-                )
-            else:
-                await interaction.response.send_message("✓", ephemeral=True,)
+    if not game.lose_points_mode and player.eliminated:
+        return catalog.reply("eliminated", locale, mention=mention)
+    return catalog.reply("ok", locale, ephemeral=True)
 
 @bot.tree.command(name="status", description="View game status (owner only) / Visualizza stato partita (solo proprietario)")
 @is_owner()
+@metrics.timed("hangman", "status")
 async def status(interaction: discord.Interaction):
-    if not game_state["active"]:
-        await interaction.response.send_message("❌ No active game! / Nessuna partita attiva!", ephemeral=True)
+    locale = catalog.locale_of(interaction)
+    # Punti e nomi possono richiedere chiamate a Discord: si conferma subito
+    await interaction.response.defer(ephemeral=True)
+    snapshot = await game_actions.submit(games.key_of(interaction), play_status, interaction)
+    if snapshot is None:
+        await interaction.followup.send(**catalog.reply("no_game", locale, ephemeral=True))
         return
 
-    # Patrón con letras adivinadas
-    current_pattern = get_current_pattern()
-    
-    # Estadísticas
-    total_letters_said = len(game_state["letters_found"]) + len(game_state["wrong_letters"])
-    letters_guessed = len(game_state["letters_found"])
-    letters_remaining = len(game_state["letters_needed"])
-    
+    fields, players = snapshot
     # Información de jugadores
     players_info = []
-    for uid, data in game_state["players"].items():
-        try:
-            member = await interaction.guild.fetch_member(int(uid))
-            name = member.display_name
-        except:
-            # Buscar en rankings como fallback
-            uid_str = str(uid)
-            if uid_str in persistent_data["daily_ranking"]:
-                name = persistent_data["daily_ranking"][uid_str]["name"]
-            elif uid_str in persistent_data["historical_ranking"]:
-                name = persistent_data["historical_ranking"][uid_str]["name"]
-            else:
-                name = "Unknown"
-        
-        # Obtener puntos del ranking
-        points = persistent_data["daily_ranking"].get(str(uid), {}).get("points", 0)
-        
-        status_emoji = "💀" if data["eliminated"] else "✅"
-        players_info.append(
-            f"{status_emoji} **{name}**: {data['lives']}❤️ | {points}⭐"
-        )
-    
-    embed = discord.Embed(
-        title=f"📊 Game Status - Round {game_state['round_number']}",
-        color=discord.Color.blue()
-    )
-    
-    embed.add_field(
-        name="🔤 Current Progress / Progresso Attuale",
-        value=f"`{current_pattern}`",
-        inline=False
+    # Punti e nomi di riserva di tutti i giocatori in una sola lettura
+    entries = await query_rankings(*(
+        ("get", ranking, uid) for uid, _, _ in players for ranking in ("daily_ranking", "historical_ranking")
+    ))
+    saved = {uid: entries[2 * i:2 * i + 2] for i, (uid, _, _) in enumerate(players)}
+    names = await member_names.resolve(
+        interaction.guild, [uid for uid, _, _ in players],
+        fallback=lambda uid: get_ranking_name(*saved[uid])
     )
-    
-    embed.add_field(
-        name="📈 Statistics / Statistiche",
-        value=(
-            f"**Letters said / Lettere dette:** {total_letters_said}\n"
-            f"**Letters guessed / Lettere indovinate:** {letters_guessed}\n"
-            f"**Letters remaining / Lettere mancanti:** {letters_remaining}"
-        ),
-        inline=False
+    for uid, eliminated, lives in players:
+        # Obtener puntos del ranking
+        daily_entry = saved[uid][0]
+        players_info.append(catalog.text(
+            "status_player", locale,
+            emoji="💀" if eliminated else "✅",
+            name=names[uid],
+            lives=lives,
+            points=daily_entry["points"] if daily_entry else 0
+        ))
+
+    embed = catalog.embed(
+        "status", locale,
+        players="\n".join(players_info) if players_info else catalog.text("no_players", locale),
+        **fields
     )
-    
-    if players_info:
-        embed.add_field(
-            name="👥 Players / Giocatori",
-            value="\n".join(players_info),
-            inline=False
-        )
-    else:
-        embed.add_field(
-            name="👥 Players / Giocatori",
-            value="No players yet / Ancora nessun giocatore",
-            inline=False
-        )
-    
-    mode = "🔴 Points Mode" if game_state["lose_points_mode"] else "❤️ Lives Mode"
-    embed.set_footer(text=f"Mode / Modalità: {mode}")
-    
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+def play_status(interaction):
+    """Fotografia della partita per /status, presa nella sua coda; None se non c'è partita.
+
+    Punti e nomi si leggono dopo, fuori dalla coda: le giocate non aspettano le chiamate a Discord.
+    """
+    locale = catalog.locale_of(interaction)
+    game = get_game(interaction)
+    if not game.active:
+        return None
+
+    fields = {
+        "round": game.round_number,
+        # Patrón con letras adivinadas y estadísticas
+        "pattern": get_current_pattern(game),
+        "said": len(game.letters_found) + len(game.wrong_letters),
+        "guessed": len(game.letters_found),
+        "remaining": len(game.letters_needed),
+        "mode": catalog.text("mode_points" if game.lose_points_mode else "mode_lives", locale),
+    }
+    players = [(uid, player.eliminated, player.lives) for uid, player in game.players.items()]
+    return fields, players
 
 @bot.tree.command(name="add_lives", description="Add lives to a player / Aggiungi vite a un giocatore")
 @app_commands.describe(
@@ -409,33 +1071,25 @@ async def status(interaction: discord.Interaction):
     lives="Number of lives to add / Numero di vite da aggiungere"
 )
 @is_owner()
+@metrics.timed("hangman", "add_lives")
 async def add_lives(interaction: discord.Interaction, user: discord.Member, lives: int = 1):
-    if not game_state["active"]:
-        await interaction.response.send_message("❌ No active game! / Nessuna partita attiva!", ephemeral=True)
-        return
+    await run_game_action(interaction, play_add_lives, user, lives)
 
-    uid = str(user.id)
+def play_add_lives(interaction, user, lives):
+    locale = catalog.locale_of(interaction)
+    game = get_game(interaction)
+    if not game.active:
+        return catalog.reply("no_game", locale, ephemeral=True)
 
-    if uid not in game_state["players"]:
-        game_state["players"][uid] = {
-            "lives": game_state["initial_lives"],
-            "eliminated": False
-        }
+    uid = str(user.id)
+    player = game.add_lives(uid, lives)
 
-    if game_state["players"][uid]["eliminated"]:
-        await interaction.response.send_message(
-            f"❌ {user.mention} is eliminated and cannot receive lives! / "
-            f"{user.mention} è eliminato e non può ricevere vite!",
-            ephemeral=True
-        )
-        return
+    if player is None:
+        return catalog.reply("lives_eliminated", locale, ephemeral=True, mention=user.mention)
 
-    game_state["players"][uid]["lives"] += lives
+    log_game_event(interaction, "lives", u=uid, n=lives)
 
-    await interaction.response.send_message(
-        f"✅ Added {lives} life/lives to {user.mention}! New total: {game_state['players'][uid]['lives']} ❤️ / "
-        f"Aggiunte {lives} vita/vite a {user.mention}! Nuovo totale: {game_state['players'][uid]['lives']} ❤️"
-    )
+    return catalog.reply("lives_added", locale, lives=lives, mention=user.mention, total=player.lives)
 
 @bot.tree.command(name="add_points", description="Add points to a player / Aggiungi punti a un giocatore")
 @app_commands.describe(
@@ -443,26 +1097,32 @@ async def add_lives(interaction: discord.Interaction, user: discord.Member, live
     points="Number of points to add / Numero di punti da aggiungere"
 )
 @is_owner()
+@metrics.timed("hangman", "add_points")
 async def add_points_cmd(interaction: discord.Interaction, user: discord.Member, points: int = 1):
     add_points_to_player(str(user.id), user.display_name, points)
-    
+
     await interaction.response.send_message(
-        f"✅ Added {points} point(s) to {user.mention}! / Aggiunti {points} punto/i a {user.mention}!"
+        **catalog.reply("points_added", catalog.locale_of(interaction), points=points, mention=user.mention)
     )
 
 @bot.tree.command(name="end_game", description="End current game / Termina partita corrente")
 @is_owner()
+@metrics.timed("hangman", "end_game")
 async def end_game(interaction: discord.Interaction):
-    if not game_state["active"]:
-        await interaction.response.send_message("❌ No active game! / Nessuna partita attiva!", ephemeral=True)
-        return
+    await run_game_action(interaction, play_end)
 
-    secret = game_state["secret"]
-    game_state["active"] = False
+def play_end(interaction):
+    locale = catalog.locale_of(interaction)
+    game = get_game(interaction)
+    if not game.active:
+        return catalog.reply("no_game", locale, ephemeral=True)
 
-    await interaction.response.send_message(
-        f"🏁 Game ended! The answer was: **{secret}** / Partita terminata! La risposta era: **{secret}**"
-    )
+    secret = game.secret
+    game.auto = None
+    settle_round(interaction, game)
+    log_game_event(interaction, "end")
+
+    return catalog.reply("game_ended", locale, secret=secret)
 
 @bot.tree.command(name="ranking", description="Show rankings / Mostra classifiche")
 @app_commands.describe(type="Ranking type / Tipo di classifica")
@@ -471,74 +1131,192 @@ async def end_game(interaction: discord.Interaction):
     app_commands.Choice(name="Historical / Storica", value="historical")
 ])
 @is_owner()
+@metrics.timed("hangman", "ranking")
 async def ranking(interaction: discord.Interaction, type: str = "daily"):
-    if type == "daily":
-        data = persistent_data["daily_ranking"]
-        title = "🏆 Daily Ranking / Classifica Giornaliera 🏆"
-    else:
-        data = persistent_data["historical_ranking"]
-        title = "🏆 Historical Ranking / Classifica Storica 🏆"
+    locale = catalog.locale_of(interaction)
+    key = "daily_ranking" if type == "daily" else "historical_ranking"
 
-    if not data:
-        await interaction.response.send_message("📊 No data yet! / Ancora nessun dato!", ephemeral=True)
+    players = await query_ranking("count", key)
+    if not players:
+        await interaction.response.send_message(**catalog.reply("ranking_empty", locale, ephemeral=True))
         return
 
-    sorted_players = sorted(data.items(), key=lambda x: x[1]["points"], reverse=True)[:10]
-
-    embed = discord.Embed(title=title, color=discord.Color.gold())
+    view = RankingView(key, locale, players)
+    await interaction.response.send_message(embed=await view.render(0), view=view)
+    view.message = await interaction.original_response()
+
+@bot.tree.command(name="export_ranking", description="Export a full ranking as a file / Esporta una classifica completa in un file")
+@app_commands.describe(type="Ranking type / Tipo di classifica", format="File format / Formato del file")
+@app_commands.choices(
+    type=[
+        app_commands.Choice(name="Daily / Giornaliera", value="daily"),
+        app_commands.Choice(name="Historical / Storica", value="historical")
+    ],
+    format=[
+        app_commands.Choice(name="CSV", value="csv"),
+        app_commands.Choice(name="NDJSON", value="ndjson")
+    ]
+)
+@is_owner()
+@metrics.timed("hangman", "export_ranking")
+async def export_ranking(interaction: discord.Interaction, type: str = "daily", format: str = "csv"):
+    locale = catalog.locale_of(interaction)
+    key = "daily_ranking" if type == "daily" else "historical_ranking"
+
+    players = await query_ranking("count", key)
+    if not players:
+        await interaction.response.send_message(**catalog.reply("ranking_empty", locale, ephemeral=True))
+        return
 
-    ranking_text = ""
-    for i, (user_id, player_data) in enumerate(sorted_players, 1):
-        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-        ranking_text += f"{medal} **{player_data['name']}** - {player_data['points']} pts\n"
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    path = await export_ranking_file(key, format)
+    try:
+        size = os.path.getsize(path)
+        limit = interaction.guild.filesize_limit
+        if size > limit:
+            await interaction.followup.send(**catalog.reply(
+                "ranking_export_too_large", locale, ephemeral=True,
+                size=size // (1 << 20), limit=limit // (1 << 20)
+            ))
+            return
+        await interaction.followup.send(
+            **catalog.reply("ranking_export_ready", locale, ephemeral=True, players=players),
+            file=discord.File(path, filename=f"{key}-{daily_boundary.today()}.{format}")
+        )
+    finally:
+        os.remove(path)
 
-    embed.description = ranking_text if ranking_text else "No players yet / Ancora nessun giocatore"
+@bot.tree.command(name="import_ranking", description="Import or merge a ranking from a file / Importa o unisci una classifica da un file")
+@app_commands.describe(
+    file="CSV or NDJSON with user_id, name, points / CSV o NDJSON con user_id, name, points",
+    type="Ranking type / Tipo di classifica",
+    mode="Add to the current points or replace them / Somma ai punti attuali o sostituiscili"
+)
+@app_commands.choices(
+    type=[
+        app_commands.Choice(name="Daily / Giornaliera", value="daily"),
+        app_commands.Choice(name="Historical / Storica", value="historical")
+    ],
+    mode=[
+        app_commands.Choice(name="Merge / Unisci", value="merge"),
+        app_commands.Choice(name="Replace / Sostituisci", value="replace")
+    ]
+)
+@is_owner()
+@metrics.timed("hangman", "import_ranking")
+async def import_ranking(interaction: discord.Interaction, file: discord.Attachment, type: str = "daily", mode: str = "merge"):
+    locale = catalog.locale_of(interaction)
+    key = "daily_ranking" if type == "daily" else "historical_ranking"
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    fd, path = tempfile.mkstemp(prefix=f"{key}-import-")
+    os.close(fd)
+    try:
+        await download_attachment(file, path)
+        rows, players, skipped = await import_ranking_file(path, key, mode == "merge")
+    except (aiohttp.ClientError, UnicodeDecodeError, ValueError) as e:
+        await interaction.followup.send(**catalog.reply("ranking_import_failed", locale, ephemeral=True, error=e))
+        return
+    finally:
+        os.remove(path)
 
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(**catalog.reply(
+        "ranking_import_done", locale, ephemeral=True, rows=rows, players=players, skipped=skipped
+    ))
 
 @bot.tree.command(name="reset_daily", description="Reset daily ranking / Resetta classifica giornaliera")
 @is_owner()
+@metrics.timed("hangman", "reset_daily")
 async def reset_daily(interaction: discord.Interaction):
-    persistent_data["daily_ranking"] = {}
-    persistent_data["last_reset"] = datetime.now().date().isoformat()
-    save_data()
+    reset_ranking("daily_ranking", daily_boundary.today())
 
-    await interaction.response.send_message("✅ Daily ranking reset! / Classifica giornaliera resettata!")
+    await interaction.response.send_message(**catalog.reply("daily_reset_done", catalog.locale_of(interaction)))
 
 @bot.tree.command(name="reset_historical", description="Reset historical ranking / Resetta classifica storica")
 @is_owner()
+@metrics.timed("hangman", "reset_historical")
 async def reset_historical(interaction: discord.Interaction):
-    persistent_data["historical_ranking"] = {}
-    save_data()
+    reset_ranking("historical_ranking")
 
-    await interaction.response.send_message("✅ Historical ranking reset! / Classifica storica resettata!")
+    await interaction.response.send_message(**catalog.reply("historical_reset_done", catalog.locale_of(interaction)))
 
 @bot.tree.command(name="reset_rounds", description="Reset round counter / Resetta contatore delle ronde")
 @is_owner()
+@metrics.timed("hangman", "reset_rounds")
 async def reset_rounds(interaction: discord.Interaction):
-    game_state["round_number"] = 0
+    await run_game_action(interaction, play_reset_rounds)
+
+def play_reset_rounds(interaction):
+    get_game(interaction).round_number = 0
+    log_game_event(interaction, "rounds")
 
-    await interaction.response.send_message("✅ Round counter reset to 0! / Contatore delle ronde resettato a 0!")
+    return catalog.reply("rounds_reset_done", catalog.locale_of(interaction))
 
 @bot.tree.command(name="toggle_mode", description="Toggle between lives mode and points mode / Alterna tra modalità vite e punti")
 @is_owner()
+@metrics.timed("hangman", "toggle_mode")
 async def toggle_mode(interaction: discord.Interaction):
-    game_state["lose_points_mode"] = not game_state["lose_points_mode"]
+    await run_game_action(interaction, play_toggle_mode)
+
+def play_toggle_mode(interaction):
+    game = get_game(interaction)
+    game.lose_points_mode = not game.lose_points_mode
+    log_game_event(interaction, "mode")
+
+    key = "mode_points_active" if game.lose_points_mode else "mode_lives_active"
+    return catalog.reply(key, catalog.locale_of(interaction))
+
+def render_rules(rules, locale):
+    return "\n".join(
+        catalog.text("rules_line", locale, name=name, value=catalog.text(
+            ("rule_on" if value else "rule_off") if isinstance(value, bool) else "rule_value", locale, value=value
+        ))
+        for name, value in rules.to_dict().items()
+    )
 
-    if game_state["lose_points_mode"]:
-        mode_text = (
-            "🔴 **Points Mode Active** / **Modalità Punti Attiva**\n"
-            "Players will lose points for wrong answers instead of lives. / "
-            "I giocatori perderanno punti per risposte sbagliate invece di vite."
-        )
-    else:
-        mode_text = (
-            "❤️ **Lives Mode Active** / **Modalità Vite Attiva**\n"
-            "Players will lose lives for wrong answers. / "
-            "I giocatori perderanno vite per risposte sbagliate."
+@bot.tree.command(name="rules", description="View or change this server's game rules / Visualizza o modifica le regole del server")
+@app_commands.describe(
+    lives="Initial lives / Vite iniziali",
+    points_mode="Rounds start in points mode / I round partono in modalità punti",
+    letter_points="Points for a correct letter / Punti per una lettera giusta",
+    win_bonus="Bonus for the last letter / Bonus per l'ultima lettera",
+    word_points="Points for guessing the phrase / Punti per aver indovinato la frase",
+    wrong_penalty="Points lost for a mistake in points mode / Punti persi per un errore in modalità punti",
+    turn_rule="A player cannot play twice in a row / Un giocatore non può giocare due volte di fila",
+    repeat_penalty="A repeated letter counts as a mistake / Una lettera ripetuta conta come errore",
+    reset="Back to the default rules / Torna alle regole di default"
+)
+@is_owner()
+@metrics.timed("hangman", "rules")
+async def rules_cmd(
+    interaction: discord.Interaction, lives: int = None, points_mode: bool = None,
+    letter_points: int = None, win_bonus: int = None, word_points: int = None, wrong_penalty: int = None,
+    turn_rule: bool = None, repeat_penalty: bool = None, reset: bool = False
+):
+    locale = catalog.locale_of(interaction)
+    changes = {
+        name: value for name, value in (
+            ("lives", lives), ("points_mode", points_mode), ("letter_points", letter_points),
+            ("win_bonus", win_bonus), ("word_points", word_points), ("wrong_penalty", wrong_penalty),
+            ("turn_rule", turn_rule), ("repeat_penalty", repeat_penalty)
+        ) if value is not None
+    }
+    if not changes and not reset:
+        rules = game_rules.compile(interaction.guild_id)
+        await interaction.response.send_message(
+            **catalog.reply("rules_current", locale, ephemeral=True, rules=render_rules(rules, locale))
         )
+        return
 
-    await interaction.response.send_message(mode_text)
+    if reset:
+        # None = regola di default; i valori indicati insieme a reset restano
+        changes = {**dict.fromkeys(RULES), **changes}
+    try:
+        rules = game_rules.update(interaction.guild_id, changes)
+    except ValueError as e:
+        await interaction.response.send_message(**catalog.reply("rules_invalid", locale, ephemeral=True, error=e))
+        return
+    await interaction.response.send_message(**catalog.reply("rules_updated", locale, rules=render_rules(rules, locale)))
 
 # ================= ERROR HANDLERS =================
 
@@ -547,26 +1325,73 @@ async def toggle_mode(interaction: discord.Interaction):
 @add_points_cmd.error
 @end_game.error
 @ranking.error
+@export_ranking.error
+@import_ranking.error
 @reset_daily.error
 @reset_historical.error
 @reset_rounds.error
 @toggle_mode.error
+@rules_cmd.error
 @status.error
 async def permission_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
     if isinstance(error, app_commands.CheckFailure):
-        await interaction.response.send_message(
-            "❌ Only the server owner can use this command! / Solo il proprietario del server può usare questo comando!",
-            ephemeral=True
-        )
+        await interaction.response.send_message(**catalog.reply("owner_only", catalog.locale_of(interaction), ephemeral=True))
+
+@bot.tree.error
+async def command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    """Chiamato dopo i gestori dei singoli comandi: i CheckFailure li hanno già gestiti"""
+    if isinstance(error, app_commands.CheckFailure):
+        return
+    if isinstance(getattr(error, "original", None), RankingUnavailable):
+        await reply_rankings_unavailable(interaction)
+        return
+    await app_commands.CommandTree.on_error(bot.tree, interaction, error)
 
 # ================= TOKEN =================
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 
-if __name__ == "__main__":
+def main():
+    if ROLE != "standalone" and not RANKING_AUTHKEY:
+        print("❌ Error: HANGMAN_RANKING_AUTHKEY not set (start the shards with launcher.py)")
+        exit(1)
+
+    if ROLE == "rankings":
+        try:
+            asyncio.run(serve_rankings())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            data_writer.flush_sync()
+            journal.close()
+            rankings.close()
+        return
+
     if not TOKEN:
         print("❌ Error: DISCORD_TOKEN not found in environment variables")
         print("Please set the environment variable before running the bot")
         exit(1)
     
-    bot.run(TOKEN)
\ No newline at end of file
+    async def run_bot():
+        # Segnali gestiti sul loop: arresto ordinato invece di KeyboardInterrupt
+        lifecycle.install(bot.close)
+        async with bot:
+            await bot.start(TOKEN)
+        await lifecycle.wait_stopped()
+
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(run_bot())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        data_writer.flush_sync()
+        state_writer.flush_sync()
+        analytics_writer.flush_sync()
+        journal.close()
+        rankings.close()
+        stats = data_writer.stats()
+        print(f"💾 Saved {stats['writes']} time(s), {stats['coalesced']} write(s) coalesced")
+
+if __name__ == "__main__":
+    main()
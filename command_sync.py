@@ -0,0 +1,61 @@
+"""Sync app commands only when the command tree changed.
+
+``tree.sync()`` is a REST call (global commands also take a while to reach
+every client), and ``on_ready`` fires again on every reconnect. The tree is
+hashed instead: the sha256 of its serialized commands is stored per
+application and scope in a small JSON file, and the sync is skipped when the
+hash matches the last successful one.
+
+With a development guild the global commands are copied to that guild and
+synced there only, so changes show up immediately without touching the
+global commands.
+"""
+import hashlib
+import json
+
+from persistence import load_json, save_json
+
+SYNC_MODES = ("auto", "always", "off")
+
+
+def _command_dict(command, tree):
+    # discord.py >= 2.4 vuole il tree, le versioni precedenti no
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        return command.to_dict()
+
+
+def tree_hash(tree, guild=None):
+    """sha256 of the commands ``tree.sync(guild=guild)`` would send."""
+    payload = sorted(
+        (_command_dict(command, tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def sync_commands(tree, state_path, *, guild=None, mode="auto"):
+    """Sync ``tree`` globally (or to ``guild``) if its hash changed.
+
+    ``mode`` is ``"auto"`` (sync on change), ``"always"`` or ``"off"``.
+    Returns True if a sync was sent.
+    """
+    if mode == "off":
+        return False
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+
+    digest = tree_hash(tree, guild)
+    scope = f"{tree.client.application_id}:{guild.id if guild is not None else 'global'}"
+    state = load_json(state_path) or {}
+    if mode != "always" and state.get(scope) == digest:
+        return False
+
+    await tree.sync(guild=guild)
+    # Rilegge il file: altri processi (shard) possono averlo aggiornato nel frattempo
+    state = load_json(state_path) or {}
+    state[scope] = digest
+    save_json(state_path, state)
+    return True
@@ -1,6 +1,18 @@
 import discord
 from discord.ext import commands
+import asyncio
+import glob
 import os
+import time
+
+import metrics
+from command_sync import sync_commands
+from lifecycle import Lifecycle
+from permissions import PermissionResolver, parse_role_ids
+from persistence import WriteBehindWriter, load_json
+from responses import catalog
+from send_queue import OutboundQueue
+from state import GameRegistry, LetterGame, decode_key, encode_key
 
 # ================= CONFIG =================
 
@@ -8,114 +20,357 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Shard assegnati da launcher.py (es. "0,1")
+SHARD_IDS = os.getenv("BOT_SHARD_IDS", "")
+# Numero totale di shard, oppure "auto" per farlo scegliere a Discord
+SHARD_COUNT = os.getenv("BOT_SHARD_COUNT", "")
+
+# Solo slash commands: senza help command il bot non ha comandi prefisso
+if SHARD_IDS or SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix="!", intents=intents, help_command=None,
+        shard_ids=[int(s) for s in SHARD_IDS.split(",")] if SHARD_IDS else None,
+        shard_count=int(SHARD_COUNT) if SHARD_COUNT.isdigit() else None
+    )
+else:
+    bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+
+# "guild" = uno stato per server, "channel" = uno stato per canale
+STATE_SCOPE = os.getenv("DITTO_STATE_SCOPE", "guild")
+MAX_GAMES = int(os.getenv("DITTO_MAX_GAMES", "5000"))
+GAME_IDLE_TTL = float(os.getenv("DITTO_GAME_IDLE_TTL", str(6 * 3600)))
+
+# Avvisi "lettera ripetuta" raggruppati per canale
+NOTICE_WINDOW = float(os.getenv("DITTO_NOTICE_WINDOW", "0.75"))
+NOTICE_RATE = int(os.getenv("DITTO_NOTICE_RATE", "5"))
+NOTICE_PER = float(os.getenv("DITTO_NOTICE_PER", "5"))
+METRICS_PORT = int(os.getenv("DITTO_METRICS_PORT", "0"))
+# Ruoli moderatore per server ("server:ruolo,ruolo;server:ruolo");
+# i server non elencati usano il ruolo con questo nome
+MODERATOR_ROLES = parse_role_ids(os.getenv("DITTO_MODERATOR_ROLES", ""))
+MODERATOR_ROLE_NAME = os.getenv("DITTO_MODERATOR_ROLE_NAME", "Guardians of Sakura (Moderators)")
+# Traduzioni extra dei messaggi, {locale: {chiave: testo}} (vedi responses.py)
+TRANSLATIONS_FILE = os.getenv("DITTO_TRANSLATIONS_FILE", "")
+if TRANSLATIONS_FILE:
+    catalog.load(TRANSLATIONS_FILE)
+# Sync de comandos: "auto" = solo si el árbol cambió, "always", "off".
+# Con DITTO_SYNC_GUILD (desarrollo) los comandos van solo a ese servidor
+COMMAND_SYNC = os.getenv("DITTO_COMMAND_SYNC", "auto")
+SYNC_GUILD = os.getenv("DITTO_SYNC_GUILD", "")
+COMMAND_SYNC_FILE = "ditto_command_sync.json"
+# Messaggi più lunghi non possono essere una lettera (anche con spazi attorno)
+MAX_LETTER_MESSAGE = 16
+# Stato delle lettere, salvato in background e all'arresto (un file per gruppo di shard);
+# all'avvio si leggono tutti i ditto_state*.json, vedi load_games
+STATE_FILE = f"ditto_state.{SHARD_IDS.replace(',', '-')}.json" if SHARD_IDS else "ditto_state.json"
+STATE_FILES = "ditto_state*.json"
+# Shard serviti da questo processo, [id, totale]; None = tutti i server
+OWNED_SHARDS = [[int(s) for s in SHARD_IDS.split(",")], int(SHARD_COUNT)] if SHARD_IDS and SHARD_COUNT.isdigit() else None
+SAVE_INTERVAL = float(os.getenv("DITTO_SAVE_INTERVAL", "5"))
+SAVE_MAX_DIRTY = int(os.getenv("DITTO_SAVE_MAX_DIRTY", "500"))
+# Arresto (SIGTERM): secondi per finire i messaggi in corso e inviare gli avvisi in coda
+DRAIN_TIMEOUT = float(os.getenv("DITTO_DRAIN_TIMEOUT", "8"))
 
 # ================= STATE =================
 
-bot_state = {
-    "active": False,
-    "letters": {}
-}
+games = GameRegistry(
+    LetterGame,
+    max_games=MAX_GAMES,
+    idle_ttl=GAME_IDLE_TTL,
+    per_channel=STATE_SCOPE == "channel"
+)
 
-# ================= HELPERS =================
+# Id di server (o canali, in modalità "channel") con il gioco attivo.
+# on_message scarta tutto il resto con un solo lookup.
+active_scopes = set()
+ready_once = False
 
-def is_owner_or_moderator(interaction: discord.Interaction) -> bool:
-    if interaction.guild is None:
-        return False
+def snapshot_games():
+    return {
+        "games": [[encode_key(key), game.to_dict()] for key, game in games.items() if game.active],
+        "shards": OWNED_SHARDS,
+        "saved_at": time.time()
+    }
 
-    # Dueño del servidor
-    if interaction.user.id == interaction.guild.owner_id:
+def owns(shards, key):
+    """Il server della partita ``key`` è servito da ``shards`` ([id, totale] o None = tutti)?"""
+    guild_id = key[0] if isinstance(key, tuple) else key
+    if shards is None or guild_id is None:
         return True
+    ids, count = shards
+    # Stessa formula di Discord per assegnare un server a uno shard
+    return (guild_id >> 22) % count in ids
 
-    # Rol Moderador
-    for role in interaction.user.roles:
-        if role.name.lower() == "guardians of sakura (moderators)":
-            return True
+def saved_games():
+    """Partite attive di tutti i file di stato, ``{key: data}``.
 
-    return False
+    Con DITTO_SHARDS cambiato un server passa al file di un altro gruppo: per
+    ogni server vale il file più recente tra quelli dei processi che lo
+    servivano, così una partita chiusa dopo il cambio non torna da un file
+    vecchio. I file senza "shards" (versioni precedenti) valgono solo per
+    le partite che contengono, tranne ditto_state.json che copriva tutti i server.
+    """
+    states = []
+    for path in glob.glob(STATE_FILES):
+        state = load_json(path)
+        if state:
+            states.append((state.get("saved_at") or os.path.getmtime(path), path, state))
+
+    restored = {}
+    for _, path, state in sorted(states):
+        found = {decode_key(key): data for key, data in state.get("games", [])}
+        if "shards" in state or path == "ditto_state.json":
+            shards = state.get("shards")
+            for key in [key for key in restored if key not in found and owns(shards, key)]:
+                del restored[key]
+        restored.update(found)
+    return restored
+
+def load_games():
+    """Ripristina le partite attive di questo processo (da setup_hook, prima di ricevere messaggi)"""
+    started = time.perf_counter()
+    for key, data in saved_games().items():
+        if not owns(OWNED_SHARDS, key):
+            continue
+        game = LetterGame()
+        game.load_dict(data)
+        games.restore(key, game)
+        active_scopes.add(key[1] if isinstance(key, tuple) else key)
+    print(f"📂 Estado restaurado en {(time.perf_counter() - started) * 1000:.0f}ms ({len(active_scopes)} juego(s) activo(s))")
+    metrics.startup_milestone("ditto", "restored")
+
+state_writer = WriteBehindWriter(STATE_FILE, snapshot_games, interval=SAVE_INTERVAL, max_dirty=SAVE_MAX_DIRTY)
+lifecycle = Lifecycle("ditto", drain_timeout=DRAIN_TIMEOUT)
+
+# ================= HELPERS =================
+
+def render_repeated_letters(notices):
+    """Testo per uno o più avvisi (letter, mention, prev_user_id, prev_username)"""
+    if len(notices) == 1:
+        letter, mention, prev_id, prev_name = notices[0]
+        return [catalog.text("ditto_repeated", letter=letter, mention=mention, prev_id=prev_id, prev_name=prev_name)]
+
+    lines = [catalog.text("ditto_repeated_many")]
+    for letter, mention, prev_id, prev_name in notices:
+        lines.append(catalog.text("ditto_repeated_line", letter=letter, mention=mention, prev_id=prev_id, prev_name=prev_name))
+    return lines
+
+outbound = OutboundQueue(
+    render_repeated_letters,
+    window=NOTICE_WINDOW,
+    rate=NOTICE_RATE,
+    per=NOTICE_PER
+)
+
+letter_counter = metrics.registry.counter("ditto_letters_total", "Single-letter messages by result")
+outbound_gauge = metrics.registry.gauge("ditto_outbound", "Outbound notice queue state")
+states_gauge = metrics.registry.gauge("ditto_states", "Letter states held in memory")
+metrics_server = metrics.MetricsServer(METRICS_PORT) if METRICS_PORT else None
+
+@metrics.registry.collector
+def collect_ditto_metrics():
+    stats = outbound.stats()
+    for key in ("depth", "enqueued", "merged", "dropped", "sent_messages", "failures"):
+        outbound_gauge.set(stats[key], stat=key)
+    if stats["latency_p50"] is not None:
+        outbound_gauge.set(stats["latency_p50"], stat="latency_p50_seconds")
+    states_gauge.set(sum(1 for _, game in games.items() if game.active), state="active")
+    states_gauge.set(len(games), state="registered")
+
+def scope_id(obj):
+    """Guild id (or channel id in channel scope) used by the on_message prefilter."""
+    scope = obj.channel if games.per_channel else obj.guild
+    return scope.id if scope is not None else None
+
+def letter_of(message):
+    """The letter a message plays, or None if it cannot matter to an active game.
+
+    Checks go from cheapest to most expensive and the reject path allocates
+    nothing: scope lookup, length, then (only for short padded messages) strip.
+    """
+    scope = message.channel if games.per_channel else message.guild
+    if scope is None or scope.id not in active_scopes:
+        return None
+
+    content = message.content
+    if len(content) != 1:
+        if not 1 < len(content) <= MAX_LETTER_MESSAGE:
+            return None
+        if not (content[0].isspace() or content[-1].isspace()):
+            return None
+        content = content.strip()
+        if len(content) != 1:
+            return None
+
+    if not content.isalpha() or message.author.bot:
+        return None
+    return content.upper()
+
+def record_letter(message, letter):
+    game = games.get(games.key_of(message), create=False)
+    if game is None or not game.active:
+        # Stato scaduto o rimosso dal registro
+        active_scopes.discard(scope_id(message))
+        return
+
+    prev = game.letters.get(letter)
+    if prev is None:
+        game.letters[letter] = (message.author.id, message.author.display_name)
+        letter_counter.inc(result="new")
+        state_writer.mark_dirty()
+    else:
+        letter_counter.inc(result="repeated")
+        outbound.enqueue(
+            message.channel,
+            (letter, message.author.mention, prev[0], prev[1]),
+            key=(letter, message.author.id)
+        )
+
+permissions = PermissionResolver(role_names=(MODERATOR_ROLE_NAME,), role_ids=MODERATOR_ROLES)
+
+def is_owner_or_moderator(interaction: discord.Interaction) -> bool:
+    # Dueño del servidor o rol Moderador (ids cacheados por servidor)
+    return permissions.is_owner_or_moderator(interaction)
 
 # ================= EVENTS =================
 
+# Los roles moderador se recalculan solo cuando cambian roles o el servidor
+@bot.event
+async def on_guild_role_create(role):
+    permissions.invalidate(role.guild.id)
+
+@bot.event
+async def on_guild_role_delete(role):
+    permissions.invalidate(role.guild.id)
+
+@bot.event
+async def on_guild_role_update(before, after):
+    permissions.invalidate(after.guild.id)
+
+@bot.event
+async def on_guild_update(before, after):
+    permissions.invalidate(after.id)
+
+@bot.event
+async def on_guild_remove(guild):
+    permissions.invalidate(guild.id)
+
+async def setup_hook():
+    # Dopo il login e prima del gateway: nessun messaggio arriva prima del ripristino
+    load_games()
+    state_writer.start()
+
+bot.setup_hook = setup_hook
+
 @bot.event
 async def on_ready():
-    await bot.tree.sync()
+    # on_ready llega también en cada reconexión: el arranque se hace una sola vez
+    global ready_once
+    if ready_once:
+        print(f"Bot reconectado como {bot.user}")
+        return
+    ready_once = True
+
+    if metrics_server is not None:
+        await metrics_server.start("ditto")
+    metrics.startup_milestone("ditto", "ready")
+    guild = discord.Object(id=int(SYNC_GUILD)) if SYNC_GUILD else None
+    try:
+        synced = await sync_commands(bot.tree, COMMAND_SYNC_FILE, guild=guild, mode=COMMAND_SYNC)
+        print("🔄 Comandos sincronizados" if synced else "✅ Comandos sin cambios, sync omitido")
+        metrics.startup_milestone("ditto", "commands_synced")
+    except discord.HTTPException as e:
+        print(f"⚠️ Command sync failed: {e}")
     print(f"Bot conectado como {bot.user}")
 
 @bot.event
 async def on_message(message):
-    if message.author.bot:
-        return
+    # Tempo di ogni dispatch, anche dei messaggi scartati dal prefiltro
+    started = time.perf_counter()
+    try:
+        letter = letter_of(message)
+        # Solo i messaggi che contano passano dal controllo dell'arresto
+        if letter is not None and lifecycle.admit():
+            record_letter(message, letter)
 
-    if not bot_state["active"]:
-        await bot.process_commands(message)
-        return
+        if bot.all_commands:
+            await bot.process_commands(message)
+    finally:
+        metrics.message_latency.observe(time.perf_counter() - started, bot="ditto")
+
+async def accept_interaction(interaction):
+    """Controllo globale: durante l'arresto i nuovi comandi ricevono solo un avviso"""
+    if lifecycle.admit():
+        return True
+    await interaction.response.send_message(**catalog.reply("shutting_down", catalog.locale_of(interaction), ephemeral=True))
+    return False
+
+bot.tree.interaction_check = accept_interaction
 
-    content = message.content.strip()
-    if len(content) == 1 and content.isalpha():
-        letter = content.upper()
-
-        if letter in bot_state["letters"]:
-            prev = bot_state["letters"][letter]
-            await message.channel.send(
-                f"🔁 **Letter repeated!** / **Lettera ripetuta!**\n"
-                f"Letter / Lettera: **{letter}**\n"
-                f"Said now by / Detta ora da: {message.author.mention}\n"
-                f"Previously said by / Detta prima da: <@{prev['user_id']}> ({prev['username']})"
-            )
-        else:
-            bot_state["letters"][letter] = {
-                "user_id": message.author.id,
-                "username": message.author.display_name
-            }
-
-    await bot.process_commands(message)
+lifecycle.on_drain("notices", outbound.drain)
+lifecycle.on_flush("letters", state_writer.close)
+if metrics_server is not None:
+    lifecycle.on_flush("metrics", metrics_server.close)
 
 # ================= COMMANDS =================
 
 @bot.tree.command(name="on", description="Activate the bot / Attiva il bot")
+@metrics.timed("ditto", "on")
 async def turn_on(interaction: discord.Interaction):
+    locale = catalog.locale_of(interaction)
     if not is_owner_or_moderator(interaction):
-        await interaction.response.send_message(
-            "⛔ You don't have permission to use this command.\n"
-            "Solo il proprietario del server o un moderatore può usarlo.",
-            ephemeral=True
-        )
+        await interaction.response.send_message(**catalog.reply("ditto_no_permission", locale, ephemeral=True))
         return
 
-    if bot_state["active"]:
-        bot_state["letters"] = {}
-        await interaction.response.send_message(
-            "🔄 **Letters reset!** / **Lettere resettate!**"
-        )
+    game = games.get(games.key_of(interaction))
+    active_scopes.add(scope_id(interaction))
+    state_writer.mark_dirty()
+    if game.active:
+        game.letters.clear()
+        await interaction.response.send_message(**catalog.reply("ditto_letters_reset", locale))
     else:
-        bot_state["active"] = True
-        bot_state["letters"] = {}
-        await interaction.response.send_message(
-            "✅ **Bot activated!** / **Bot attivato!**"
-        )
+        game.active = True
+        game.letters.clear()
+        await interaction.response.send_message(**catalog.reply("ditto_activated", locale))
 
 @bot.tree.command(name="off", description="Deactivate the bot / Disattiva il bot")
+@metrics.timed("ditto", "off")
 async def turn_off(interaction: discord.Interaction):
+    locale = catalog.locale_of(interaction)
     if not is_owner_or_moderator(interaction):
-        await interaction.response.send_message(
-            "⛔ You don't have permission to use this command.\n"
-            "Solo il proprietario del server o un moderatore può usarlo.",
-            ephemeral=True
-        )
+        await interaction.response.send_message(**catalog.reply("ditto_no_permission", locale, ephemeral=True))
         return
 
-    bot_state["active"] = False
-    await interaction.response.send_message(
-        "⏸️ **Bot deactivated!** / **Bot disattivato!**"
-    )
+    game = games.get(games.key_of(interaction), create=False)
+    if game is not None:
+        game.active = False
+        state_writer.mark_dirty()
+    active_scopes.discard(scope_id(interaction))
+    await interaction.response.send_message(**catalog.reply("ditto_deactivated", locale))
 
 # ================= TOKEN =================
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 
-if __name__ == "__main__":
+def main():
     if not TOKEN:
         print("❌ Error: DISCORD_TOKEN not found")
         exit(1)
 
-    bot.run(TOKEN)
\ No newline at end of file
+    async def run_bot():
+        # Segnali gestiti sul loop: arresto ordinato invece di KeyboardInterrupt
+        lifecycle.install(bot.close)
+        async with bot:
+            await bot.start(TOKEN)
+        await lifecycle.wait_stopped()
+
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(run_bot())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state_writer.flush_sync()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import unicodedata
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def normalize_text(text):
+    """Upper-case ``text`` and strip accents (NFD + drop combining marks). Memoized."""
+    nfd = unicodedata.normalize("NFD", text.upper())
+    return "".join(c for c in nfd if unicodedata.category(c) != "Mn")
+
+
+class CompiledSecret:
+    """A hangman secret compiled once at ``start_game``.
+
+    ``positions`` maps each normalized letter to the indexes where it appears
+    in the upper-cased secret, and ``mask`` is the per-character display list
+    (``_`` for hidden characters). Revealing a letter only touches that
+    letter's positions; the rendered pattern is cached until the next reveal.
+    """
+
+    __slots__ = ("secret", "normalized", "positions", "mask", "_rendered")
+
+    def __init__(self, secret):
+        self.secret = secret.upper()
+        self.normalized = normalize_text(secret)
+
+        positions = {}
+        mask = []
+        for index, char in enumerate(self.secret):
+            if char == " ":
+                mask.append(" ")
+                continue
+            mask.append("_")
+            positions.setdefault(normalize_text(char), []).append(index)
+
+        self.positions = {key: tuple(value) for key, value in positions.items()}
+        self.mask = mask
+        self._rendered = None
+
+    def reveal(self, letter):
+        """Uncover every occurrence of the normalized ``letter``; returns how many were uncovered."""
+        indexes = self.positions.get(letter, ())
+        if indexes:
+            secret = self.secret
+            mask = self.mask
+            for index in indexes:
+                mask[index] = secret[index]
+            self._rendered = None
+        return len(indexes)
+
+    @property
+    def pattern(self):
+        if self._rendered is None:
+            self._rendered = " ".join(self.mask)
+        return self._rendered
+
+    def word_lengths(self):
+        return "+".join(str(len(w)) for w in self.secret.split())
+
+    def letters(self):
+        """Set of normalized letters that must be found to win."""
+        return {c for c in self.positions if c.isalpha()}
+
+    def matches(self, guess):
+        return normalize_text(guess) == self.normalized
@@ -0,0 +1,105 @@
+import json
+import os
+
+
+class EventJournal:
+    """Append-only NDJSON event log split into numbered segment files.
+
+    Every event is one line appended to the current segment and flushed to the
+    OS, so recording an event is O(1) and survives a process crash. Snapshot
+    writers call ``rotate`` to start a new segment and store the returned
+    sequence number in their snapshot; once the snapshot is on disk they call
+    ``commit``. Segments older than every consumer's committed snapshot are
+    deleted. Files are only opened on first use.
+    """
+
+    def __init__(self, directory, consumers=()):
+        self.directory = directory
+        self._committed = {name: 0 for name in consumers}
+        self._file = None
+        self.seq = None
+
+        self.appends = 0
+        self.bytes_written = 0
+
+    def _path(self, seq):
+        return os.path.join(self.directory, f"{seq:08d}.jsonl")
+
+    def segments(self):
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for filename in os.listdir(self.directory):
+            stem, ext = os.path.splitext(filename)
+            if ext == ".jsonl" and stem.isdigit():
+                found.append(int(stem))
+        return sorted(found)
+
+    def _open(self):
+        if self.seq is None:
+            os.makedirs(self.directory, exist_ok=True)
+            existing = self.segments()
+            self.seq = existing[-1] + 1 if existing else 1
+        self._file = open(self._path(self.seq), "a", encoding="utf-8")
+
+    # ---------- writing ----------
+
+    def append(self, event):
+        if self._file is None:
+            self._open()
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        self.appends += 1
+        self.bytes_written += len(line)
+
+    def rotate(self):
+        """Start a new segment; returns its sequence number (the snapshot boundary)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.seq is not None:
+            self.seq += 1
+        self._open()
+        return self.seq
+
+    def commit(self, consumer, seq):
+        """Record that ``consumer``'s snapshot covers every segment before ``seq``."""
+        self._committed[consumer] = seq
+        low = min(self._committed.values())
+        for old in self.segments():
+            if old >= low:
+                break
+            try:
+                os.unlink(self._path(old))
+            except FileNotFoundError:
+                pass
+
+    def sync(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ---------- reading ----------
+
+    def replay(self, from_seq=0):
+        """Yield ``(seq, event)`` for every event in segments ``>= from_seq``.
+
+        A torn last line (crash mid-write) ends that segment's replay.
+        """
+        current = self.seq
+        for seq in self.segments():
+            if seq < from_seq or seq == current:
+                continue
+            with open(self._path(seq), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break
+                    yield seq, event
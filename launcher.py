@@ -0,0 +1,430 @@
+"""Run both bots, optionally sharded, as supervised processes.
+
+    python launcher.py                              # every bot that has a token
+    python launcher.py --stub-gateway --duration 10 # local stand-in for the gateway
+
+Every bot (or group of gateway shards) runs in its own process, so CPU work in
+one of them can't delay another's heartbeats. Hangman ranking updates from
+every shard go to a single aggregator process (``HANGMAN_ROLE=rankings``) over
+``multiprocessing.connection``; it owns the ranking store, its journal and the
+daily reset.
+
+Environment:
+    LAUNCHER_BOTS                  bots to run (default "hangman,ditto")
+    HANGMAN_TOKEN                  hangman bot token
+    DITTO_TOKEN                    letter bot token (falls back to DISCORD_TOKEN)
+    HANGMAN_SHARDS, DITTO_SHARDS   "" = one process, no sharding
+                                   "auto" = one process, AutoShardedBot picks the count
+                                   "N" = N shards, one process each
+                                   "N:P" = N shards spread over P processes
+    HANGMAN_RANKING_AGGREGATOR     aggregator address (default 127.0.0.1:6010)
+    HANGMAN_METRICS_PORT, DITTO_METRICS_PORT
+                                   base port; the i-th process of a bot uses base + i
+    HANGMAN_COMMAND_SYNC, DITTO_COMMAND_SYNC
+                                   "auto" (sync only when the command tree changed),
+                                   "always" or "off"; the hash file is shared by all shards
+    HANGMAN_SYNC_GUILD, DITTO_SYNC_GUILD
+                                   development guild id: sync to that guild only
+    HANGMAN_RULES_FILE             per-server game rules edited by /rules (see rules.py);
+                                   shared by all shards, like the command sync file
+    HANGMAN_DRAIN_TIMEOUT, DITTO_DRAIN_TIMEOUT
+                                   seconds a stopping bot waits for running handlers before
+                                   saving and disconnecting (see lifecycle.py); keep drain +
+                                   save under STOP_TIMEOUT, after which a process is killed
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import secrets
+import signal
+import tempfile
+import time
+
+BOTS = {"hangman": "boia_bot", "ditto": "ditto_bot"}
+STOP_TIMEOUT = 15.0
+# Segnale con cui il supervisore ferma l'aggregatore (il SIGTERM della piattaforma arriva a tutto il gruppo)
+AGGREGATOR_STOP = signal.SIGUSR1
+MAX_BACKOFF = 60.0
+
+
+# ================= PLAN =================
+
+class ProcessSpec:
+    def __init__(self, name, bot, env, gateway=True):
+        self.name = name
+        self.bot = bot
+        self.module = BOTS[bot]
+        self.env = env
+        self.gateway = gateway
+
+
+def parse_shards(value):
+    """Shard spec -> ``(groups, count)``; each group is the shard ids of one process.
+
+    ``""`` gives ``[None]`` (plain ``commands.Bot``) and ``"auto"`` gives
+    ``[()]`` (one ``AutoShardedBot`` that asks Discord for the count).
+    """
+    value = value.strip()
+    if not value:
+        return [None], 0
+    if value == "auto":
+        return [()], 0
+    count, _, processes = value.partition(":")
+    count = int(count)
+    processes = min(int(processes or count), count)
+    size, extra = divmod(count, processes)
+    groups, start = [], 0
+    for index in range(processes):
+        stop = start + size + (1 if index < extra else 0)
+        groups.append(tuple(range(start, stop)))
+        start = stop
+    return groups, count
+
+
+def bot_token(bot):
+    if bot == "ditto":
+        return os.getenv("DITTO_TOKEN") or os.getenv("DISCORD_TOKEN")
+    return os.getenv(f"{bot.upper()}_TOKEN")
+
+
+def plan(bots, authkey, stub=False):
+    specs = []
+    for bot in bots:
+        token = bot_token(bot)
+        if not token and not stub:
+            print(f"⚠️ No token for {bot}, skipping (set {bot.upper()}_TOKEN)")
+            continue
+
+        prefix = bot.upper()
+        metrics_port = int(os.getenv(f"{prefix}_METRICS_PORT", "0"))
+        groups, count = parse_shards(os.getenv(f"{prefix}_SHARDS", ""))
+
+        if bot == "hangman":
+            aggregator = os.getenv("HANGMAN_RANKING_AGGREGATOR", "127.0.0.1:6010")
+            shared = {"HANGMAN_RANKING_AGGREGATOR": aggregator, "HANGMAN_RANKING_AUTHKEY": authkey}
+            specs.append(ProcessSpec(
+                "hangman-rankings", bot,
+                dict(shared, HANGMAN_ROLE="rankings", HANGMAN_METRICS_PORT=str(metrics_port)),
+                gateway=False
+            ))
+            if metrics_port:
+                metrics_port += 1
+
+        for index, shard_ids in enumerate(groups):
+            if shard_ids is None:
+                suffix = "main"
+            elif not shard_ids:
+                suffix = "auto"
+            else:
+                suffix = f"shards{shard_ids[0]}-{shard_ids[-1]}"
+            env = {
+                "DISCORD_TOKEN": token or "",
+                "BOT_SHARD_IDS": ",".join(map(str, shard_ids or ())),
+                "BOT_SHARD_COUNT": str(count) if count else ("auto" if shard_ids == () else ""),
+                f"{prefix}_METRICS_PORT": str(metrics_port + index if metrics_port else 0),
+            }
+            if bot == "hangman":
+                env.update(shared, HANGMAN_ROLE="shard", HANGMAN_INSTANCE=suffix)
+            specs.append(ProcessSpec(f"{bot}-{suffix}", bot, env))
+    return specs
+
+
+# ================= CHILD PROCESS =================
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def run_process(spec, workdir, stub):
+    # Ctrl-C è per il launcher, che ferma i processi nell'ordine giusto (SIGTERM)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if spec.gateway:
+        signal.signal(signal.SIGTERM, _interrupt)
+    else:
+        # L'aggregatore deve sopravvivere agli shard per ricevere i loro ultimi batch
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(AGGREGATOR_STOP, _interrupt)
+    if workdir:
+        os.chdir(workdir)
+    os.environ.update(spec.env)
+    module = importlib.import_module(spec.module)
+
+    if stub is None or not spec.gateway:
+        module.main()
+        return
+    try:
+        result = asyncio.run(run_stub_gateway(spec, module, stub))
+    except KeyboardInterrupt:
+        return
+    print(f"📊 {spec.name}: {json.dumps(result)}", flush=True)
+
+
+# ================= STUB GATEWAY =================
+
+def stub_guild_ids(spec, stub):
+    """Guild ids (snowflake-shaped) that Discord would route to this process's shards."""
+    ids = [(index + 1) << 22 for index in range(stub["guilds"])]
+    count = spec.env.get("BOT_SHARD_COUNT", "")
+    shard_ids = spec.env.get("BOT_SHARD_IDS", "")
+    if not count.isdigit() or not shard_ids:
+        return ids
+    mine = {int(s) for s in shard_ids.split(",")}
+    return [guild_id for guild_id in ids if (guild_id >> 22) % int(count) in mine]
+
+
+async def run_stub_gateway(spec, module, stub):
+    """Drive the real command handlers with fake guild traffic for ``stub["duration"]`` seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + stub["duration"]
+    guild_ids = stub_guild_ids(spec, stub)
+    lag = {"max": 0.0}
+
+    async def heartbeat():
+        # Stand-in for the gateway heartbeat: how late does a 50 ms tick fire?
+        while True:
+            expected = loop.time() + 0.05
+            await asyncio.sleep(0.05)
+            lag["max"] = max(lag["max"], loop.time() - expected)
+
+    beat = loop.create_task(heartbeat())
+    started = time.perf_counter()
+    try:
+        if spec.bot == "hangman":
+            result = await stub_hangman(module, guild_ids, stub, deadline)
+        else:
+            result = await stub_ditto(module, guild_ids, stub, deadline)
+    finally:
+        beat.cancel()
+    result.update(
+        guilds=len(guild_ids),
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+        max_heartbeat_lag_ms=round(lag["max"] * 1000, 2),
+    )
+    return result
+
+
+async def stub_hangman(module, guild_ids, stub, deadline):
+    from bench_bots import ALPHABET, PHRASES, FakeChannel, FakeGuild, FakeInteraction, FakeUser, callback
+
+    loop = asyncio.get_running_loop()
+    module.load_data()
+    module.data_writer.start()
+    module.state_writer.start()
+    module.analytics_writer.start()
+    await wait_for_rankings(module.rankings, deadline)
+    start_game = callback(module.start_game)
+    guess_letter = callback(module.guess_letter)
+    end_game = callback(module.end_game)
+    status = callback(module.status)
+    ranking = callback(module.ranking)
+    ops = {"commands": 0}
+
+    async def play(guild_id):
+        rng = random.Random(guild_id ^ stub["seed"])
+        owner = FakeUser(guild_id + 1, f"owner{guild_id}")
+        players = [FakeUser(guild_id + 100 + i, f"player{guild_id}-{i}") for i in range(stub["players"])]
+        guild = FakeGuild(guild_id, owner, players)
+        channel = FakeChannel(guild_id + 2)
+
+        while loop.time() < deadline:
+            secret, hint = rng.choice(PHRASES)
+            await start_game(FakeInteraction(owner, guild, channel), secret, hint, 3)
+            game = module.get_game(FakeInteraction(owner, guild, channel))
+            for _ in range(200):
+                if not game.active or loop.time() >= deadline:
+                    break
+                await guess_letter(FakeInteraction(rng.choice(players), guild, channel), rng.choice(ALPHABET))
+                ops["commands"] += 1
+                await asyncio.sleep(0)
+            await status(FakeInteraction(owner, guild, channel))
+            await ranking(FakeInteraction(owner, guild, channel), "daily")
+            ops["commands"] += 3
+            if game.active:
+                await end_game(FakeInteraction(owner, guild, channel))
+                ops["commands"] += 1
+
+    await asyncio.gather(*(play(guild_id) for guild_id in guild_ids))
+    await module.data_writer.close()
+    await module.state_writer.close()
+    await module.analytics_writer.close()
+    result = {
+        "commands": ops["commands"],
+        "ranking_writes": module.data_writer.stats(),
+        "historical_entries_seen": module.rankings.count("historical_ranking"),
+    }
+    if hasattr(module.rankings, "stats"):
+        result["ipc"] = module.rankings.stats()
+    module.journal.close()
+    module.rankings.close()
+    return result
+
+
+async def wait_for_rankings(rankings, deadline):
+    """The aggregator is started first but may still be loading; retry until it answers."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            rankings.count("daily_ranking")
+            return
+        except OSError:
+            if loop.time() >= deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def stub_ditto(module, guild_ids, stub, deadline):
+    from bench_bots import ALPHABET, FakeChannel, FakeGuild, FakeInteraction, FakeMessage, FakeUser, callback
+
+    loop = asyncio.get_running_loop()
+    turn_on = callback(module.turn_on)
+    counts = {"messages": 0}
+
+    async def chat(guild_id):
+        rng = random.Random(guild_id ^ stub["seed"])
+        owner = FakeUser(guild_id + 1, f"owner{guild_id}")
+        authors = [FakeUser(guild_id + 100 + i, f"user{guild_id}-{i}") for i in range(stub["players"])]
+        guild = FakeGuild(guild_id, owner, authors)
+        channel = FakeChannel(guild_id + 2)
+        await turn_on(FakeInteraction(owner, guild, channel))
+        while loop.time() < deadline:
+            content = rng.choice(ALPHABET) if rng.random() < 0.3 else "ciao a tutti"
+            await module.on_message(FakeMessage(rng.choice(authors), content, guild, channel))
+            counts["messages"] += 1
+            if counts["messages"] % 100 == 0:
+                await asyncio.sleep(0)
+        return channel
+
+    channels = await asyncio.gather(*(chat(guild_id) for guild_id in guild_ids))
+    await module.outbound.drain(timeout=5)
+    return {"messages": counts["messages"], "channel_sends": sum(c.sent for c in channels)}
+
+
+# ================= SUPERVISOR =================
+
+class Supervisor:
+    """Starts every process, restarts the ones that die (with backoff) and stops them in order.
+
+    Gateway processes are stopped before the ranking aggregator so their last
+    batches still reach it. The aggregator ignores SIGTERM, which the platform
+    sends to the whole process group on shutdown, and is stopped with
+    ``AGGREGATOR_STOP`` only once every gateway process has exited. With ``stub`` set, processes that exit cleanly are
+    done, and the run ends when every gateway process is.
+    """
+
+    def __init__(self, specs, *, workdir=None, stub=None):
+        self.specs = specs
+        self.workdir = workdir
+        self.stub = stub
+        self._ctx = multiprocessing.get_context("spawn")
+        self.processes = {}
+        self.started_at = {}
+        self.restarts = {spec.name: 0 for spec in specs}
+        self.restart_at = {}
+        self.finished = set()
+        self.stopping = False
+
+    def spawn(self, spec):
+        process = self._ctx.Process(
+            target=run_process, args=(spec, self.workdir, self.stub), name=spec.name, daemon=False
+        )
+        process.start()
+        self.processes[spec.name] = process
+        self.started_at[spec.name] = time.monotonic()
+        print(f"🚀 Started {spec.name} (pid {process.pid})")
+
+    def request_stop(self, signum=None, frame=None):
+        self.stopping = True
+
+    def run(self):
+        for spec in self.specs:
+            self.spawn(spec)
+
+        while not self.stopping:
+            time.sleep(0.2)
+            now = time.monotonic()
+            for spec in self.specs:
+                process = self.processes[spec.name]
+                if spec.name in self.finished or process.is_alive():
+                    continue
+                if self.stub is not None and spec.gateway and process.exitcode == 0:
+                    self.finished.add(spec.name)
+                    continue
+                due = self.restart_at.get(spec.name)
+                if due is None:
+                    if now - self.started_at[spec.name] > MAX_BACKOFF:
+                        self.restarts[spec.name] = 0
+                    delay = min(2 ** self.restarts[spec.name], MAX_BACKOFF)
+                    self.restarts[spec.name] += 1
+                    self.restart_at[spec.name] = now + delay
+                    print(f"⚠️ {spec.name} exited with code {process.exitcode}; restarting in {delay:.0f}s")
+                elif now >= due:
+                    del self.restart_at[spec.name]
+                    self.spawn(spec)
+
+            if self.stub is not None and all(s.name in self.finished for s in self.specs if s.gateway):
+                break
+        self.stop()
+
+    def stop(self):
+        gateway = [self.processes[s.name] for s in self.specs if s.gateway]
+        others = [self.processes[s.name] for s in self.specs if not s.gateway]
+        for group, signum in ((gateway, signal.SIGTERM), (others, AGGREGATOR_STOP)):
+            alive = [p for p in group if p.is_alive()]
+            for process in alive:
+                os.kill(process.pid, signum)
+            deadline = time.monotonic() + STOP_TIMEOUT
+            for process in alive:
+                process.join(max(deadline - time.monotonic(), 0))
+                if process.is_alive():
+                    print(f"⚠️ {process.name} did not stop in {STOP_TIMEOUT:.0f}s, killing it")
+                    process.kill()
+                    process.join()
+        print("👋 All processes stopped")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bots", default=os.getenv("LAUNCHER_BOTS", "hangman,ditto"),
+                        help="comma-separated bots to run")
+    parser.add_argument("--stub-gateway", action="store_true",
+                        help="feed fake guild traffic to the handlers instead of connecting to Discord")
+    parser.add_argument("--duration", type=float, default=10.0, help="stub traffic duration (s)")
+    parser.add_argument("--guilds", type=int, default=8, help="stub guilds (split across shards)")
+    parser.add_argument("--players", type=int, default=10, help="stub players per guild")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="directory for data files (stub default: a temporary one)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    bots = [b.strip() for b in args.bots.split(",") if b.strip()]
+    unknown = [b for b in bots if b not in BOTS]
+    if unknown:
+        raise SystemExit(f"❌ Unknown bot(s): {', '.join(unknown)}")
+
+    stub = None
+    workdir = args.workdir
+    if args.stub_gateway:
+        stub = {"duration": args.duration, "guilds": args.guilds, "players": args.players, "seed": args.seed}
+        workdir = workdir or tempfile.mkdtemp(prefix="launcher-stub-")
+        print(f"🧪 Stub gateway, data in {workdir}")
+
+    authkey = os.getenv("HANGMAN_RANKING_AUTHKEY") or secrets.token_hex(16)
+    specs = plan(bots, authkey, stub=stub is not None)
+    if not specs:
+        print("❌ Nothing to run")
+        exit(1)
+
+    supervisor = Supervisor(specs, workdir=workdir, stub=stub)
+    signal.signal(signal.SIGTERM, supervisor.request_stop)
+    signal.signal(signal.SIGINT, supervisor.request_stop)
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class RankIndex:
+    """Sorted multiset split into bounded buckets (a small order-statistic list).
+
+    Inserts and removals touch one bucket of at most ``2 * load`` items, so
+    they stay cheap however many keys there are. ``index`` and ``slice``
+    skip whole buckets by length.
+    """
+
+    def __init__(self, keys=(), load=512):
+        self._load = load
+        ordered = sorted(keys)
+        self._lists = [ordered[i:i + load] for i in range(0, len(ordered), load)]
+        self._maxes = [chunk[-1] for chunk in self._lists]
+        self._len = len(ordered)
+
+    def __len__(self):
+        return self._len
+
+    def _bucket(self, key):
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            pos -= 1
+        return pos
+
+    def add(self, key):
+        if not self._lists:
+            self._lists.append([key])
+            self._maxes.append(key)
+        else:
+            pos = self._bucket(key)
+            chunk = self._lists[pos]
+            insort(chunk, key)
+            self._maxes[pos] = chunk[-1]
+            if len(chunk) > 2 * self._load:
+                half = chunk[self._load:]
+                del chunk[self._load:]
+                self._maxes[pos] = chunk[-1]
+                self._lists.insert(pos + 1, half)
+                self._maxes.insert(pos + 1, half[-1])
+        self._len += 1
+
+    def remove(self, key):
+        pos = self._bucket(key)
+        chunk = self._lists[pos]
+        i = bisect_left(chunk, key)
+        if i == len(chunk) or chunk[i] != key:
+            raise KeyError(key)
+        del chunk[i]
+        self._len -= 1
+        if chunk:
+            self._maxes[pos] = chunk[-1]
+        else:
+            del self._lists[pos]
+            del self._maxes[pos]
+
+    def index(self, key):
+        """Number of keys strictly smaller than ``key``."""
+        if not self._lists:
+            return 0
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return self._len
+        return sum(len(chunk) for chunk in self._lists[:pos]) + bisect_left(self._lists[pos], key)
+
+    def count_le(self, key):
+        if not self._lists:
+            return 0
+        pos = bisect_right(self._maxes, key)
+        if pos == len(self._maxes):
+            return self._len
+        return sum(len(chunk) for chunk in self._lists[:pos]) + bisect_right(self._lists[pos], key)
+
+    def slice(self, start, stop):
+        result = []
+        if start >= stop:
+            return result
+        offset = 0
+        for chunk in self._lists:
+            size = len(chunk)
+            if offset + size > start:
+                result.extend(chunk[max(start - offset, 0):stop - offset])
+                if offset + size >= stop:
+                    break
+            offset += size
+        return result
+
+    def after(self, key, n):
+        """Up to ``n`` keys strictly greater than ``key`` (from the start if ``key`` is None)."""
+        if key is None:
+            return self.slice(0, n)
+        result = []
+        pos = bisect_right(self._maxes, key)
+        if pos < len(self._lists):
+            chunk = self._lists[pos]
+            start = bisect_right(chunk, key)
+            result.extend(chunk[start:start + n])
+            pos += 1
+        while len(result) < n and pos < len(self._lists):
+            result.extend(self._lists[pos][:n - len(result)])
+            pos += 1
+        return result
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._len
+        for chunk in self._lists:
+            if position < len(chunk):
+                return chunk[position]
+            position -= len(chunk)
+        raise IndexError(position)
+
+
+class Leaderboard:
+    """Ranking order kept up to date as points change.
+
+    Keys are ``(-points, seq, uid)`` where ``seq`` is the order in which the
+    player first appeared, so ties keep the same order as sorting the ranking
+    dict. ``version`` changes only when the top ``k`` (points or names) may
+    have changed, which lets callers cache anything rendered from it.
+    """
+
+    def __init__(self, entries=None, k=10):
+        self.k = k
+        self.version = 0
+        self._keys = {}
+        self._seq = 0
+        keys = []
+        for uid, entry in (entries or {}).items():
+            key = (-entry["points"], self._seq, uid)
+            self._seq += 1
+            self._keys[uid] = key
+            keys.append(key)
+        self._index = RankIndex(keys)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _in_top(self, key):
+        # key è nell'indice: è nella top k se non supera la k-esima chiave (primo bucket)
+        index = self._index
+        return len(index) <= self.k or key <= index[self.k - 1]
+
+    def update(self, uid, points, renamed=False):
+        """Record ``uid``'s new point total."""
+        old = self._keys.get(uid)
+        if old is not None and old[0] == -points:
+            if renamed and self._in_top(old):
+                self.version += 1
+            return
+
+        touched = old is not None and self._in_top(old)
+        if old is not None:
+            self._index.remove(old)
+            key = (-points, old[1], uid)
+        else:
+            key = (-points, self._seq, uid)
+            self._seq += 1
+        self._keys[uid] = key
+        self._index.add(key)
+        if touched or self._in_top(key):
+            self.version += 1
+
+    def top(self, n=None):
+        return [key[2] for key in self._index.slice(0, n if n is not None else self.k)]
+
+    def page(self, start, stop):
+        return [key[2] for key in self._index.slice(start, stop)]
+
+    def scan(self, after=None, n=1000):
+        """Keys of the next ``n`` players in rank order after the key ``after``.
+
+        The last key is the cursor for the following call: unlike ``page``
+        offsets it stays valid while points change, and finding it is a
+        bisect instead of a walk over the buckets before it.
+        """
+        return self._index.after(after, n)
+
+    def position(self, uid):
+        """0-based place of ``uid`` in ranking order (ties broken by ``seq``), or None."""
+        key = self._keys.get(uid)
+        if key is None:
+            return None
+        return self._index.index(key)
+
+    def rank_of(self, uid):
+        key = self._keys.get(uid)
+        if key is None:
+            return None
+        # Same 1-based rank for everyone on the same points
+        return self._index.index((key[0],)) + 1
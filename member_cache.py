@@ -0,0 +1,90 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+
+class DisplayNameResolver:
+    """Resolve member display names without one REST call per player.
+
+    Lookups go memo (TTL) -> ``guild.get_member`` (gateway cache) -> a
+    concurrent ``guild.fetch_member`` batch limited to ``concurrency``
+    requests in flight. Anything that still fails goes through ``fallback``.
+    Works with any object exposing ``id``, ``get_member`` and ``fetch_member``.
+    """
+
+    def __init__(self, ttl=300, concurrency=5, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.max_entries = max_entries
+        self._clock = clock
+        self._names = OrderedDict()
+
+        self.hits = 0
+        self.gateway_hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "gateway_hits": self.gateway_hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "size": len(self._names),
+        }
+
+    def _remember(self, key, name, now):
+        self._names[key] = (now + self.ttl, name)
+        self._names.move_to_end(key)
+        while len(self._names) > self.max_entries:
+            self._names.popitem(last=False)
+
+    def forget(self, guild_id, user_id):
+        self._names.pop((guild_id, str(user_id)), None)
+
+    async def resolve(self, guild, user_ids, fallback=None):
+        """Map each user id (str or int) in ``user_ids`` to a display name."""
+        now = self._clock()
+        names = {}
+        missing = []
+
+        for uid in user_ids:
+            key = (guild.id, str(uid))
+            cached = self._names.get(key)
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                names[uid] = cached[1]
+                continue
+
+            member = guild.get_member(int(uid))
+            if member is not None:
+                self.gateway_hits += 1
+                names[uid] = member.display_name
+                self._remember(key, member.display_name, now)
+            else:
+                missing.append(uid)
+
+        if missing:
+            self.misses += len(missing)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(uid):
+                async with semaphore:
+                    try:
+                        member = await guild.fetch_member(int(uid))
+                    except discord.HTTPException:
+                        # NotFound (uscito dal server), Forbidden, errori del server
+                        self.failures += 1
+                        return uid, None
+                    return uid, member.display_name
+
+            for uid, name in await asyncio.gather(*(fetch(uid) for uid in missing)):
+                if name is None:
+                    names[uid] = fallback(uid) if fallback else "Unknown"
+                else:
+                    names[uid] = name
+                    self._remember((guild.id, str(uid)), name, now)
+
+        return names
@@ -0,0 +1,248 @@
+"""In-process metrics with a Prometheus text endpoint.
+
+Recording is a dict lookup plus an integer increment (histograms add one
+bisect), so it is cheap enough to leave on. Values that already live
+elsewhere (writer stats, registry sizes) are read by collectors at scrape
+time instead of being mirrored on the hot path.
+"""
+import asyncio
+import functools
+import os
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Counter:
+    __slots__ = ("name", "help", "values")
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        """Overwrite the value (for collectors mirroring totals kept elsewhere)."""
+        self.values[tuple(sorted(labels.items()))] = value
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    __slots__ = ()
+    kind = "gauge"
+
+
+class Histogram:
+    __slots__ = ("name", "help", "buckets", "series")
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self.series.get(key)
+        if series is None:
+            # [per-bucket counts..., +Inf count, sum]
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket", key + (("le", repr(bound)),), cumulative
+            cumulative += series[len(self.buckets)]
+            yield f"{self.name}_bucket", key + (("le", "+Inf"),), cumulative
+            yield f"{self.name}_count", key, cumulative
+            yield f"{self.name}_sum", key, series[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def _get(self, cls, name, help, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help, **kwargs)
+        return metric
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help=""):
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def collector(self, func):
+        """Register ``func()`` to run before each scrape (to refresh gauges)."""
+        self.collectors.append(func)
+        return func
+
+    def render(self):
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"⚠️ Metrics collector {collect.__name__} failed: {e}")
+
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+command_latency = registry.histogram("bot_command_seconds", "App command handler latency")
+command_errors = registry.counter("bot_command_errors_total", "App command handlers that raised")
+message_latency = registry.histogram("bot_on_message_seconds", "on_message dispatch latency")
+loop_lag = registry.histogram(
+    "bot_event_loop_lag_seconds", "Extra delay of a periodic event loop tick",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+startup_seconds = registry.gauge("bot_startup_seconds", "Seconds from process start to a startup milestone")
+
+
+def _process_started():
+    """``time.time()`` at process start (Linux), else at first import of this module."""
+    try:
+        with open("/proc/self/stat") as f:
+            # starttime è il campo 22, contato dopo il nome del comando (che può avere spazi)
+            start_ticks = int(f.read().rpartition(")")[2].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+PROCESS_STARTED = _process_started()
+_milestones = set()
+
+
+def startup_milestone(bot_name, milestone):
+    """Record (once per process) how long after process start ``milestone`` was reached."""
+    if (bot_name, milestone) in _milestones:
+        return None
+    _milestones.add((bot_name, milestone))
+    elapsed = time.time() - PROCESS_STARTED
+    startup_seconds.set(round(elapsed, 3), bot=bot_name, milestone=milestone)
+    print(f"⏱️ {bot_name}: {milestone} {elapsed:.2f}s after process start")
+    return elapsed
+
+
+def timed(bot_name, command_name):
+    """Record the latency of an app command callback.
+
+    Goes directly above ``async def`` (below ``@bot.tree.command`` and the
+    describe/check decorators); ``functools.wraps`` keeps the signature that
+    discord.py inspects.
+    """
+    first_interaction = (bot_name, "first_interaction")
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            if first_interaction not in _milestones:
+                startup_milestone(bot_name, "first_interaction")
+            try:
+                return await func(*args, **kwargs)
+            except BaseException:
+                command_errors.inc(bot=bot_name, command=command_name)
+                raise
+            finally:
+                command_latency.observe(time.perf_counter() - started, bot=bot_name, command=command_name)
+        return wrapper
+    return decorator
+
+
+async def monitor_loop_lag(bot_name, interval=1.0):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        loop_lag.observe(max(loop.time() - expected, 0.0), bot=bot_name)
+
+
+class MetricsServer:
+    """Minimal HTTP server answering ``GET /metrics`` (and ``/``) on a local port."""
+
+    def __init__(self, port, host="127.0.0.1", registry=registry):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self._server = None
+        self._lag_task = None
+
+    async def start(self, bot_name=None):
+        """Start serving (and the loop-lag probe for ``bot_name``). Safe to call more than once."""
+        if self._server is None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            print(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+        if bot_name and self._lag_task is None:
+            self._lag_task = asyncio.get_running_loop().create_task(monitor_loop_lag(bot_name))
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.split()
+            path = parts[1].decode() if len(parts) > 1 else "/"
+            if path in ("/", "/metrics"):
+                body = self.registry.render().encode("utf-8")
+                status = "200 OK"
+            else:
+                body = b"not found\n"
+                status = "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("ascii") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
@@ -0,0 +1,76 @@
+def parse_role_ids(value):
+    """``"guild:role,role;guild:role"`` -> ``{guild_id: {role_id, ...}}``."""
+    role_ids = {}
+    for entry in value.split(";"):
+        if not entry.strip():
+            continue
+        guild_id, _, roles = entry.partition(":")
+        role_ids.setdefault(int(guild_id), set()).update(int(r) for r in roles.split(",") if r.strip())
+    return role_ids
+
+
+class PermissionResolver:
+    """Owner / moderator checks with the moderator role ids cached per guild.
+
+    A guild's moderator roles are the ids configured for it in ``role_ids``,
+    or else the roles whose name (case-insensitive) is in ``role_names``,
+    looked up once in ``guild.roles``. The result is cached until
+    ``invalidate`` is called for the guild (the bots do it on role and guild
+    update events), so a check is an owner id comparison plus one
+    ``member.get_role`` per moderator role, usually one.
+    """
+
+    def __init__(self, role_names=(), role_ids=None):
+        self.role_names = {name.lower() for name in role_names}
+        self.role_ids = {guild_id: frozenset(ids) for guild_id, ids in (role_ids or {}).items()}
+        self._moderator_roles = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def moderator_roles(self, guild):
+        roles = self._moderator_roles.get(guild.id)
+        if roles is not None:
+            self.hits += 1
+            return roles
+        self.misses += 1
+        roles = self.role_ids.get(guild.id)
+        if roles is None:
+            names = self.role_names
+            roles = frozenset(role.id for role in guild.roles if role.name.lower() in names) if names else frozenset()
+        self._moderator_roles[guild.id] = roles
+        return roles
+
+    def invalidate(self, guild_id):
+        if self._moderator_roles.pop(guild_id, None) is not None:
+            self.invalidations += 1
+
+    def is_owner(self, interaction):
+        guild = interaction.guild
+        return guild is not None and interaction.user.id == guild.owner_id
+
+    def is_owner_or_moderator(self, interaction):
+        guild = interaction.guild
+        if guild is None:
+            return False
+        user = interaction.user
+        if user.id == guild.owner_id:
+            return True
+        roles = self.moderator_roles(guild)
+        if not roles:
+            return False
+        # get_role cerca tra gli id del membro, senza costruire la lista dei Role
+        get_role = user.get_role
+        for role_id in roles:
+            if get_role(role_id) is not None:
+                return True
+        return False
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "guilds": len(self._moderator_roles),
+        }
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+
+def atomic_write(path, payload: bytes):
+    """Write ``payload`` to ``path`` through a temp file + rename so a crash never leaves a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def dump_json(obj) -> bytes:
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def save_json(path, obj):
+    """Atomically write ``obj`` as JSON; returns the number of bytes written."""
+    payload = dump_json(obj)
+    atomic_write(path, payload)
+    return len(payload)
+
+
+def load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class WriteBehindWriter:
+    """Debounced, atomic persistence of an in-memory document.
+
+    Callers mark the state dirty instead of writing it. Writes are coalesced
+    until ``interval`` seconds have passed since the first pending change or
+    ``max_dirty`` changes have piled up, whichever comes first. ``snapshot``
+    runs on the event loop and must return a copy that is safe to hand to a
+    worker thread; serialization and the file write happen off the loop.
+
+    ``write`` replaces the default serialize + atomic file write, for targets
+    that are not a single file (it must return the number of bytes written).
+    """
+
+    def __init__(self, path, snapshot, *, interval=2.0, max_dirty=50, serialize=dump_json, write=None):
+        self.path = path
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self._snapshot = snapshot
+        self._serialize = serialize
+        self._write_target = write or self._write_file
+
+        self._dirty = 0
+        self._closing = False
+        self._task = None
+        self._lock = None
+        self._dirty_event = None
+        self._threshold_event = None
+
+        self.marks = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.last_write_seconds = 0.0
+
+    # ---------- state ----------
+
+    @property
+    def dirty(self):
+        return self._dirty > 0
+
+    @property
+    def coalesced(self):
+        """Number of changes that were absorbed into another change's write."""
+        return max(self.marks - self.writes - self._dirty, 0)
+
+    def stats(self):
+        return {
+            "marks": self.marks,
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "pending": self._dirty,
+            "bytes_written": self.bytes_written,
+            "last_write_seconds": self.last_write_seconds,
+        }
+
+    def mark_dirty(self, count=1):
+        self._dirty += count
+        self.marks += count
+        if self._dirty_event is not None:
+            self._dirty_event.set()
+            if self._dirty >= self.max_dirty:
+                self._threshold_event.set()
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        """Start the background flusher on the running loop. Safe to call more than once."""
+        if self._task is not None and not self._task.done():
+            return
+        self._closing = False
+        self._lock = asyncio.Lock()
+        self._dirty_event = asyncio.Event()
+        self._threshold_event = asyncio.Event()
+        if self._dirty:
+            self._dirty_event.set()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """Stop the flusher and write anything still pending."""
+        if self._task is not None:
+            self._closing = True
+            self._dirty_event.set()
+            self._threshold_event.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def flush_sync(self):
+        """Blocking flush for use once the event loop is gone (e.g. after ``bot.run`` returns)."""
+        if not self._dirty:
+            return False
+        pending = self._dirty
+        self._dirty = 0
+        try:
+            self._write(self._snapshot())
+        except BaseException:
+            self._dirty += pending
+            raise
+        return True
+
+    async def flush(self):
+        if self._lock is None:
+            return self.flush_sync()
+
+        async with self._lock:
+            if not self._dirty:
+                return False
+            pending = self._dirty
+            self._dirty = 0
+            self._dirty_event.clear()
+            self._threshold_event.clear()
+            snapshot = self._snapshot()
+            try:
+                await asyncio.to_thread(self._write, snapshot)
+            except BaseException:
+                self._dirty += pending
+                self._dirty_event.set()
+                raise
+            return True
+
+    # ---------- internals ----------
+
+    def _write_file(self, snapshot):
+        payload = self._serialize(snapshot)
+        atomic_write(self.path, payload)
+        return len(payload)
+
+    def _write(self, snapshot):
+        started = time.perf_counter()
+        written = self._write_target(snapshot)
+        self.writes += 1
+        self.bytes_written += written
+        self.last_write_seconds = time.perf_counter() - started
+
+    async def _run(self):
+        while not self._closing:
+            await self._dirty_event.wait()
+            # asyncio.wait (unlike wait_for on 3.11) never swallows a cancellation
+            waiter = asyncio.ensure_future(self._threshold_event.wait())
+            try:
+                await asyncio.wait((waiter,), timeout=self.interval)
+            finally:
+                waiter.cancel()
+            if self._closing:
+                return
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Error saving {self.path}: {e}")
+                await asyncio.sleep(self.interval)
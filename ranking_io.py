@@ -0,0 +1,251 @@
+"""Stream rankings to and from CSV / NDJSON files in fixed-size chunks.
+
+Both directions are generator pipelines, so memory is bounded by one chunk
+however many players a ranking has::
+
+    export   store.scan pages -> (rank, user_id, name, points) -> text blocks
+    import   file lines -> (user_id, name, points) -> {uid: [name, points]} chunks
+
+Columns (CSV header / NDJSON keys) are ``rank, user_id, name, points``;
+``rank`` is ignored on import and ``name`` is optional. The bot steps these
+one chunk at a time (store reads on the event loop, file I/O in a worker
+thread); the CLI runs them straight through against the json or sqlite
+backend, with the bot stopped when the backend is json:
+
+    python ranking_io.py export daily --format csv > daily.csv
+    python ranking_io.py import historical players.ndjson --replace
+"""
+import csv
+import io
+import itertools
+import json
+import sys
+
+FORMATS = ("csv", "ndjson")
+FIELDS = ("rank", "user_id", "name", "points")
+CHUNK = 1000
+
+
+# ================= EXPORT =================
+
+class RankNumbering:
+    """Numbers consecutive ``scan`` pages as ``(rank, user_id, name, points)`` rows; ties share a rank."""
+
+    def __init__(self):
+        self.position = 0
+        self.rank = 0
+        self.previous = None
+
+    def number(self, rows):
+        block = []
+        for uid, entry in rows:
+            self.position += 1
+            points = entry["points"]
+            if points != self.previous:
+                self.rank = self.position
+                self.previous = points
+            block.append((self.rank, uid, entry["name"], points))
+        return block
+
+
+def iter_ranking(store, ranking, chunk=CHUNK):
+    """Lists of ``(rank, user_id, name, points)`` in rank order; ties share a rank."""
+    cursor = None
+    numbering = RankNumbering()
+    while True:
+        rows, cursor = store.scan(ranking, cursor, chunk)
+        block = numbering.number(rows)
+        if block:
+            yield block
+        if cursor is None:
+            return
+
+
+def csv_header():
+    return ",".join(FIELDS) + "\n"
+
+
+def csv_block(block):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(block)
+    return buffer.getvalue()
+
+
+def ndjson_block(block, dumps=json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode):
+    return "".join(
+        dumps({"rank": rank, "user_id": uid, "name": name, "points": points}) + "\n"
+        for rank, uid, name, points in block
+    )
+
+
+# Formato -> (intestazione, codifica di un blocco): il bot li usa un blocco alla volta
+BLOCK_ENCODERS = {"csv": (csv_header, csv_block), "ndjson": (lambda: "", ndjson_block)}
+
+
+def encode_csv(chunks):
+    yield csv_header()
+    for block in chunks:
+        yield csv_block(block)
+
+
+def encode_ndjson(chunks):
+    for block in chunks:
+        yield ndjson_block(block)
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson}
+
+
+# ================= IMPORT =================
+
+def _row(user_id, name, points):
+    uid = str(user_id).strip()
+    if not uid.isdigit() or isinstance(points, bool):
+        return None
+    try:
+        points = int(points)
+    except (TypeError, ValueError):
+        return None
+    name = str(name).strip() if name is not None else ""
+    return uid, name or uid, points
+
+
+def parse_rows(lines, fmt=None, stats=None):
+    """``(user_id, name, points)`` from CSV or NDJSON ``lines``.
+
+    The format is sniffed from the first non-blank line when ``fmt`` is None.
+    Rows without a numeric user id or integer points are skipped and counted
+    in ``stats["skipped"]``; ``stats["rows"]`` counts the valid ones.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("rows", 0)
+    stats.setdefault("skipped", 0)
+    lines = iter(lines)
+    if fmt is None:
+        first = next((line for line in lines if line.strip()), None)
+        if first is None:
+            return
+        fmt = "ndjson" if first.lstrip().startswith("{") else "csv"
+        lines = itertools.chain((first,), lines)
+
+    if fmt == "ndjson":
+        records = _ndjson_records(lines, stats)
+    else:
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is None or not {"user_id", "points"} <= set(reader.fieldnames):
+            raise ValueError("CSV header must have user_id and points columns")
+        records = reader
+
+    for record in records:
+        row = _row(record.get("user_id", ""), record.get("name"), record.get("points"))
+        if row is None:
+            stats["skipped"] += 1
+            continue
+        stats["rows"] += 1
+        yield row
+
+
+def _ndjson_records(lines, stats):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            stats["skipped"] += 1
+            continue
+        yield record
+
+
+def chunk_entries(rows, merge=True, chunk=CHUNK):
+    """Group rows into ``{uid: [name, points]}`` dicts of up to ``chunk`` players.
+
+    A player repeated in the file adds up when merging; otherwise the last
+    row wins.
+    """
+    entries = {}
+    for uid, name, points in rows:
+        entry = entries.get(uid)
+        if entry is not None and merge:
+            entry[0] = name
+            entry[1] += points
+        else:
+            entries[uid] = [name, points]
+            if len(entries) >= chunk:
+                yield entries
+                entries = {}
+    if entries:
+        yield entries
+
+
+# ================= CLI =================
+
+def _open_store(args):
+    from ranking_store import JsonRankingStore, SQLiteRankingStore
+
+    if args.backend == "sqlite":
+        return SQLiteRankingStore(args.db), None
+    store = JsonRankingStore.load(args.data)
+    # Il bot riparte dal journal_seq dello snapshot: va conservato
+    return store, store.data.pop("journal_seq", None)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export or import hangman rankings as CSV / NDJSON")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--data", default="hangman_data.json", help="json backend file")
+    parser.add_argument("--db", default="hangman_rankings.db", help="sqlite backend database")
+    parser.add_argument("--chunk", type=int, default=CHUNK)
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_cmd = sub.add_parser("export")
+    export_cmd.add_argument("ranking", choices=("daily", "historical"))
+    export_cmd.add_argument("--format", choices=FORMATS, default="csv")
+    export_cmd.add_argument("--output", help="file to write (default stdout)")
+    import_cmd = sub.add_parser("import")
+    import_cmd.add_argument("ranking", choices=("daily", "historical"))
+    import_cmd.add_argument("file")
+    import_cmd.add_argument("--format", choices=FORMATS, help="default: sniffed from the first line")
+    import_cmd.add_argument("--replace", action="store_true", help="overwrite points instead of adding them")
+    args = parser.parse_args(argv)
+
+    ranking = f"{args.ranking}_ranking"
+    store, journal_seq = _open_store(args)
+    try:
+        if args.command == "export":
+            out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+            try:
+                for block in ENCODERS[args.format](iter_ranking(store, ranking, args.chunk)):
+                    out.write(block)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            return 0
+
+        stats = {}
+        players = 0
+        with open(args.file, "r", encoding="utf-8-sig", newline="") as f:
+            for entries in chunk_entries(parse_rows(f, args.format, stats), not args.replace, args.chunk):
+                store.import_entries(ranking, entries, not args.replace)
+                if args.backend == "sqlite":
+                    # Lo store sqlite bufferizza anche l'import: un batch per blocco
+                    store.flush()
+                players += len(entries)
+        if args.backend == "json":
+            from persistence import save_json
+
+            data = store.snapshot()
+            if journal_seq is not None:
+                data["journal_seq"] = journal_seq
+            save_json(args.data, data)
+        print(f"📥 {stats['rows']} row(s), {players} player update(s), {stats['skipped']} skipped", file=sys.stderr)
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import os
+import secrets
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# Letture consentite ai processi shard
+READ_OPS = ("get", "count", "top", "top_version", "rank_of", "scan", "page", "position_of", "last_reset")
+
+
+class RankingUnavailable(Exception):
+    """The aggregator could not be reached (refused, timed out or dropped the connection)."""
+
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _require_authkey(authkey):
+    # Chiunque raggiunga la porta senza chiave potrebbe scrivere nelle classifiche
+    if not authkey:
+        raise ValueError("the ranking aggregator needs an authkey (HANGMAN_RANKING_AUTHKEY)")
+
+
+def parse_address(value):
+    """``"host:port"`` -> ``(host, port)``; anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return value
+
+
+class RankingServer:
+    """Serves ranking updates and reads to shard processes over ``multiprocessing.connection``.
+
+    Each client connection gets a thread that only does blocking I/O; requests
+    run on the event loop, so the store is only ever touched from one thread.
+    Messages are JSON (never pickle: a request must not be able to run code).
+    A request is ``{"c": client, "b": [[seq, ops], ...], "r": [[op, *args], ...]}``:
+    the client's update batches, then reads (``READ_OPS``) answered by
+    ``read(op, args)``. JSON has no tuples, so list arguments (scan cursors)
+    are turned back into tuples.
+
+    Batches carry a per-client sequence number. ``apply_ops(ops, client, seq)``
+    applies a batch and records its id in the store (``last_batch(client)``
+    reads it back, also after a restart); a batch at or below the recorded
+    id was already applied and is skipped. The reply's ``"a"`` tells the
+    client which batches it can forget.
+    """
+
+    def __init__(self, address, authkey, apply_ops, read, last_batch):
+        _require_authkey(authkey)
+        self.address = address
+        self.authkey = authkey
+        self.apply_ops = apply_ops
+        self.read = read
+        self.last_batch = last_batch
+        self._loop = None
+        self._listener = None
+        self._closed = False
+
+        self.clients = 0
+        self.requests = 0
+        self.ops = 0
+        self.duplicates = 0
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._accept_loop, name="ranking-accept", daemon=True).start()
+
+    def close(self):
+        self._closed = True
+        if self._listener is not None:
+            self._listener.close()
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError as e:
+                print(f"⚠️ Ranking client rejected: {e}")
+                continue
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            self.clients += 1
+            threading.Thread(target=self._serve, args=(conn,), name="ranking-client", daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while not self._closed:
+                try:
+                    request = conn.recv_bytes()
+                except (EOFError, OSError):
+                    return
+                future = asyncio.run_coroutine_threadsafe(self._handle(request), self._loop)
+                try:
+                    conn.send_bytes(future.result())
+                except (OSError, RuntimeError):
+                    return
+
+    async def _handle(self, payload):
+        try:
+            request = json.loads(payload)
+            client, batches, reads = request["c"], request["b"], request["r"]
+        except (ValueError, KeyError, TypeError) as e:
+            return encode({"a": 0, "e": f"bad request: {e}"})
+        self.requests += 1
+
+        applied = self.last_batch(client)
+        for seq, ops in batches:
+            if seq <= applied:
+                # Risposta persa la volta prima: il batch è già nelle classifiche
+                self.duplicates += 1
+                continue
+            try:
+                self.apply_ops(ops, client, seq)
+                self.ops += len(ops)
+            except Exception as e:
+                # Resta registrato come applicato: ripeterlo rifarebbe le operazioni già riuscite
+                print(f"⚠️ Ranking batch {client}#{seq} failed: {e}")
+                return encode({"a": seq, "e": f"{type(e).__name__}: {e}"})
+            applied = seq
+
+        try:
+            values = []
+            for op, *args in reads:
+                if op not in READ_OPS:
+                    raise ValueError(f"unknown read {op!r}")
+                values.append(self.read(op, [tuple(arg) if isinstance(arg, list) else arg for arg in args]))
+            return encode({"a": applied, "v": values})
+        except Exception as e:
+            return encode({"a": applied, "e": f"{type(e).__name__}: {e}"})
+
+
+class RemoteRankingStore:
+    """Ranking store for shard processes; the aggregator process owns the data.
+
+    Same write interface as the local stores. Like ``SQLiteRankingStore``,
+    updates are buffered and shipped by a ``WriteBehindWriter`` through
+    ``take_batch`` / ``write_batch`` (off the event loop). The bot reads with
+    ``read_many``, which runs the round trip in a worker thread and sends
+    the buffer along, so a process always sees its own updates. Read
+    results are cached for ``cache_ttl`` seconds (dropped on any local
+    update). The synchronous reads (``get``, ``top``...) block and are only
+    meant for scripts.
+
+    Every batch gets the next sequence number of this process (``client``).
+    A batch without an answer stays queued with its number and is sent again
+    in front of the next request; the aggregator skips the ones it already
+    applied, so a timeout or a dropped reply never applies points twice.
+    Transport failures raise ``RankingUnavailable``.
+    """
+
+    def __init__(self, address, authkey, *, client=None, timeout=5.0, cache_ttl=1.0, clock=time.monotonic):
+        _require_authkey(authkey)
+        self.address = address
+        self.authkey = authkey
+        self.client = client or f"{os.getpid()}-{secrets.token_hex(4)}"
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self._clock = clock
+        self._conn = None
+        self._lock = threading.Lock()
+        self._ops = []
+        self._seq = 0
+        # [seq, ops] inviati senza risposta: si rimandano con lo stesso numero
+        self._unacked = []
+        self._cache = {}
+        self._writes = 0
+
+        self.round_trips = 0
+        self.bytes_sent = 0
+
+    # ---------- writes ----------
+
+    def add_points(self, uid, name, points):
+        self.add_many({uid: [name, points]})
+
+    def add_many(self, deltas):
+        ops = self._ops
+        if not ops or ops[-1][0] != "points":
+            ops.append(("points", {}))
+        pending = ops[-1][1]
+        for uid, (name, points) in deltas.items():
+            entry = pending.get(uid)
+            if entry is None:
+                pending[uid] = [name, points]
+            else:
+                entry[0] = name
+                entry[1] += points
+        self._changed()
+
+    def _changed(self):
+        self._writes += 1
+        self._cache.clear()
+
+    def import_entries(self, ranking, entries, merge=True):
+        self._ops.append(("import", ranking, entries, merge))
+        self._changed()
+
+    def reset(self, ranking):
+        # L'aggregatore archivia la classifica ritirata: niente da restituire qui
+        self._ops.append(("reset", ranking, None))
+        self._changed()
+        return None
+
+    @property
+    def last_reset(self):
+        return self._read("last_reset")
+
+    @last_reset.setter
+    def last_reset(self, value):
+        # reset + last_reset arrivano insieme da reset_ranking: un solo evento
+        ops = self._ops
+        if ops and ops[-1][0] == "reset" and ops[-1][2] is None:
+            ops[-1] = ("reset", ops[-1][1], value)
+        else:
+            ops.append(("day", value))
+        self._changed()
+
+    def take_batch(self):
+        """Hand the buffered updates to the writer (runs on the event loop)."""
+        ops = self._ops
+        self._ops = []
+        return ops
+
+    def write_batch(self, ops):
+        """Send a batch, and any unanswered earlier ones, to the aggregator (runs in a worker thread)."""
+        if not ops and not self._unacked:
+            return 0
+        _, size = self._request(ops)
+        return size
+
+    def flush(self):
+        return self.write_batch(self.take_batch())
+
+    # ---------- reads ----------
+
+    async def read_many(self, reads):
+        """Values of ``reads`` (``(op, *args)`` tuples) in one round trip, run in a worker thread."""
+        now = self._clock()
+        values = [None] * len(reads)
+        missing = []
+        for i, read in enumerate(reads):
+            cached = self._cache.get(_cache_key(read))
+            if cached is not None and cached[0] > now:
+                values[i] = cached[1]
+            else:
+                missing.append(i)
+        if not missing:
+            return values
+
+        writes = self._writes
+        fetched, _ = await asyncio.to_thread(self._request, self.take_batch(), [reads[i] for i in missing])
+        # Un aggiornamento arrivato durante il round trip rende il risultato vecchio: niente cache
+        cache = self._writes == writes
+        expires = self._clock() + self.cache_ttl
+        for i, value in zip(missing, fetched):
+            values[i] = value
+            # Le pagine di scan (export) non si ripetono: in cache terrebbero in memoria tutta la classifica
+            if cache and reads[i][0] != "scan":
+                self._cache[_cache_key(reads[i])] = (expires, value)
+        return values
+
+    def _read(self, op, *args):
+        read = (op, *args)
+        cached = self._cache.get(_cache_key(read))
+        if cached is not None and cached[0] > self._clock():
+            return cached[1]
+        values, _ = self._request(self.take_batch(), [read])
+        if op != "scan":
+            self._cache[_cache_key(read)] = (self._clock() + self.cache_ttl, values[0])
+        return values[0]
+
+    def get(self, ranking, uid):
+        return self._read("get", ranking, uid)
+
+    def count(self, ranking):
+        return self._read("count", ranking)
+
+    def top_version(self, ranking):
+        return self._read("top_version", ranking)
+
+    def top(self, ranking, n=10):
+        return self._read("top", ranking, n)
+
+    def rank_of(self, ranking, uid):
+        return self._read("rank_of", ranking, uid)
+
+    def page(self, ranking, start, n=10):
+        return self._read("page", ranking, start, n)
+
+    def position_of(self, ranking, uid):
+        return self._read("position_of", ranking, uid)
+
+    def scan(self, ranking, after=None, n=1000):
+        return self._read("scan", ranking, after, n)
+
+    # ---------- transport ----------
+
+    def _request(self, ops, reads=()):
+        with self._lock:
+            if ops:
+                self._seq += 1
+                self._unacked.append([self._seq, ops])
+            payload = encode({"c": self.client, "b": self._unacked, "r": reads})
+            try:
+                reply = json.loads(self._round_trip(payload))
+            except (OSError, EOFError, AuthenticationError) as e:
+                raise RankingUnavailable(f"ranking aggregator {self.address}: {e}") from e
+            applied = reply["a"]
+            self._unacked = [batch for batch in self._unacked if batch[0] > applied]
+        if "e" in reply:
+            raise RuntimeError(f"ranking aggregator: {reply['e']}")
+        return reply["v"], len(payload)
+
+    def _round_trip(self, payload):
+        if self._conn is None:
+            self._conn = Client(self.address, authkey=self.authkey)
+        try:
+            self._conn.send_bytes(payload)
+        except OSError:
+            # Connessione vecchia (aggregatore riavviato): una sola nuova prova
+            self._drop()
+            self._conn = Client(self.address, authkey=self.authkey)
+            self._conn.send_bytes(payload)
+        try:
+            if not self._conn.poll(self.timeout):
+                raise TimeoutError(f"ranking aggregator did not answer within {self.timeout}s")
+            reply = self._conn.recv_bytes()
+        except BaseException:
+            self._drop()
+            raise
+        self.round_trips += 1
+        self.bytes_sent += len(payload)
+        return reply
+
+    def _drop(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def stats(self):
+        return {
+            "round_trips": self.round_trips,
+            "bytes_sent": self.bytes_sent,
+            "pending_ops": len(self._ops),
+            "unacked_batches": len(self._unacked),
+        }
+
+    def close(self):
+        with self._lock:
+            self._drop()
+
+
+def _cache_key(read):
+    # I cursori di scan tornano dall'aggregatore come liste
+    return tuple(tuple(arg) if isinstance(arg, list) else arg for arg in read)
@@ -0,0 +1,733 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from leaderboard import Leaderboard
+from persistence import save_json
+
+RANKINGS = ("daily_ranking", "historical_ranking")
+
+
+def empty_document():
+    return {
+        "daily_ranking": {},
+        "historical_ranking": {},
+        "last_reset": datetime.now().date().isoformat()
+    }
+
+
+class JsonRankingStore:
+    """Rankings kept in memory in the ``hangman_data.json`` layout.
+
+    Entries are ``{"name": ..., "points": ...}`` dicts keyed by user id string.
+    Each ranking also has a ``Leaderboard`` that is updated with every delta,
+    so top-N and rank lookups never sort the whole ranking. Retired rankings
+    are archived as JSON files in ``archive_dir``.
+    """
+
+    def __init__(self, data=None, archive_dir="hangman_archive"):
+        self.data = data if data is not None else empty_document()
+        self.boards = {ranking: Leaderboard(self.data[ranking]) for ranking in RANKINGS}
+        self.archive_dir = archive_dir
+
+    @classmethod
+    def load(cls, path, archive_dir="hangman_archive"):
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f), archive_dir)
+        return cls(archive_dir=archive_dir)
+
+    @property
+    def last_reset(self):
+        return self.data["last_reset"]
+
+    @last_reset.setter
+    def last_reset(self, value):
+        self.data["last_reset"] = value
+
+    def add_points(self, uid, name, points):
+        for ranking in RANKINGS:
+            entries = self.data[ranking]
+            entry = entries.get(uid)
+            if entry is None:
+                entry = entries[uid] = {"name": name, "points": 0}
+            renamed = entry["name"] != name
+            entry["points"] += points
+            entry["name"] = name
+            self.boards[ranking].update(uid, entry["points"], renamed)
+
+    def add_many(self, deltas):
+        """Apply ``{uid: [name, points]}`` to every ranking in one pass."""
+        for ranking in RANKINGS:
+            entries = self.data[ranking]
+            board = self.boards[ranking]
+            for uid, (name, points) in deltas.items():
+                entry = entries.get(uid)
+                if entry is None:
+                    entry = entries[uid] = {"name": name, "points": 0}
+                renamed = entry["name"] != name
+                entry["points"] += points
+                entry["name"] = name
+                board.update(uid, entry["points"], renamed)
+
+    def import_entries(self, ranking, entries, merge=True):
+        """Write ``{uid: [name, points]}`` into one ranking, adding to (``merge``) or replacing the points."""
+        data = self.data[ranking]
+        board = self.boards[ranking]
+        for uid, (name, points) in entries.items():
+            entry = data.get(uid)
+            if entry is None:
+                entry = data[uid] = {"name": name, "points": 0}
+            renamed = entry["name"] != name
+            entry["points"] = entry["points"] + points if merge else points
+            entry["name"] = name
+            board.update(uid, entry["points"], renamed)
+
+    def get(self, ranking, uid):
+        return self.data[ranking].get(uid)
+
+    def count(self, ranking):
+        return len(self.data[ranking])
+
+    def top_version(self, ranking):
+        """Changes whenever the top of ``ranking`` may have changed."""
+        return self.boards[ranking].version
+
+    def top(self, ranking, n=10):
+        entries = self.data[ranking]
+        return [(uid, entries[uid]) for uid in self.boards[ranking].top(n)]
+
+    def page(self, ranking, start, n=10):
+        """Entries at places ``start`` to ``start + n`` in ranking order."""
+        entries = self.data[ranking]
+        return [(uid, entries[uid]) for uid in self.boards[ranking].page(start, start + n)]
+
+    def position_of(self, ranking, uid):
+        """0-based place of ``uid`` in the order of ``page``, or None."""
+        return self.boards[ranking].position(uid)
+
+    def scan(self, ranking, after=None, n=1000):
+        """Next ``n`` entries in rank order after the cursor ``after``.
+
+        Returns ``(rows, cursor)``; pass ``cursor`` back for the following
+        rows, it is None once the ranking is exhausted. A live walk, not a
+        snapshot: a player whose points change mid-scan can be skipped or seen
+        twice.
+        """
+        entries = self.data[ranking]
+        keys = self.boards[ranking].scan(after, n)
+        rows = [(key[2], entries[key[2]]) for key in keys]
+        return rows, keys[-1] if len(keys) == n else None
+
+    def rank_of(self, ranking, uid):
+        return self.boards[ranking].rank_of(uid)
+
+    def record_batch(self, client, seq):
+        """Remember that update batch ``seq`` from ``client`` was applied (see ``RankingServer``)."""
+        self.data.setdefault("batches", {})[client] = seq
+
+    def last_batch(self, client):
+        return self.data.get("batches", {}).get(client, 0)
+
+    def reset(self, ranking):
+        """Start a new generation of ``ranking`` in O(1); returns the retired entries for ``archive``."""
+        retired = self.data[ranking]
+        version = self.boards[ranking].version + 1
+        self.data[ranking] = {}
+        self.boards[ranking] = Leaderboard()
+        self.boards[ranking].version = version
+        return retired
+
+    def archive(self, ranking, retired, started=None):
+        """Write a retired generation to ``archive_dir`` (runs in a worker thread)."""
+        if not retired:
+            return 0
+        os.makedirs(self.archive_dir, exist_ok=True)
+        archived_at = datetime.now(timezone.utc)
+        path = os.path.join(self.archive_dir, f"{ranking}-{archived_at:%Y%m%dT%H%M%S%f}.json")
+        return save_json(path, {
+            "ranking": ranking,
+            "started": started,
+            "archived_at": archived_at.isoformat(),
+            "entries": retired,
+        })
+
+    def snapshot(self):
+        """Copy safe to serialize from a worker thread."""
+        return {
+            "daily_ranking": {uid: dict(e) for uid, e in self.data["daily_ranking"].items()},
+            "historical_ranking": {uid: dict(e) for uid, e in self.data["historical_ranking"].items()},
+            "last_reset": self.data["last_reset"],
+            "batches": dict(self.data.get("batches", {})),
+        }
+
+    def close(self):
+        pass
+
+
+class SQLiteRankingStore:
+    """Rankings in an embedded SQLite database (WAL mode).
+
+    Point deltas and imports are buffered in memory and applied in a single
+    transaction by ``write_batch`` (driven by a ``WriteBehindWriter``). ``top`` walks the
+    ``(ranking, points DESC)`` index, so it only touches the rows it returns,
+    and ``rank_of`` is one index range count. Reads never write: ``get``,
+    ``count``, ``top``, ``rank_of`` and ``position_of`` add the deltas not yet
+    committed (the buffer and the batches handed to the writer) to what they
+    read, so they see the latest points. ``page`` past the first page and
+    ``scan`` read the last committed batch; callers that need those exact
+    flush the writer first (``has_changes``). There is no in-memory order
+    here, so ``top_version`` changes on every write.
+
+    Each ranking's rows live under a generation id (the ``ranking`` column).
+    ``reset`` just switches to a fresh id, so it is O(1) and never blocks on
+    deleting rows; ``archive`` later moves the retired generation into
+    ``ranking_archive`` from a worker thread. Buffered deltas are keyed by
+    generation, so those of a retired generation are still written by the
+    next batch, and ``archive`` waits (up to ``archive_timeout`` seconds)
+    until they are committed. The move itself runs on its own connection,
+    ``archive_chunk`` rows per transaction, without ``_lock``: under WAL the
+    reads on the loop go on while a large day is archived.
+    """
+
+    def __init__(self, path, archive_timeout=60.0, archive_chunk=5000):
+        self.path = path
+        self.archive_timeout = archive_timeout
+        self.archive_chunk = archive_chunk
+        self._lock = threading.Lock()
+        self._written = threading.Condition(self._lock)
+        # Delta bufferizzati, {(generazione, uid): [nome, punti]}
+        self._pending = {}
+        # Generazioni ritirate con delta non ancora scritti -> ancora nel buffer (non solo in _inflight)
+        self._retired = {}
+        self._reset = {}
+        # Ultimo batch applicato per client dell'aggregatore; _marks quelli non ancora scritti
+        self._batches = {}
+        self._marks = {}
+        # Batch consegnati al writer e non ancora scritti: le letture li sommano
+        self._inflight = []
+        self._loop = None
+        self._versions = [0] * len(RANKINGS)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rankings (
+                ranking INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                points INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (ranking, user_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS rankings_by_points ON rankings (ranking, points DESC);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ranking_archive (
+                generation INTEGER NOT NULL,
+                ranking TEXT NOT NULL,
+                started TEXT,
+                archived_at TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                points INTEGER NOT NULL,
+                PRIMARY KEY (generation, user_id)
+            ) WITHOUT ROWID;
+        """)
+        if self._get_meta("last_reset") is None:
+            self._set_meta("last_reset", datetime.now().date().isoformat())
+        # Generazione corrente di ogni classifica (0 e 1 nei database creati prima)
+        self._ids = [int(self._get_meta(f"generation:{ranking}") or index) for index, ranking in enumerate(RANKINGS)]
+        self._next_id = int(self._get_meta("next_generation") or max(self._ids) + 1)
+        with self._lock:
+            rows = self.conn.execute("SELECT key, value FROM meta WHERE key LIKE 'batch:%'").fetchall()
+        self._batches = {key[len("batch:"):]: int(value) for key, value in rows}
+
+    # ---------- meta ----------
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    @property
+    def last_reset(self):
+        return self._get_meta("last_reset")
+
+    @last_reset.setter
+    def last_reset(self, value):
+        self._set_meta("last_reset", value)
+
+    # ---------- writes ----------
+
+    def add_points(self, uid, name, points):
+        for index, generation in enumerate(self._ids):
+            self._versions[index] += 1
+            key = (generation, uid)
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = [name, points]
+            else:
+                pending[0] = name
+                pending[1] += points
+
+    def add_many(self, deltas):
+        """Buffer ``{uid: [name, points]}`` for every ranking; written by the next batch."""
+        buffered = self._pending
+        for index, generation in enumerate(self._ids):
+            self._versions[index] += 1
+            for uid, (name, points) in deltas.items():
+                pending = buffered.get((generation, uid))
+                if pending is None:
+                    buffered[(generation, uid)] = [name, points]
+                else:
+                    pending[0] = name
+                    pending[1] += points
+
+    def reset(self, ranking):
+        """Switch ``ranking`` to a new, empty generation; returns the retired generation id for ``archive``.
+
+        The retired generation's buffered deltas stay in the buffer and are
+        written by the next batch, before ``archive`` moves the generation.
+        """
+        index = RANKINGS.index(ranking)
+        retired = self._ids[index]
+        self._ids[index] = self._next_id
+        self._next_id += 1
+        self._versions[index] += 1
+        self._reset[index] = self._ids[index]
+        with self._lock:
+            buffered = any(generation == retired for generation, _ in self._pending)
+            if buffered or any(self._holds(batch, retired) for batch in self._inflight):
+                self._retired[retired] = buffered
+        return retired
+
+    @staticmethod
+    def _holds(batch, generation):
+        return any(batch_generation == generation for batch_generation, _ in batch[1])
+
+    def _settle_retired(self):
+        """Drop the retired generations fully committed and wake ``archive``; call with the lock held."""
+        for generation, buffered in list(self._retired.items()):
+            if not buffered and not any(self._holds(batch, generation) for batch in self._inflight):
+                del self._retired[generation]
+                self._written.notify_all()
+
+    def record_batch(self, client, seq):
+        """Remember that update batch ``seq`` from ``client`` was applied; written with the next batch."""
+        self._batches[client] = seq
+        self._marks[client] = seq
+
+    def last_batch(self, client):
+        return self._batches.get(client, 0)
+
+    def has_changes(self):
+        return bool(self._pending or self._reset or self._marks or self._inflight)
+
+    def take_batch(self):
+        """Hand the buffered changes to the writer (runs on the event loop)."""
+        batch = (self._reset, self._pending, self._next_id, self._marks)
+        self._reset = {}
+        self._pending = {}
+        self._marks = {}
+        if batch[0] or batch[1] or batch[3]:
+            # Solo il loop aggiunge; il writer toglie il suo batch sotto il lock
+            with self._lock:
+                self._inflight.append(batch)
+                # I delta delle generazioni ritirate ora sono tutti in questo batch
+                for generation in self._retired:
+                    self._retired[generation] = False
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._loop = None
+        return batch
+
+    def write_batch(self, batch):
+        """Apply a batch in one transaction (runs in a worker thread)."""
+        resets, pending, next_id, marks = batch
+        if not resets and not pending and not marks:
+            return 0
+        rows = [(generation, uid, name, points) for (generation, uid), (name, points) in pending.items()]
+        try:
+            with self._lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for index, generation in resets.items():
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?), ('next_generation', ?)",
+                            (f"generation:{RANKINGS[index]}", str(generation), str(next_id))
+                        )
+                    self.conn.executemany(
+                        "INSERT INTO rankings (ranking, user_id, name, points) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(ranking, user_id) DO UPDATE SET "
+                        "points = points + excluded.points, name = excluded.name",
+                        rows
+                    )
+                    # Nella stessa transazione dei punti: dopo un crash non si riapplica né si perde il segno
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                        [(f"batch:{client}", str(seq)) for client, seq in marks.items()]
+                    )
+                    self.conn.execute("COMMIT")
+                except BaseException:
+                    self.conn.execute("ROLLBACK")
+                    raise
+                # Nello stesso lock del COMMIT: una lettura vede il batch o nel database o in _inflight
+                self._forget_batch(batch)
+                self._settle_retired()
+        except BaseException:
+            self._hand_back(batch)
+            raise
+        return sum(len(uid) + len(name) + 8 for _, uid, name, _ in rows)
+
+    def _forget_batch(self, batch):
+        for i, inflight in enumerate(self._inflight):
+            if inflight is batch:
+                del self._inflight[i]
+                return
+
+    def _hand_back(self, batch):
+        """Return a failed batch to the buffer on the event loop thread, which owns it."""
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is None or loop is running or loop.is_closed():
+            self._requeue(batch)
+        else:
+            loop.call_soon_threadsafe(self._requeue, batch)
+
+    def _requeue(self, batch):
+        resets, pending, _, marks = batch
+        for key, (name, points) in pending.items():
+            newer = self._pending.get(key)
+            if newer is None:
+                self._pending[key] = [name, points]
+            else:
+                newer[1] += points
+        with self._lock:
+            self._forget_batch(batch)
+            # Generazioni ritirate: i loro delta sono tornati nel buffer, archive continua ad aspettare
+            for generation in self._retired:
+                if any(batch_generation == generation for batch_generation, _ in pending):
+                    self._retired[generation] = True
+        self._reset = {**resets, **self._reset}
+        self._marks = {**marks, **self._marks}
+
+    def archive(self, ranking, retired, started=None):
+        """Move a retired generation into ``ranking_archive`` (runs in a worker thread).
+
+        Waits for the generation's buffered and in-flight deltas to be
+        committed; raises TimeoutError after ``archive_timeout`` seconds.
+        Nothing writes to a retired generation after that, so the rows are
+        moved in chunks, each copied and deleted in one transaction.
+        """
+        with self._written:
+            if not self._written.wait_for(lambda: retired not in self._retired, self.archive_timeout):
+                raise TimeoutError(f"generation {retired} of {ranking} still has unwritten points")
+
+        archived_at = datetime.now(timezone.utc).isoformat()
+        archived = 0
+        # Connessione propria: le letture sul loop non aspettano lo spostamento
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    last = conn.execute(
+                        "SELECT MAX(user_id) FROM (SELECT user_id FROM rankings WHERE ranking = ? ORDER BY user_id LIMIT ?)",
+                        (retired, self.archive_chunk)
+                    ).fetchone()[0]
+                    if last is None:
+                        conn.execute("COMMIT")
+                        return archived
+                    cursor = conn.execute(
+                        "INSERT OR REPLACE INTO ranking_archive "
+                        "(generation, ranking, started, archived_at, user_id, name, points) "
+                        "SELECT ranking, ?, ?, ?, user_id, name, points FROM rankings WHERE ranking = ? AND user_id <= ?",
+                        (ranking, started, archived_at, retired, last)
+                    )
+                    archived += cursor.rowcount
+                    conn.execute("DELETE FROM rankings WHERE ranking = ? AND user_id <= ?", (retired, last))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        finally:
+            conn.close()
+
+    def import_entries(self, ranking, entries, merge=True):
+        """Buffer ``{uid: [name, points]}`` for one ranking, adding to (``merge``) or replacing the points.
+
+        Imports go through the buffer like point deltas, so the writer applies
+        them in order with every other change. A replace is buffered as the
+        difference from the player's current points (committed, in flight and
+        buffered): a batch taken before the import cannot bring the replaced
+        points back, and deltas that come later add on top.
+        """
+        index = RANKINGS.index(ranking)
+        generation = self._ids[index]
+        current = {}
+        if not merge:
+            with self._lock:
+                # Righe scritte e batch in volo letti insieme: un COMMIT sposta i punti dagli uni alle altre
+                stored = self._stored(generation, entries)
+                inflight = [batch[1] for batch in self._inflight]
+                for uid in entries:
+                    points = stored[uid][1] if uid in stored else 0
+                    for deltas in inflight:
+                        delta = deltas.get((generation, uid))
+                        if delta is not None:
+                            points += delta[1]
+                    current[uid] = points
+        buffered = self._pending
+        for uid, (name, points) in entries.items():
+            key = (generation, uid)
+            pending = buffered.get(key)
+            if pending is None:
+                buffered[key] = [name, points - current.get(uid, 0)]
+            else:
+                pending[0] = name
+                pending[1] = pending[1] + points if merge else points - current[uid]
+        self._versions[index] += 1
+        return len(entries)
+
+    def flush(self):
+        return self.write_batch(self.take_batch())
+
+    # ---------- reads ----------
+
+    def _read(self, query, params):
+        with self._lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def _changes(self, index):
+        """Deltas of ``RANKINGS[index]`` not committed yet, ``{uid: [name, points]}``; call with the lock held."""
+        generation = self._ids[index]
+        changes = {}
+        for batch in self._inflight:
+            for (batch_generation, uid), (name, points) in batch[1].items():
+                if batch_generation == generation:
+                    entry = changes.get(uid)
+                    if entry is None:
+                        changes[uid] = [name, points]
+                    else:
+                        entry[0] = name
+                        entry[1] += points
+        for (pending_generation, uid), (name, points) in self._pending.items():
+            if pending_generation == generation:
+                entry = changes.get(uid)
+                if entry is None:
+                    changes[uid] = [name, points]
+                else:
+                    entry[0] = name
+                    entry[1] += points
+        return changes
+
+    def _stored(self, generation, uids):
+        """``{uid: (name, points)}`` committed for ``uids``; call with the lock held."""
+        stored = {}
+        uids = list(uids)
+        for i in range(0, len(uids), 500):
+            chunk = uids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT user_id, name, points FROM rankings WHERE ranking = ? AND user_id IN ({','.join('?' * len(chunk))})",
+                (generation, *chunk)
+            ).fetchall()
+            stored.update((uid, (name, points)) for uid, name, points in rows)
+        return stored
+
+    def top_version(self, ranking):
+        return self._versions[RANKINGS.index(ranking)]
+
+    def get(self, ranking, uid):
+        index = RANKINGS.index(ranking)
+        generation = self._ids[index]
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT name, points FROM rankings WHERE ranking = ? AND user_id = ?", (generation, uid)
+            ).fetchone()
+            deltas = [batch[1].get((generation, uid)) for batch in self._inflight]
+        deltas.append(self._pending.get((generation, uid)))
+        entry = {"name": row[0], "points": row[1]} if row else None
+        for delta in deltas:
+            if delta is not None:
+                if entry is None:
+                    entry = {"name": delta[0], "points": 0}
+                entry["name"] = delta[0]
+                entry["points"] += delta[1]
+        return entry
+
+    def count(self, ranking):
+        index = RANKINGS.index(ranking)
+        generation = self._ids[index]
+        with self._lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM rankings WHERE ranking = ?", (generation,)).fetchone()[0]
+            changes = self._changes(index)
+            if changes:
+                # Giocatori nuovi non ancora scritti
+                count += len(changes) - len(self._stored(generation, changes))
+        return count
+
+    def top(self, ranking, n=10):
+        index = RANKINGS.index(ranking)
+        generation = self._ids[index]
+        with self._lock:
+            changes = self._changes(index)
+            # Con k giocatori cambiati, i primi n degli altri sono tra i primi n + k scritti
+            rows = self.conn.execute(
+                "SELECT user_id, name, points FROM rankings WHERE ranking = ? "
+                "ORDER BY points DESC, user_id LIMIT ?",
+                (generation, n + len(changes))
+            ).fetchall()
+            stored = self._stored(generation, changes) if changes else {}
+        if changes:
+            rows = [row for row in rows if row[0] not in changes]
+            for uid, (name, points) in changes.items():
+                rows.append((uid, name, stored[uid][1] + points if uid in stored else points))
+            rows.sort(key=lambda row: (-row[2], row[0]))
+            del rows[n:]
+        return [(uid, {"name": name, "points": points}) for uid, name, points in rows]
+
+    def page(self, ranking, start, n=10):
+        """Entries at places ``start`` to ``start + n`` in the order of ``scan``.
+
+        The first place is found by skipping ``start`` entries of the covering
+        ``rankings_by_points`` index (no table lookups, no sort); the page is
+        then read from there like a ``scan`` cursor.
+        """
+        generation = self._ids[RANKINGS.index(ranking)]
+        if not start:
+            return self.top(ranking, n)
+        first = self._read(
+            "SELECT points, user_id FROM rankings WHERE ranking = ? "
+            "ORDER BY points DESC, user_id LIMIT 1 OFFSET ?",
+            (generation, start)
+        )
+        if not first:
+            return []
+        points, uid = first[0]
+        rows = self._read(
+            "SELECT user_id, name, points FROM rankings WHERE ranking = ? "
+            "AND points <= ? AND (points < ? OR user_id >= ?) "
+            "ORDER BY points DESC, user_id LIMIT ?",
+            (generation, points, points, uid, n)
+        )
+        return [(uid, {"name": name, "points": points}) for uid, name, points in rows]
+
+    def position_of(self, ranking, uid):
+        entry = self.get(ranking, uid)
+        if entry is None:
+            return None
+        points = entry["points"]
+        return self._count_before(
+            ranking, (-points, uid),
+            "SELECT COUNT(*) FROM rankings WHERE ranking = ? AND points >= ? AND (points > ? OR user_id < ?)",
+            (points, points, uid)
+        )
+
+    def _count_before(self, ranking, key, query, params):
+        """Committed rows matching ``query`` (those ordered before ``key``), corrected for the uncommitted deltas."""
+        index = RANKINGS.index(ranking)
+        generation = self._ids[index]
+        with self._lock:
+            count = self.conn.execute(query, (generation, *params)).fetchone()[0]
+            changes = self._changes(index)
+            stored = self._stored(generation, changes) if changes else {}
+        for changed, (_, delta) in changes.items():
+            old = stored.get(changed)
+            if old is not None and (-old[1], changed) < key:
+                count -= 1
+            if (-((old[1] if old is not None else 0) + delta), changed) < key:
+                count += 1
+        return count
+
+    def scan(self, ranking, after=None, n=1000):
+        """Next ``n`` entries in rank order after the cursor ``after``; see ``JsonRankingStore.scan``.
+
+        Keyset pagination on ``rankings_by_points``: each page is an index
+        range scan from the cursor, however deep into the ranking it is. The
+        cursor pins the generation, so a reset mid-scan does not switch the
+        scan to the new, empty ranking.
+        """
+        if after is None:
+            generation = self._ids[RANKINGS.index(ranking)]
+            rows = self._read(
+                "SELECT user_id, name, points FROM rankings WHERE ranking = ? "
+                "ORDER BY points DESC, user_id LIMIT ?",
+                (generation, n)
+            )
+        else:
+            generation, last_points, last_uid = after
+            rows = self._read(
+                "SELECT user_id, name, points FROM rankings WHERE ranking = ? "
+                # points <= ? è il range sull'indice, il resto scarta solo i pari merito già visti
+                "AND points <= ? AND (points < ? OR user_id > ?) "
+                "ORDER BY points DESC, user_id LIMIT ?",
+                (generation, last_points, last_points, last_uid, n)
+            )
+        cursor = (generation, rows[-1][2], rows[-1][0]) if len(rows) == n else None
+        return [(uid, {"name": name, "points": points}) for uid, name, points in rows], cursor
+
+    def rank_of(self, ranking, uid):
+        entry = self.get(ranking, uid)
+        if entry is None:
+            return None
+        points = entry["points"]
+        # Chiave (-punti, "") : prima di lei solo chi ha più punti
+        return self._count_before(
+            ranking, (-points, ""), "SELECT COUNT(*) FROM rankings WHERE ranking = ? AND points > ?", (points,)
+        ) + 1
+
+    # ---------- migration ----------
+
+    def migrate_from_json(self, json_path):
+        """One-shot import of an existing ``hangman_data.json``.
+
+        Only runs once per database; returns the number of rows imported.
+        """
+        if self._get_meta("migrated_from") is not None or not os.path.exists(json_path):
+            return 0
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        rows = [
+            (self._ids[index], uid, entry["name"], entry["points"])
+            for index, ranking in enumerate(RANKINGS)
+            for uid, entry in data.get(ranking, {}).items()
+        ]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO rankings (ranking, user_id, name, points) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_reset', ?), ('migrated_from', ?)",
+                    (data.get("last_reset", datetime.now().date().isoformat()), os.path.abspath(json_path))
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,395 @@
+"""Response catalog shared by both bots.
+
+Every user-facing text lives here once. The ``DEFAULT`` entry is the
+bilingual EN / IT text the bots have always sent; a translation for another
+guild locale goes under its language code (``"es"``, ``"fr"``, ...), either
+in ``TEXTS`` or in a JSON file loaded with ``Catalog.load``. Keys without a
+translation fall back to the default, so a partial translation is fine.
+
+Texts are ``str.format`` templates, checked and split into literals and
+fields once, then rendered by joining the pieces (see ``compile_template``). A translation may only use
+fields of the default text; ``Catalog.load`` rejects the file otherwise.
+Replies without fields are built once per (key, locale) and reused; embeds
+keep a per-locale layout (compiled texts and colour) and only render their
+fields per call.
+"""
+import functools
+import json
+import keyword
+import re
+import string
+
+import discord
+
+DEFAULT = "default"
+
+TEXTS = {
+    # ---------- hangman ----------
+    "ok": {DEFAULT: "✓"},
+    "owner_only": {DEFAULT: "❌ Only the server owner can use this command! / Solo il proprietario del server può usare questo comando!"},
+    "no_game": {DEFAULT: "❌ No active game! / Nessuna partita attiva!"},
+    "game_already_active": {DEFAULT: "❌ There's already an active game!"},
+    "round_started": {DEFAULT: (
+        "**🎮 ROUND {round}**\n\n"
+        "**Parola/frase:** `{pattern}` ({lengths})\n\n"
+        "**Tips:**\n*{hint}*\n\n"
+        "Use `/l <letter>` to guess a letter or `/w <phrase>` to guess the word!\n"
+        "Usa `/l <lettera>` per indovinare una lettera o `/w <frase>` per indovinare la parola!\n\n"
+        "❤️ Lives / Vite: **{lives}**"
+    )},
+    "bank_missing": {DEFAULT: (
+        "❌ No word bank configured: give a secret and a hint! / "
+        "Nessuna banca di parole configurata: indica la parola segreta e l'indizio!"
+    )},
+    "bank_no_match": {DEFAULT: "❌ No puzzle in the word bank matches these filters! / Nessun enigma della banca corrisponde ai filtri!"},
+    "bank_hint": {DEFAULT: "🎲 {words} word(s), {letters} letters / {words} parola/e, {letters} lettere"},
+    "shutting_down": {DEFAULT: "🔄 The bot is restarting, try again in a moment! / Il bot si sta riavviando, riprova tra un attimo!"},
+    "one_letter_only": {DEFAULT: "❌ Please provide only one letter! / Fornisci solo una lettera!"},
+    "eliminated_no_count": {DEFAULT: (
+        "❌ {mention} you are eliminated! Your message doesn't count. / "
+        "sei eliminato! Il tuo messaggio non conta."
+    )},
+    "wait_turn": {DEFAULT: "⏳ {mention} wait for another player's turn! / aspetta il turno di un altro giocatore!"},
+    "repeated_points": {DEFAULT: (
+        "🔁 {mention} that letter was already said! -{points} point(s) 🔴 / "
+        "quella lettera è già stata detta! -{points} punto/i 🔴"
+    )},
+    "repeated_free": {DEFAULT: "🔁 {mention} that letter was already said! / quella lettera è già stata detta!"},
+    "repeated_eliminated": {DEFAULT: (
+        "🔁 {mention} that letter was already said! -1 life ❤️ / "
+        "quella lettera è già stata detta! -1 vita ❤️\n"
+        "💀 {mention} has been eliminated! / è stato eliminato!"
+    )},
+    "repeated_lives": {DEFAULT: (
+        "🔁 {mention} that letter was already said! -1 life ❤️ / "
+        "quella lettera è già stata detta! -1 vita ❤️\n"
+        "Lives remaining / Vite rimanenti: **{lives}**"
+    )},
+    "eliminated": {DEFAULT: "💀 {mention} has been eliminated! / è stato eliminato!"},
+    "victory_title": {DEFAULT: "🎉 VICTORY! / VITTORIA! 🎉"},
+    "victory_letter": {DEFAULT: "**{mention}** found the last letter! / ha trovato l'ultima lettera!"},
+    "victory_word": {DEFAULT: "**{mention}** guessed the phrase! / ha indovinato la frase!"},
+    "answer_name": {DEFAULT: "Answer / Risposta"},
+    "answer_value": {DEFAULT: "**{secret}**"},
+    "points_name": {DEFAULT: "Points / Punti"},
+    "points_value": {DEFAULT: "+{points} 🌟"},
+    "status_title": {DEFAULT: "📊 Game Status - Round {round}"},
+    "progress_name": {DEFAULT: "🔤 Current Progress / Progresso Attuale"},
+    "progress_value": {DEFAULT: "`{pattern}`"},
+    "statistics_name": {DEFAULT: "📈 Statistics / Statistiche"},
+    "statistics_value": {DEFAULT: (
+        "**Letters said / Lettere dette:** {said}\n"
+        "**Letters guessed / Lettere indovinate:** {guessed}\n"
+        "**Letters remaining / Lettere mancanti:** {remaining}"
+    )},
+    "players_name": {DEFAULT: "👥 Players / Giocatori"},
+    "no_players": {DEFAULT: "No players yet / Ancora nessun giocatore"},
+    "status_player": {DEFAULT: "{emoji} **{name}**: {lives}❤️ | {points}⭐"},
+    "status_footer": {DEFAULT: "Mode / Modalità: {mode}"},
+    "mode_points": {DEFAULT: "🔴 Points Mode"},
+    "mode_lives": {DEFAULT: "❤️ Lives Mode"},
+    "lives_eliminated": {DEFAULT: (
+        "❌ {mention} is eliminated and cannot receive lives! / "
+        "{mention} è eliminato e non può ricevere vite!"
+    )},
+    "lives_added": {DEFAULT: (
+        "✅ Added {lives} life/lives to {mention}! New total: {total} ❤️ / "
+        "Aggiunte {lives} vita/vite a {mention}! Nuovo totale: {total} ❤️"
+    )},
+    "points_added": {DEFAULT: "✅ Added {points} point(s) to {mention}! / Aggiunti {points} punto/i a {mention}!"},
+    "game_ended": {DEFAULT: "🏁 Game ended! The answer was: **{secret}** / Partita terminata! La risposta era: **{secret}**"},
+    "ranking_daily_title": {DEFAULT: "🏆 Daily Ranking / Classifica Giornaliera 🏆"},
+    "ranking_historical_title": {DEFAULT: "🏆 Historical Ranking / Classifica Storica 🏆"},
+    "ranking_empty": {DEFAULT: "📊 No data yet! / Ancora nessun dato!"},
+    "ranking_line": {DEFAULT: "{medal} **{name}** - {points} pts"},
+    "ranking_line_me": {DEFAULT: "➡️ {line} ⬅️"},
+    "ranking_page_footer": {DEFAULT: "Page {page}/{pages} · {players} players / Pagina {page}/{pages} · {players} giocatori"},
+    "ranking_my_rank": {DEFAULT: "📍 You are #{rank} with {points} pts / Sei #{rank} con {points} punti"},
+    "ranking_not_ranked": {DEFAULT: "📍 You are not in this ranking yet! / Non sei ancora in questa classifica!"},
+    "rankings_unavailable": {DEFAULT: "⏳ Rankings are unreachable right now, try again in a moment! / Classifiche non raggiungibili, riprova tra poco!"},
+    "ranking_export_ready": {DEFAULT: "📤 {players} player(s) exported / giocatori esportati"},
+    "ranking_export_too_large": {DEFAULT: (
+        "❌ The export is {size} MB, over this server's {limit} MB upload limit: use `python ranking_io.py export`! / "
+        "L'export è di {size} MB, oltre il limite di {limit} MB del server: usa `python ranking_io.py export`!"
+    )},
+    "ranking_import_done": {DEFAULT: (
+        "📥 {rows} row(s) imported for {players} player(s), {skipped} skipped / "
+        "{rows} righe importate per {players} giocatori, {skipped} scartate"
+    )},
+    "ranking_import_failed": {DEFAULT: "❌ Import failed / Importazione fallita: {error}"},
+    "daily_reset_done": {DEFAULT: "✅ Daily ranking reset! / Classifica giornaliera resettata!"},
+    "historical_reset_done": {DEFAULT: "✅ Historical ranking reset! / Classifica storica resettata!"},
+    "rounds_reset_done": {DEFAULT: "✅ Round counter reset to 0! / Contatore delle ronde resettato a 0!"},
+    "mode_points_active": {DEFAULT: (
+        "🔴 **Points Mode Active** / **Modalità Punti Attiva**\n"
+        "Players will lose points for wrong answers instead of lives. / "
+        "I giocatori perderanno punti per risposte sbagliate invece di vite."
+    )},
+    "mode_lives_active": {DEFAULT: (
+        "❤️ **Lives Mode Active** / **Modalità Vite Attiva**\n"
+        "Players will lose lives for wrong answers. / "
+        "I giocatori perderanno vite per risposte sbagliate."
+    )},
+    "rules_current": {DEFAULT: "📜 **Rules of this server / Regole di questo server**\n{rules}"},
+    "rules_updated": {DEFAULT: (
+        "✅ **Rules updated, they apply from the next round! / Regole aggiornate, valgono dal prossimo round!**\n{rules}"
+    )},
+    "rules_invalid": {DEFAULT: "❌ Invalid rule / Regola non valida: {error}"},
+    "rules_line": {DEFAULT: "• `{name}`: {value}"},
+    "rule_value": {DEFAULT: "**{value}**"},
+    "rule_on": {DEFAULT: "✅"},
+    "rule_off": {DEFAULT: "❌"},
+
+    # ---------- ditto ----------
+    "ditto_no_permission": {DEFAULT: (
+        "⛔ You don't have permission to use this command.\n"
+        "Solo il proprietario del server o un moderatore può usarlo."
+    )},
+    "ditto_letters_reset": {DEFAULT: "🔄 **Letters reset!** / **Lettere resettate!**"},
+    "ditto_activated": {DEFAULT: "✅ **Bot activated!** / **Bot attivato!**"},
+    "ditto_deactivated": {DEFAULT: "⏸️ **Bot deactivated!** / **Bot disattivato!**"},
+    "ditto_repeated": {DEFAULT: (
+        "🔁 **Letter repeated!** / **Lettera ripetuta!**\n"
+        "Letter / Lettera: **{letter}**\n"
+        "Said now by / Detta ora da: {mention}\n"
+        "Previously said by / Detta prima da: <@{prev_id}> ({prev_name})"
+    )},
+    "ditto_repeated_many": {DEFAULT: "🔁 **Letters repeated!** / **Lettere ripetute!**"},
+    "ditto_repeated_line": {DEFAULT: "**{letter}**: {mention} — first / prima: <@{prev_id}> ({prev_name})"},
+}
+
+# Embed: testi del catalogo per titolo, descrizione, campi (nome, valore) e footer
+EMBEDS = {
+    "victory_letter": {
+        "title": "victory_title",
+        "description": "victory_letter",
+        "color": "gold",
+        "fields": (("answer_name", "answer_value"), ("points_name", "points_value")),
+    },
+    "victory_word": {
+        "title": "victory_title",
+        "description": "victory_word",
+        "color": "gold",
+        "fields": (("answer_name", "answer_value"), ("points_name", "points_value")),
+    },
+    "status": {
+        "title": "status_title",
+        "color": "blue",
+        "fields": (("progress_name", "progress_value"), ("statistics_name", "statistics_value"), ("players_name", "players")),
+        "footer": "status_footer",
+    },
+    "ranking": {
+        "title": "title",
+        "description": "lines",
+        "color": "gold",
+        "footer": "ranking_page_footer",
+    },
+}
+
+
+# Formato ammesso dopo ":" in un campo (niente virgolette, parentesi o espressioni)
+_SAFE_SPEC = re.compile(r"[\w<>=^+\-., %#]*\Z")
+
+
+def template_fields(template):
+    """Names of the fields ``template`` uses; ValueError if one is not a plain name.
+
+    Attribute and index lookups (``{user.id}``, ``{a[0]}``) are refused, so a
+    translation file cannot reach into the objects it is given.
+    """
+    names = []
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"malformed response template {template!r}: {e}") from None
+    for _, field, spec, conversion in parsed:
+        if field is None:
+            continue
+        if (not field.isidentifier() or keyword.iskeyword(field) or field.startswith("_")
+                or not _SAFE_SPEC.match(spec or "") or conversion not in (None, "r", "s", "a")):
+            raise ValueError(f"unsupported field {field!r} in response template {template!r}")
+        if field not in names:
+            names.append(field)
+    return tuple(names)
+
+
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+
+def _formatter(spec, conversion):
+    """Callable turning a field value into text, as ``str.format`` would."""
+    if not spec and not conversion:
+        return format
+    convert = _CONVERSIONS.get(conversion)
+    if convert is None:
+        return lambda value: format(value, spec)
+    return lambda value: format(convert(value), spec)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template):
+    """``str.format`` template -> ``render(fields)`` taking a dict of fields.
+
+    The template is checked and split once into literal text and fields, so
+    rendering only looks the fields up and joins the pieces: ``format_map``
+    re-parses the whole template on every call, which costs 2-4x more on
+    these (non-ASCII) texts. Field-less templates render to a constant and
+    one-field templates to a single concatenation. Cached, so locales that
+    fall back to the same default text share it. Extra fields are ignored;
+    ``render.fields`` lists the names the template uses.
+    """
+    names = template_fields(template)
+    head = ""
+    pieces = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if pieces:
+            name, fmt, text = pieces[-1]
+            pieces[-1] = (name, fmt, text + literal)
+        else:
+            head += literal
+        if field is not None:
+            pieces.append((field, _formatter(spec, conversion), ""))
+    pieces = tuple(pieces)
+
+    if not pieces:
+        def render(_fields=None):
+            return head
+    elif len(pieces) == 1:
+        [(name, fmt, tail)] = pieces
+
+        def render(fields):
+            return head + fmt(fields[name]) + tail
+    else:
+        def render(fields):
+            parts = [head]
+            for name, fmt, text in pieces:
+                parts.append(fmt(fields[name]))
+                parts.append(text)
+            return "".join(parts)
+    render.fields = names
+    return render
+
+
+class Catalog:
+    """Localized texts, cached replies and embed layouts (see the module docstring)."""
+
+    def __init__(self, texts=TEXTS, embeds=EMBEDS):
+        self.texts = {key: dict(by_locale) for key, by_locale in texts.items()}
+        self.embeds = embeds
+        for key, by_locale in self.texts.items():
+            for locale, text in by_locale.items():
+                self._check(key, locale, text)
+        self._compile()
+
+    def _check(self, key, locale, text):
+        """ValueError if ``text`` is malformed or uses a field the default text of ``key`` does not pass."""
+        fields = template_fields(text)
+        if locale == DEFAULT:
+            return
+        expected = template_fields(self.texts[key][DEFAULT])
+        unknown = [name for name in fields if name not in expected]
+        if unknown:
+            raise ValueError(
+                f"response {key!r} ({locale}) uses {', '.join(unknown)}; "
+                f"the default text only has {', '.join(expected) or 'no fields'}"
+            )
+
+    def _compile(self):
+        self.languages = {locale for by_locale in self.texts.values() for locale in by_locale} - {DEFAULT}
+        self._locales = {}
+        self._templates = {}
+        self._static = {}
+        self._layouts = {}
+        for locale in self.languages | {DEFAULT}:
+            templates = self._templates[locale] = {
+                key: compile_template(by_locale.get(locale) or by_locale[DEFAULT])
+                for key, by_locale in self.texts.items()
+            }
+            # Risposte senza campi: (pubblica, effimera), pronte per send_message
+            self._static[locale] = {
+                key: ({"content": render(), "ephemeral": False}, {"content": render(), "ephemeral": True})
+                for key, render in templates.items() if not render.fields
+            }
+            self._layouts[locale] = {key: self._layout(spec, templates) for key, spec in self.embeds.items()}
+
+    @staticmethod
+    def _layout(spec, templates):
+        def resolve(name):
+            # Nomi che non sono nel catalogo sono campi passati dal chiamante
+            if name is None:
+                return None
+            return templates[name] if name in templates else compile_template("{" + name + "}")
+
+        return (
+            resolve(spec.get("title")),
+            resolve(spec.get("description")),
+            getattr(discord.Color, spec.get("color", "default"))(),
+            tuple((templates[name](), resolve(value)) for name, value in spec.get("fields", ())),
+            resolve(spec.get("footer")),
+        )
+
+    def load(self, path):
+        """Merge ``{locale: {key: text}}`` from a JSON file; returns the number of texts.
+
+        Every text is checked before any is merged: an unknown key (KeyError)
+        or a bad placeholder (ValueError) leaves the catalog unchanged.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            translations = json.load(f)
+        loaded = []
+        for locale, texts in translations.items():
+            for key, text in texts.items():
+                if key not in self.texts:
+                    raise KeyError(f"unknown response key {key!r} in {path}")
+                try:
+                    self._check(key, locale, text)
+                except ValueError as e:
+                    raise ValueError(f"{path}: {e}") from None
+                loaded.append((key, locale, text))
+        for key, locale, text in loaded:
+            self.texts[key][locale] = text
+        self._compile()
+        return len(loaded)
+
+    def locale_of(self, obj):
+        """Catalog locale for an Interaction (guild locale first) or a Guild."""
+        if not self.languages:
+            return DEFAULT
+        locale = getattr(obj, "guild_locale", None) or getattr(obj, "locale", None) or getattr(obj, "preferred_locale", None)
+        if locale is None:
+            return DEFAULT
+        value = getattr(locale, "value", locale)
+        resolved = self._locales.get(value)
+        if resolved is None:
+            language = str(value).split("-")[0].lower()
+            resolved = self._locales[value] = language if language in self.languages else DEFAULT
+        return resolved
+
+    def text(self, key, locale=DEFAULT, **fields):
+        return self._templates[locale][key](fields)
+
+    def reply(self, key, locale=DEFAULT, *, ephemeral=False, **fields):
+        """``send_message`` keyword arguments; shared (do not mutate) when there are no fields."""
+        if fields:
+            return {"content": self._templates[locale][key](fields), "ephemeral": ephemeral}
+        return self._static[locale][key][ephemeral]
+
+    def embed(self, key, locale=DEFAULT, **fields):
+        """A new ``discord.Embed`` from the precompiled layout of ``key``."""
+        title, description, color, embed_fields, footer = self._layouts[locale][key]
+        embed = discord.Embed(
+            title=title(fields),
+            description=description(fields) if description is not None else None,
+            color=color
+        )
+        for name, value in embed_fields:
+            embed.add_field(name=name, value=value(fields), inline=False)
+        if footer is not None:
+            embed.set_footer(text=footer(fields))
+        return embed
+
+    def embed_reply(self, key, locale=DEFAULT, *, ephemeral=False, **fields):
+        return {"embed": self.embed(key, locale, **fields), "ephemeral": ephemeral}
+
+
+catalog = Catalog()
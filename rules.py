@@ -0,0 +1,136 @@
+"""Per-guild hangman rules, compiled once per round.
+
+The rules file holds the overrides, ``{"default": {...}, guild_id: {...}}``,
+on top of ``RULES``; /rules edits a guild's entry while the bot runs.
+``RuleBook.compile`` merges them into a frozen ``GameRules`` when a round
+starts. The game keeps that object until the next round, so a guess reads
+plain attributes and a change made mid-round applies from the next one.
+"""
+from persistence import load_json, save_json
+
+# Regola -> valore di default (il comportamento storico del bot)
+RULES = {
+    # Vite iniziali quando /start_game non le indica
+    "lives": 5,
+    # Il round parte in modalità punti (/toggle_mode la cambia solo per il round in corso)
+    "points_mode": False,
+    "letter_points": 1,
+    "win_bonus": 4,
+    "word_points": 5,
+    # Punti persi per un errore in modalità punti
+    "wrong_penalty": 1,
+    # Lo stesso giocatore non può giocare due volte di fila
+    "turn_rule": True,
+    # Una lettera già detta costa una vita (o wrong_penalty punti)
+    "repeat_penalty": True,
+}
+# Limiti dei valori interi
+LIMITS = {"lives": (1, 99)}
+POINT_LIMITS = (0, 1000)
+
+
+class GameRules:
+    """Immutable rules of one round; ``RULES`` lists the attributes."""
+
+    __slots__ = tuple(RULES)
+
+    def __init__(self, **values):
+        for name, default in RULES.items():
+            object.__setattr__(self, name, values.get(name, default))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameRules is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, GameRules) and self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in RULES}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data) if data else DEFAULT_RULES
+
+
+DEFAULT_RULES = GameRules()
+
+
+def validate(name, value):
+    """``value`` checked and converted for rule ``name``; raises ValueError."""
+    if name not in RULES:
+        raise ValueError(f"unknown rule {name!r}")
+    default = RULES[name]
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ValueError(f"{name} must be true or false")
+        return value
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{name} must be an integer")
+    low, high = LIMITS.get(name, POINT_LIMITS)
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def _clean(entry):
+    return {name: validate(name, value) for name, value in (entry or {}).items()}
+
+
+class RuleBook:
+    """Rule overrides per guild, with the compiled ``GameRules`` cached per guild."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.defaults = dict(RULES)
+        self.overrides = {}
+        self._compiled = {}
+        if path:
+            self.load()
+
+    def load(self):
+        data = load_json(self.path) or {}
+        self.defaults = {**RULES, **_clean(data.get("default"))}
+        self.overrides = {int(key): _clean(entry) for key, entry in data.items() if key != "default"}
+        self._compiled = {}
+
+    def compile(self, guild_id):
+        rules = self._compiled.get(guild_id)
+        if rules is None:
+            overrides = self.overrides.get(guild_id)
+            values = {**self.defaults, **overrides} if overrides else self.defaults
+            rules = self._compiled[guild_id] = GameRules(**values) if values != RULES else DEFAULT_RULES
+        return rules
+
+    def update(self, guild_id, changes):
+        """Apply ``{rule: value}`` to a guild (None = back to the default); returns its new rules.
+
+        Raises ValueError, without changing anything, if a value is invalid.
+        """
+        entry = dict(self.overrides.get(guild_id, {}))
+        for name, value in changes.items():
+            if value is None:
+                entry.pop(name, None)
+            else:
+                entry[name] = validate(name, value)
+        if entry:
+            self.overrides[guild_id] = entry
+        else:
+            self.overrides.pop(guild_id, None)
+        self._compiled.pop(guild_id, None)
+        if self.path:
+            self._save(guild_id, entry)
+        return self.compile(guild_id)
+
+    def _save(self, guild_id, entry):
+        # Rilegge il file: gli shard lo condividono, ognuno scrive solo i propri server
+        data = load_json(self.path) or {}
+        if entry:
+            data[str(guild_id)] = entry
+        else:
+            data.pop(str(guild_id), None)
+        save_json(self.path, data)
+
+    def stats(self):
+        return {"guilds": len(self.overrides), "compiled": len(self._compiled)}
@@ -0,0 +1,75 @@
+import asyncio
+import inspect
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# Le attese lunghe vengono spezzate e ricalcolate sull'orologio di sistema,
+# così NTP, sospensioni e cambi d'ora non spostano il confine
+MAX_SLEEP = 3600.0
+
+
+class DailyBoundary:
+    """Local midnight in ``timezone`` (DST-aware, via zoneinfo)."""
+
+    def __init__(self, timezone_name="UTC"):
+        self.timezone_name = timezone_name
+        self.tz = ZoneInfo(timezone_name)
+
+    def today(self, now=None):
+        """ISO date of the current local day."""
+        now = now or datetime.now(timezone.utc)
+        return now.astimezone(self.tz).date().isoformat()
+
+    def next_after(self, now):
+        """First local midnight strictly after ``now`` (an aware datetime)."""
+        local_date = now.astimezone(self.tz).date()
+        return datetime.combine(local_date + timedelta(days=1), time(0), tzinfo=self.tz)
+
+
+class DailyScheduler:
+    """Runs ``callback(day)`` at every local midnight of ``boundary``.
+
+    Sleeps until the boundary instead of polling. ``day`` is the ISO date that
+    starts at that midnight. ``callback`` may be a plain function or a
+    coroutine function; an exception is logged and the next run still happens.
+    """
+
+    def __init__(self, boundary, callback, *, clock=None, name="daily"):
+        self.boundary = boundary
+        self.callback = callback
+        self.name = name
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._task = None
+        self.next_run = None
+        self.runs = 0
+
+    def start(self):
+        """Start on the running loop. Safe to call more than once."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sleep_until(self, due):
+        while True:
+            remaining = (due - self._clock()).total_seconds()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, MAX_SLEEP))
+
+    async def _run(self):
+        while True:
+            due = self.boundary.next_after(self._clock())
+            self.next_run = due
+            await self._sleep_until(due)
+            try:
+                result = self.callback(self.boundary.today(due))
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"⚠️ Scheduled {self.name} run failed: {e}")
+            self.runs += 1
@@ -0,0 +1,50 @@
+class ScoreBatch:
+    """Point deltas of one interaction (or round), applied to the rankings in one pass.
+
+    Deltas are ``{uid: [name, points]}``, the same shape the ranking stores'
+    ``add_many`` and the aggregator protocol use. ``commit`` hands them to
+    ``apply`` once: both rankings are updated together, with one journal
+    event and one save. As a context manager the batch commits when the
+    block exits normally and is dropped if it raises.
+    """
+
+    __slots__ = ("deltas", "_apply")
+
+    def __init__(self, apply):
+        self.deltas = {}
+        self._apply = apply
+
+    def add(self, uid, name, points):
+        if not points:
+            # Regole a 0 punti: niente voce né salvataggio
+            return
+        entry = self.deltas.get(uid)
+        if entry is None:
+            self.deltas[uid] = [name, points]
+        else:
+            entry[0] = name
+            entry[1] += points
+
+    def points_of(self, uid):
+        entry = self.deltas.get(uid)
+        return entry[1] if entry is not None else 0
+
+    def commit(self):
+        deltas = self.deltas
+        self.deltas = {}
+        if deltas:
+            self._apply(deltas)
+        return deltas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.deltas = {}
+        return False
+
+    def __bool__(self):
+        return bool(self.deltas)
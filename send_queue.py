@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+MESSAGE_LIMIT = 2000
+
+
+class TokenBucket:
+    """Local estimate of a channel's send budget (``rate`` messages per ``per`` seconds)."""
+
+    def __init__(self, rate, per, clock=time.monotonic):
+        self.rate = rate
+        self.per = per
+        self._clock = clock
+        self._tokens = float(rate)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    def delay(self):
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) * self.per / self.rate
+
+    def take(self):
+        self._refill()
+        self._tokens -= 1
+
+    def until_full(self):
+        """Seconds until the bucket is back to ``rate`` tokens (0 if it is full)."""
+        self._refill()
+        return (self.rate - self._tokens) * self.per / self.rate
+
+
+class _ChannelQueue:
+    __slots__ = ("channel", "pending", "bucket", "task")
+
+    def __init__(self, channel, bucket):
+        self.channel = channel
+        self.pending = OrderedDict()
+        self.bucket = bucket
+        self.task = None
+
+
+class OutboundQueue:
+    """Per-channel outbound queue that coalesces notices into fewer messages.
+
+    ``enqueue`` never awaits. Each channel has one worker task that waits
+    ``window`` seconds for more notices, then sends everything pending as one
+    message (split at Discord's 2000 character limit) when its local token
+    bucket allows it. Notices with the same ``key`` replace each other while
+    pending, notices older than ``max_age`` are dropped, and past
+    ``max_depth`` the oldest pending notice is dropped. A channel with
+    nothing pending is forgotten once its bucket has refilled, so the queue
+    only holds channels that sent something in the last ``per`` seconds.
+
+    ``render(payloads)`` turns the pending payloads into message lines.
+    """
+
+    def __init__(self, render, *, window=0.75, rate=5, per=5.0, max_depth=25, max_age=15.0, clock=time.monotonic):
+        self.render = render
+        self.window = window
+        self.rate = rate
+        self.per = per
+        self.max_depth = max_depth
+        self.max_age = max_age
+        self._clock = clock
+        self._channels = {}
+        self._latencies = deque(maxlen=1000)
+
+        self.enqueued = 0
+        self.merged = 0
+        self.dropped = 0
+        self.sent_messages = 0
+        self.sent_notices = 0
+        self.failures = 0
+
+    # ---------- producer side ----------
+
+    def enqueue(self, channel, payload, key=None):
+        queue = self._channels.get(channel.id)
+        if queue is None:
+            queue = self._channels[channel.id] = _ChannelQueue(channel, TokenBucket(self.rate, self.per, self._clock))
+
+        self.enqueued += 1
+        if key is None:
+            key = object()
+        elif key in queue.pending:
+            self.merged += 1
+            del queue.pending[key]
+        queue.pending[key] = (self._clock(), payload)
+
+        while len(queue.pending) > self.max_depth:
+            queue.pending.popitem(last=False)
+            self.dropped += 1
+
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.get_running_loop().create_task(self._worker(queue))
+
+    # ---------- metrics ----------
+
+    def depth(self, channel_id=None):
+        if channel_id is not None:
+            queue = self._channels.get(channel_id)
+            return len(queue.pending) if queue else 0
+        return sum(len(q.pending) for q in self._channels.values())
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+        return {
+            "depth": self.depth(),
+            "channels": len(self._channels),
+            "enqueued": self.enqueued,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "sent_messages": self.sent_messages,
+            "sent_notices": self.sent_notices,
+            "failures": self.failures,
+            "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "latency_max": latencies[-1] if latencies else None,
+        }
+
+    # ---------- consumer side ----------
+
+    async def _worker(self, queue):
+        while queue.pending:
+            await asyncio.sleep(self.window)
+            await self._wait_budget(queue)
+
+            now = self._clock()
+            batch = []
+            for enqueued_at, payload in queue.pending.values():
+                if now - enqueued_at > self.max_age:
+                    self.dropped += 1
+                else:
+                    batch.append((enqueued_at, payload))
+            queue.pending.clear()
+            if not batch:
+                continue
+
+            for index, chunk in enumerate(self._chunks(self.render([payload for _, payload in batch]))):
+                if index:
+                    await self._wait_budget(queue)
+                queue.bucket.take()
+                try:
+                    await queue.channel.send(chunk)
+                except Exception as e:
+                    self.failures += 1
+                    print(f"⚠️ Error sending to channel {queue.channel.id}: {e}")
+                    continue
+                self.sent_messages += 1
+
+            sent_at = self._clock()
+            self.sent_notices += len(batch)
+            self._latencies.extend(sent_at - enqueued_at for enqueued_at, _ in batch)
+
+        # Il bucket va tenuto finché non è pieno, altrimenti un canale ricreato ripartirebbe con tutto il budget
+        asyncio.get_running_loop().call_later(queue.bucket.until_full(), self._forget, queue)
+
+    def _forget(self, queue):
+        if self._channels.get(queue.channel.id) is queue and not queue.pending and queue.task.done():
+            del self._channels[queue.channel.id]
+
+    @staticmethod
+    async def _wait_budget(queue):
+        delay = queue.bucket.delay()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = queue.bucket.delay()
+
+    @staticmethod
+    def _chunks(lines):
+        chunk = ""
+        for line in lines:
+            if chunk and len(chunk) + len(line) + 1 > MESSAGE_LIMIT:
+                yield chunk
+                chunk = ""
+            chunk = f"{chunk}\n{line}" if chunk else line
+        if chunk:
+            yield chunk
+
+    async def drain(self, timeout=None):
+        """Wait for every channel worker to finish sending what is pending."""
+        tasks = [q.task for q in self._channels.values() if q.task is not None]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
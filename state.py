@@ -0,0 +1,346 @@
+import time
+from collections import OrderedDict
+
+from guess_engine import CompiledSecret, normalize_text
+from letterset import pack_letters, unpack_letters
+from rules import DEFAULT_RULES, GameRules
+from word_bank import RecentWindow
+
+# Esiti di una giocata
+ELIMINATED = "eliminated"
+WAIT_TURN = "wait_turn"
+REPEATED = "repeated"
+CORRECT = "correct"
+WRONG = "wrong"
+WIN = "win"
+
+# Eventi di partita registrati nel journal
+GAME_EVENTS = ("start", "letter", "word", "end", "lives", "mode", "rounds")
+
+
+def encode_key(key):
+    """Registry key -> JSON value (channel keys are tuples)."""
+    return list(key) if isinstance(key, tuple) else key
+
+
+def decode_key(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+class GameRegistry:
+    """Per-guild (optionally per-channel) game objects with LRU + idle-TTL eviction.
+
+    Games are created on first access through ``factory``. Looking a game up
+    marks it as recently used; when a new game is created, games idle for more
+    than ``idle_ttl`` seconds are dropped and, if the registry is still over
+    ``max_games``, the least recently used ones that are not ``active`` go
+    too. A game in progress is only dropped once it has been idle that long,
+    so a shard full of running games can hold more than ``max_games``.
+    """
+
+    def __init__(self, factory, *, max_games=5000, idle_ttl=6 * 3600, per_channel=False, clock=time.monotonic):
+        self.factory = factory
+        self.max_games = max_games
+        self.idle_ttl = idle_ttl
+        self.per_channel = per_channel
+        self._clock = clock
+        self._games = OrderedDict()
+        self.evictions = 0
+
+    def key_for(self, guild_id, channel_id=None):
+        if self.per_channel:
+            return (guild_id, channel_id)
+        return guild_id
+
+    def key_of(self, obj):
+        """Key for anything with ``guild`` and ``channel`` attributes (Interaction, Message)."""
+        guild = obj.guild
+        channel = obj.channel
+        return self.key_for(guild.id if guild else None, channel.id if channel else None)
+
+    def get(self, key, create=True):
+        now = self._clock()
+        game = self._games.get(key)
+        if game is None:
+            if not create:
+                return None
+            self._evict(now)
+            game = self.factory()
+            self._games[key] = game
+        else:
+            self._games.move_to_end(key)
+        game.last_used = now
+        return game
+
+    def peek(self, key):
+        """Return the game for ``key`` without creating it or refreshing its LRU position."""
+        return self._games.get(key)
+
+    def restore(self, key, game):
+        """Register a game loaded from disk and return it; a game already under ``key`` wins.
+
+        Meant for startup: nothing is evicted, so restoring more than
+        ``max_games`` games keeps them all until the next ``get`` creates one.
+        """
+        existing = self._games.get(key)
+        if existing is not None:
+            return existing
+        game.last_used = self._clock()
+        self._games[key] = game
+        return game
+
+    def discard(self, key):
+        return self._games.pop(key, None)
+
+    def evict_idle(self):
+        return self._evict(self._clock(), reserve=0)
+
+    def _evict(self, now, reserve=1):
+        games = self._games
+        deadline = now - self.idle_ttl
+        excess = len(games) + reserve - self.max_games
+        evicted = []
+        # Ordine LRU: last_used cresce, dopo il primo gioco recente nessuno è scaduto
+        for key, game in games.items():
+            if game.last_used <= deadline:
+                evicted.append(key)
+                excess -= 1
+            elif excess <= 0:
+                break
+            elif not game.active:
+                evicted.append(key)
+                excess -= 1
+        for key in evicted:
+            del games[key]
+        self.evictions += len(evicted)
+        return len(evicted)
+
+    def items(self):
+        return self._games.items()
+
+    def __len__(self):
+        return len(self._games)
+
+    def __contains__(self, key):
+        return key in self._games
+
+
+class Player:
+    __slots__ = ("lives", "eliminated")
+
+    def __init__(self, lives):
+        self.lives = lives
+        self.eliminated = False
+
+
+class HangmanGame:
+    __slots__ = (
+        "active", "secret", "hint", "compiled",
+        "letters_needed", "letters_found", "wrong_letters",
+        "players", "last_player", "initial_lives", "round_number",
+        "lose_points_mode", "rules", "started_at", "auto", "recent_puzzles", "last_used",
+    )
+
+    def __init__(self):
+        self.active = False
+        self.secret = ""
+        self.hint = ""
+        self.compiled = None
+        self.letters_needed = set()
+        self.letters_found = set()
+        self.wrong_letters = set()
+        self.players = {}
+        self.last_player = None
+        self.initial_lives = 5
+        self.round_number = 0
+        self.lose_points_mode = False
+        # Regole del round in corso, compilate all'avvio (vedi rules.py)
+        self.rules = DEFAULT_RULES
+        self.started_at = 0.0
+        # Round automatici: filtri della banca di parole e vite, None se disattivati
+        self.auto = None
+        self.recent_puzzles = RecentWindow()
+        self.last_used = 0.0
+
+    def get_player(self, uid):
+        player = self.players.get(uid)
+        if player is None:
+            player = self.players[uid] = Player(self.initial_lives)
+        return player
+
+    # ---------- rules ----------
+
+    def start(self, secret, hint, lives, started_at=None, rules=DEFAULT_RULES):
+        self.active = True
+        self.started_at = time.time() if started_at is None else started_at
+        self.round_number += 1
+        self.rules = rules
+        self.lose_points_mode = rules.points_mode
+        self.compiled = CompiledSecret(secret)
+        self.secret = self.compiled.secret
+        self.hint = hint
+        self.letters_needed = self.compiled.letters()
+        self.letters_found = set()
+        self.wrong_letters = set()
+        self.players = {}
+        self.last_player = None
+        self.initial_lives = lives
+
+    def _take_turn(self, uid):
+        player = self.get_player(uid)
+        if player.eliminated:
+            return player, ELIMINATED
+        if self.last_player == uid and self.rules.turn_rule:
+            return player, WAIT_TURN
+        self.last_player = uid
+        return player, None
+
+    def _penalize(self, player):
+        if not self.lose_points_mode:
+            player.lives -= 1
+            if player.lives <= 0:
+                player.eliminated = True
+
+    def guess_letter(self, uid, letter):
+        """Apply a letter guess (points are up to the caller); returns the outcome."""
+        player, refused = self._take_turn(uid)
+        if refused:
+            return refused
+
+        normalized = normalize_text(letter)
+
+        if normalized in self.letters_found or normalized in self.wrong_letters:
+            if self.rules.repeat_penalty:
+                self._penalize(player)
+            return REPEATED
+
+        if normalized in self.letters_needed:
+            self.letters_needed.remove(normalized)
+            self.letters_found.add(normalized)
+            self.compiled.reveal(normalized)
+            if not self.letters_needed:
+                self.active = False
+                return WIN
+            return CORRECT
+
+        self.wrong_letters.add(normalized)
+        self._penalize(player)
+        return WRONG
+
+    def guess_word(self, uid, word):
+        player, refused = self._take_turn(uid)
+        if refused:
+            return refused
+
+        if self.compiled.matches(word):
+            self.active = False
+            return WIN
+
+        self._penalize(player)
+        return WRONG
+
+    def settle(self, winner=None):
+        """Close the round and summarize it (once per round, not per guess)."""
+        self.active = False
+        return {
+            "round": self.round_number,
+            "winner": winner,
+            "players": len(self.players),
+            "eliminated": sum(1 for player in self.players.values() if player.eliminated),
+            "letters_found": len(self.letters_found),
+            "wrong_letters": len(self.wrong_letters),
+        }
+
+    def add_lives(self, uid, lives):
+        """Add lives to a player; returns the player, or None if eliminated."""
+        player = self.get_player(uid)
+        if player.eliminated:
+            return None
+        player.lives += lives
+        return player
+
+    def apply_event(self, event):
+        """Replay a journaled game event."""
+        kind = event["e"]
+        if kind == "start":
+            self.start(event["secret"], event["hint"], event["lives"], event.get("t"), GameRules.from_dict(event.get("rules")))
+            self.auto = event.get("auto")
+            if "b" in event:
+                self.recent_puzzles.add(event["b"])
+        elif kind == "end":
+            self.active = False
+            self.auto = None
+        elif kind == "mode":
+            self.lose_points_mode = not self.lose_points_mode
+        elif kind == "rounds":
+            self.round_number = 0
+        elif self.active:
+            if kind == "letter":
+                self.guess_letter(event["u"], event["v"])
+            elif kind == "word":
+                self.guess_word(event["u"], event["v"])
+            elif kind == "lives":
+                self.add_lives(event["u"], event["n"])
+
+    # ---------- snapshot ----------
+
+    def to_dict(self):
+        return {
+            "active": self.active,
+            "secret": self.secret,
+            "hint": self.hint,
+            "letters_found": pack_letters(self.letters_found),
+            "wrong_letters": pack_letters(self.wrong_letters),
+            "players": {uid: [p.lives, p.eliminated] for uid, p in self.players.items()},
+            "last_player": self.last_player,
+            "initial_lives": self.initial_lives,
+            "round_number": self.round_number,
+            "lose_points_mode": self.lose_points_mode,
+            "rules": self.rules.to_dict(),
+            "started_at": self.started_at,
+            "auto": self.auto,
+            "recent_puzzles": self.recent_puzzles.to_list(),
+        }
+
+    def load_dict(self, data):
+        self.active = data["active"]
+        self.hint = data["hint"]
+        self.initial_lives = data["initial_lives"]
+        self.round_number = data["round_number"]
+        self.lose_points_mode = data["lose_points_mode"]
+        self.rules = GameRules.from_dict(data.get("rules"))
+        self.started_at = data.get("started_at", 0.0)
+        self.auto = data.get("auto")
+        self.recent_puzzles = RecentWindow(data.get("recent_puzzles", ()))
+        self.last_player = data["last_player"]
+        self.compiled = CompiledSecret(data["secret"]) if data["secret"] else None
+        self.secret = data["secret"]
+        self.letters_found = unpack_letters(data["letters_found"])
+        self.wrong_letters = unpack_letters(data["wrong_letters"])
+        self.letters_needed = self.compiled.letters() - self.letters_found if self.compiled else set()
+        for letter in self.letters_found:
+            self.compiled.reveal(letter)
+        self.players = {}
+        for uid, (lives, eliminated) in data["players"].items():
+            player = self.players[uid] = Player(lives)
+            player.eliminated = eliminated
+
+
+class LetterGame:
+    __slots__ = ("active", "letters", "last_used")
+
+    def __init__(self):
+        self.active = False
+        # Lettera -> (user_id, nome) di chi l'ha detta per primo
+        self.letters = {}
+        self.last_used = 0.0
+
+    def to_dict(self):
+        return {
+            "active": self.active,
+            "letters": [[letter, user_id, name] for letter, (user_id, name) in sorted(self.letters.items())],
+        }
+
+    def load_dict(self, data):
+        self.active = data["active"]
+        self.letters = {letter: (user_id, name) for letter, user_id, name in data["letters"]}
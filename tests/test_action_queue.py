@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from action_queue import GameActionQueue
+
+
+def test_idle_game_runs_sync_action_inline():
+    async def scenario():
+        queue = GameActionQueue()
+        future = queue.submit("g", lambda x: x * 2, 21)
+        assert future.done() and future.result() == 42
+        assert len(queue) == 0 and queue.workers == 0
+
+    asyncio.run(scenario())
+
+
+def test_actions_behind_an_awaiting_action_keep_submission_order():
+    async def scenario():
+        queue = GameActionQueue()
+        order = []
+        release = asyncio.Event()
+
+        async def slow(n):
+            await release.wait()
+            order.append(n)
+            return n
+
+        def fast(n):
+            order.append(n)
+            return n
+
+        futures = [queue.submit("g", slow, 0)]
+        futures += [queue.submit("g", fast if n % 3 else slow, n) for n in range(1, 10)]
+        # Finché la prima azione attende, nessuna delle successive parte
+        await asyncio.sleep(0)
+        assert order == [] and queue.depth("g") == 9
+        release.set()
+
+        assert await asyncio.gather(*futures) == list(range(10))
+        assert order == list(range(10))
+        assert len(queue) == 0
+
+    asyncio.run(scenario())
+
+
+def test_failing_action_does_not_stop_the_queue():
+    async def scenario():
+        queue = GameActionQueue()
+
+        async def slow():
+            await asyncio.sleep(0)
+            return "slow"
+
+        def boom():
+            raise ValueError("boom")
+
+        first = queue.submit("g", slow)
+        failed = queue.submit("g", boom)
+        last = queue.submit("g", lambda: "last")
+        assert await first == "slow"
+        with pytest.raises(ValueError):
+            await failed
+        assert await last == "last"
+
+    asyncio.run(scenario())
+
+
+def test_games_do_not_wait_for_each_other():
+    async def scenario():
+        queue = GameActionQueue()
+        blocked = asyncio.Event()
+
+        async def wait():
+            await blocked.wait()
+
+        pending = queue.submit("a", wait)
+        other = queue.submit("b", lambda: "b")
+        assert other.done() and other.result() == "b"
+        blocked.set()
+        await pending
+        await queue.drain()
+        assert queue.stats()["busy_games"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,165 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("discord")
+
+
+@pytest.fixture
+def boia(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import boia_bot
+    from journal import EventJournal
+    from ranking_store import JsonRankingStore
+
+    workdir = str(tmp_path)
+    monkeypatch.setattr(boia_bot, "data_loaded", True)
+    monkeypatch.setattr(boia_bot, "rankings", JsonRankingStore(archive_dir=os.path.join(workdir, "archive")))
+    monkeypatch.setattr(boia_bot, "DATA_FILE", os.path.join(workdir, "hangman_data.json"))
+    monkeypatch.setattr(boia_bot, "STATE_FILE", os.path.join(workdir, "hangman_state.json"))
+    monkeypatch.setattr(boia_bot, "journal", EventJournal(os.path.join(workdir, "hangman_journal")))
+    monkeypatch.setattr(boia_bot.guess_log, "directory", os.path.join(workdir, "hangman_analytics"))
+    # Il segmento aperto da un test precedente stava nella sua cartella
+    monkeypatch.setattr(boia_bot.guess_log, "_segment", None)
+    return boia_bot
+
+
+def run(boia, scenario):
+    writers = (boia.data_writer, boia.state_writer, boia.analytics_writer)
+
+    async def main():
+        for writer in writers:
+            writer.start()
+        try:
+            await scenario()
+        finally:
+            for writer in writers:
+                await writer.close()
+            boia.journal.close()
+
+    asyncio.run(main())
+
+
+def make_guild(players, **kwargs):
+    from bench_bots import FakeChannel, FakeGuild, FakeInteraction, FakeUser
+
+    owner = FakeUser(1, "owner")
+    guild = FakeGuild(77, owner, players, **kwargs)
+    channel = FakeChannel(5)
+    return owner, lambda user: FakeInteraction(user, guild, channel)
+
+
+def test_status_reports_its_snapshot_and_does_not_hold_up_plays(boia):
+    from bench_bots import FakeUser, callback
+
+    start_game = callback(boia.start_game)
+    guess_letter = callback(boia.guess_letter)
+    status = callback(boia.status)
+    early = [FakeUser(100 + i, f"early{i}") for i in range(3)]
+    late = [FakeUser(200 + i, f"late{i}") for i in range(5)]
+    # Nessun membro in cache: /status aspetta fetch_member
+    owner, interaction = make_guild(early + late, fetch_latency=0.01, cached_ratio=0)
+
+    async def scenario():
+        await start_game(interaction(owner), "ZZZZ QQQQ", "hint", 5)
+        for user, letter in zip(early, "ABC"):
+            await guess_letter(interaction(user), letter)
+
+        owner_status = interaction(owner)
+        guesses = [interaction(user) for user in late]
+        status_task = asyncio.create_task(status(owner_status))
+        await asyncio.sleep(0)
+        # /status ha confermato subito e preso la sua fotografia
+        assert owner_status.response.deferred and owner_status.response.ephemeral
+        await asyncio.gather(*(guess_letter(i, letter) for i, letter in zip(guesses, "DEFGH")))
+        assert all(i.response.is_done() and not i.response.deferred for i in guesses)
+        assert owner_status.followup.sent == 0
+        await status_task
+
+        game = boia.get_game(owner_status)
+        assert len(game.players) == 8
+        body = repr(vars(owner_status.followup.embed))
+        for user in early:
+            assert user.name in body
+        for user in late:
+            assert user.name not in body
+        assert owner_status.followup.ephemeral
+        assert all(i.response.order < owner_status.followup.order for i in guesses)
+        boia.games.discard(boia.games.key_of(owner_status))
+
+    run(boia, scenario)
+
+
+def test_actions_behind_a_busy_game_are_deferred_and_run_in_order(boia):
+    from bench_bots import FakeUser, callback
+
+    start_game = callback(boia.start_game)
+    guess_letter = callback(boia.guess_letter)
+    toggle_mode = callback(boia.toggle_mode)
+    reset_rounds = callback(boia.reset_rounds)
+    player = FakeUser(100, "player")
+    owner, interaction = make_guild([player])
+
+    async def scenario():
+        await start_game(interaction(owner), "ZZZZ", "hint", 5)
+        key = boia.games.key_of(interaction(owner))
+        game = boia.games.peek(key)
+        release = asyncio.Event()
+        seen = []
+
+        async def busy():
+            await release.wait()
+            seen.append((game.lose_points_mode, game.round_number))
+
+        blocker = boia.game_actions.submit(key, busy)
+        toggle, reset, guess = interaction(owner), interaction(owner), interaction(player)
+        tasks = [
+            asyncio.create_task(toggle_mode(toggle)),
+            asyncio.create_task(reset_rounds(reset)),
+            asyncio.create_task(guess_letter(guess, "Z")),
+        ]
+        await asyncio.sleep(0)
+        # Confermate subito, ma niente è cambiato finché la partita è occupata
+        assert all(i.response.deferred for i in (toggle, reset, guess))
+        assert not game.lose_points_mode and game.round_number == 1
+        release.set()
+        await blocker
+        await asyncio.gather(*tasks)
+
+        assert seen == [(False, 1)]
+        assert game.lose_points_mode and game.round_number == 0 and not game.active
+        assert toggle.followup.order < reset.followup.order < guess.followup.order
+        # La vittoria è pubblica: sostituisce il messaggio del defer
+        assert guess.followup.embed is not None and not guess.deleted
+        boia.games.discard(key)
+
+    run(boia, scenario)
+
+
+def test_ephemeral_answer_after_a_defer_replaces_the_public_placeholder(boia):
+    from bench_bots import FakeUser, callback
+
+    guess_letter = callback(boia.guess_letter)
+    player = FakeUser(100, "player")
+    owner, interaction = make_guild([player])
+
+    async def scenario():
+        key = boia.games.key_of(interaction(owner))
+        release = asyncio.Event()
+
+        async def busy():
+            await release.wait()
+
+        boia.game_actions.submit(key, busy)
+        guess = interaction(player)
+        task = asyncio.create_task(guess_letter(guess, "A"))
+        await asyncio.sleep(0)
+        release.set()
+        await task
+        # Nessuna partita: risposta privata
+        assert guess.response.deferred and guess.deleted
+        assert guess.followup.ephemeral and guess.followup.sent == 1
+        boia.games.discard(key)
+
+    run(boia, scenario)
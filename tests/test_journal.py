@@ -0,0 +1,46 @@
+import os
+
+from journal import EventJournal
+
+
+def test_replay_returns_events_after_the_snapshot(tmp_path):
+    journal = EventJournal(str(tmp_path), consumers=("rankings",))
+    journal.append({"e": "a"})
+    boundary = journal.rotate()
+    journal.append({"e": "b"})
+    journal.append({"e": "c"})
+    journal.close()
+
+    reopened = EventJournal(str(tmp_path), consumers=("rankings",))
+    assert [event["e"] for _, event in reopened.replay()] == ["a", "b", "c"]
+    assert [(seq, event["e"]) for seq, event in reopened.replay(boundary)] == [(boundary, "b"), (boundary, "c")]
+
+
+def test_commit_deletes_segments_every_consumer_has_covered(tmp_path):
+    journal = EventJournal(str(tmp_path), consumers=("rankings", "games"))
+    journal.append({"e": 1})
+    second = journal.rotate()
+    journal.append({"e": 2})
+    third = journal.rotate()
+    journal.commit("rankings", third)
+    assert journal.segments()[0] < second
+    journal.commit("games", second)
+    assert journal.segments() == [second, third]
+    journal.close()
+
+
+def test_torn_last_line_ends_the_segment(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.append({"e": "ok"})
+    journal.close()
+    segment = os.path.join(str(tmp_path), f"{journal.seq:08d}.jsonl")
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"e": "tor')
+    assert [event for _, event in EventJournal(str(tmp_path)).replay()] == [{"e": "ok"}]
+
+
+def test_replay_skips_the_segment_being_written(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.append({"e": "live"})
+    assert list(journal.replay()) == []
+    journal.close()
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from leaderboard import Leaderboard, RankIndex
+
+
+def test_rank_index_matches_a_sorted_list():
+    rng = random.Random(7)
+    index = RankIndex(load=4)
+    reference = []
+    for _ in range(2000):
+        if reference and rng.random() < 0.4:
+            key = rng.choice(reference)
+            reference.remove(key)
+            index.remove(key)
+        else:
+            key = rng.randint(0, 300)
+            reference.append(key)
+            index.add(key)
+        reference.sort()
+    assert len(index) == len(reference)
+    assert index.slice(0, len(reference)) == reference
+    for key in range(-1, 302, 7):
+        assert index.index(key) == sum(1 for k in reference if k < key)
+        assert index.count_le(key) == sum(1 for k in reference if k <= key)
+        assert index.after(key, 5) == [k for k in reference if k > key][:5]
+    assert index.slice(10, 30) == reference[10:30]
+    assert index[0] == reference[0] and index[-1] == reference[-1]
+    with pytest.raises(KeyError):
+        index.remove(1000)
+
+
+def make_board(points):
+    entries = {uid: {"name": uid, "points": p} for uid, p in points.items()}
+    return Leaderboard(entries, k=3), entries
+
+
+def expected_order(points, seq):
+    return sorted(points, key=lambda uid: (-points[uid], seq[uid]))
+
+
+def test_leaderboard_follows_point_changes():
+    rng = random.Random(3)
+    points = {f"u{i}": rng.randint(0, 20) for i in range(50)}
+    seq = {uid: i for i, uid in enumerate(points)}
+    board, _ = make_board(points)
+    for step in range(300):
+        uid = f"u{rng.randint(0, 59)}"
+        if uid not in points:
+            seq[uid] = len(seq)
+            points[uid] = 0
+        points[uid] += rng.randint(-3, 5)
+        board.update(uid, points[uid])
+
+    order = expected_order(points, seq)
+    assert board.top(5) == order[:5]
+    assert board.page(10, 20) == order[10:20]
+    for uid in order:
+        assert board.position(uid) == order.index(uid)
+        assert board.rank_of(uid) == 1 + sum(1 for other in points.values() if other > points[uid])
+    assert board.position("nobody") is None and board.rank_of("nobody") is None
+
+
+def test_scan_cursor_walks_the_whole_ranking():
+    points = {f"u{i}": i % 7 for i in range(25)}
+    board, _ = make_board(points)
+    seen = []
+    cursor = None
+    while True:
+        keys = board.scan(cursor, 4)
+        seen += [key[2] for key in keys]
+        if len(keys) < 4:
+            break
+        cursor = keys[-1]
+    assert seen == expected_order(points, {uid: i for i, uid in enumerate(points)})
+
+
+def test_version_changes_only_for_the_top():
+    board, _ = make_board({"a": 10, "b": 9, "c": 8, "d": 1, "e": 0})
+    version = board.version
+    board.update("e", 2)
+    assert board.version == version
+    board.update("e", 9)
+    assert board.version == version + 1 and board.top() == ["a", "b", "e"]
+    board.update("a", 10, renamed=True)
+    assert board.version == version + 2
+    board.update("d", 1, renamed=True)
+    assert board.version == version + 2
@@ -0,0 +1,64 @@
+from letterset import LETTER_BITS, pack_letters, unpack_letters
+from state import CORRECT, REPEATED, WIN, WRONG, HangmanGame, LetterGame
+
+
+def test_a_z_letters_pack_into_a_mask():
+    assert pack_letters(set()) == 0
+    assert pack_letters({"A", "C", "Z"}) == LETTER_BITS["A"] | LETTER_BITS["C"] | LETTER_BITS["Z"]
+    assert unpack_letters(pack_letters({"A", "C", "Z"})) == {"A", "C", "Z"}
+    assert unpack_letters(0) == set()
+
+
+def test_other_letters_pack_as_a_sorted_list():
+    assert pack_letters({"È", "B", "A"}) == ["A", "B", "È"]
+    assert unpack_letters(["A", "È"]) == {"A", "È"}
+
+
+def play(game, letters):
+    outcomes = []
+    for i, letter in enumerate(letters):
+        outcomes.append(game.guess_letter(str(i % 2), letter))
+    return outcomes
+
+
+def test_snapshot_round_trip_keeps_the_round():
+    game = HangmanGame()
+    game.start("Ciao è", "hint", 9)
+    assert play(game, "cxAc") == [CORRECT, WRONG, CORRECT, REPEATED]
+    data = game.to_dict()
+    assert isinstance(data["letters_found"], int) and isinstance(data["wrong_letters"], int)
+
+    restored = HangmanGame()
+    restored.load_dict(data)
+    assert restored.letters_found == {"C", "A"} and restored.wrong_letters == {"X"}
+    assert restored.letters_needed == {"I", "O", "E"}
+    assert restored.compiled.pattern == game.compiled.pattern
+    assert play(restored, "ioe") == [CORRECT, CORRECT, WIN]
+
+
+def test_old_snapshots_with_letter_lists_still_load():
+    game = HangmanGame()
+    game.start("Sole Жар", "hint", 9)
+    play(game, "SжQ")
+    data = game.to_dict()
+    assert data["letters_found"] == ["S", "Ж"] and data["wrong_letters"] == LETTER_BITS["Q"]
+    data["wrong_letters"] = ["Q"]
+
+    restored = HangmanGame()
+    restored.load_dict(data)
+    assert restored.letters_found == {"S", "Ж"} and restored.wrong_letters == {"Q"}
+    assert restored.letters_needed == {"O", "L", "E", "А", "Р"}
+
+
+def test_letter_game_claims_round_trip():
+    game = LetterGame()
+    game.active = True
+    game.letters["B"] = (2, "bob")
+    game.letters["Ñ"] = (3, "cy")
+    game.letters["A"] = (1, "ann")
+    data = game.to_dict()
+    assert data["letters"] == [["A", 1, "ann"], ["B", 2, "bob"], ["Ñ", 3, "cy"]]
+
+    restored = LetterGame()
+    restored.load_dict(data)
+    assert restored.active and restored.letters == game.letters
@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+from ranking_io import ENCODERS, chunk_entries, iter_ranking, parse_rows
+from ranking_store import JsonRankingStore, SQLiteRankingStore
+
+PLAYERS = {"10": ["Ann", 7], "11": ["Bob, jr", 7], "12": ['Cy "the" kid', 3], "13": ["Dé", 0], "14": ["Eve", 12]}
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make():
+        if request.param == "json":
+            store = JsonRankingStore(archive_dir=str(tmp_path / "archive"))
+        else:
+            store = SQLiteRankingStore(str(tmp_path / f"rank{len(stores)}.db"))
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def settle(store):
+    # Lo store sqlite bufferizza gli import: scan legge solo i batch scritti
+    if isinstance(store, SQLiteRankingStore):
+        store.flush()
+
+
+def export(store, fmt, chunk=2):
+    return "".join(ENCODERS[fmt](iter_ranking(store, "daily_ranking", chunk)))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_export_import_round_trip(make_store, fmt):
+    source = make_store()
+    source.import_entries("daily_ranking", PLAYERS, merge=False)
+    settle(source)
+    text = export(source, fmt)
+
+    target = make_store()
+    stats = {}
+    for entries in chunk_entries(parse_rows(io.StringIO(text, newline=""), stats=stats), merge=False, chunk=2):
+        target.import_entries("daily_ranking", entries, merge=False)
+    settle(target)
+    assert stats == {"rows": 5, "skipped": 0}
+    assert export(target, fmt) == text
+    for uid, (name, points) in PLAYERS.items():
+        assert target.get("daily_ranking", uid) == {"name": name, "points": points}
+
+
+def test_export_shares_ranks_between_ties(make_store):
+    store = make_store()
+    store.import_entries("daily_ranking", PLAYERS, merge=False)
+    settle(store)
+    blocks = list(iter_ranking(store, "daily_ranking", 2))
+    assert [len(block) for block in blocks] == [2, 2, 1]
+    rows = [row for block in blocks for row in block]
+    assert [(rank, uid) for rank, uid, _, _ in rows] == [(1, "14"), (2, "10"), (2, "11"), (4, "12"), (5, "13")]
+
+
+def test_merge_import_adds_points(make_store):
+    store = make_store()
+    store.import_entries("daily_ranking", {"10": ["Ann", 5]}, merge=False)
+    rows = parse_rows(["user_id,name,points", "10,Ann,2", "10,Ann B,3", "20,Zed,1"])
+    for entries in chunk_entries(rows, merge=True):
+        store.import_entries("daily_ranking", entries, merge=True)
+    assert store.get("daily_ranking", "10") == {"name": "Ann B", "points": 10}
+    assert store.get("daily_ranking", "20") == {"name": "Zed", "points": 1}
+
+
+def test_parse_rows_skips_bad_rows():
+    stats = {}
+    lines = ['{"user_id": "1", "name": "a", "points": 2}', "not json", "[1]", "",
+             '{"user_id": "x", "points": 1}', '{"user_id": 2, "points": true}', '{"user_id": 3, "points": "4"}']
+    assert list(parse_rows(lines, stats=stats)) == [("1", "a", 2), ("3", "3", 4)]
+    assert stats == {"rows": 2, "skipped": 4}
+
+
+def test_parse_rows_rejects_a_csv_without_the_columns():
+    with pytest.raises(ValueError):
+        list(parse_rows(["id,score", "1,2"]))
+    assert list(parse_rows([])) == []
+
+
+def test_chunk_entries_replace_keeps_the_last_row():
+    rows = [("1", "a", 1), ("2", "b", 2), ("1", "A", 5), ("3", "c", 3)]
+    assert list(chunk_entries(rows, merge=False, chunk=10)) == [{"1": ["A", 5], "2": ["b", 2], "3": ["c", 3]}]
+    # I blocchi si applicano in ordine: la riga ripetuta arriva dopo
+    assert list(chunk_entries(rows, merge=False, chunk=2)) == [{"1": ["a", 1], "2": ["b", 2]}, {"1": ["A", 5], "3": ["c", 3]}]
+    assert list(chunk_entries(rows, merge=True, chunk=10)) == [{"1": ["A", 6], "2": ["b", 2], "3": ["c", 3]}]
@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import ranking_store
+from ranking_store import SQLiteRankingStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteRankingStore(str(tmp_path / "rankings.db"), archive_timeout=5, archive_chunk=2)
+    yield store
+    store.close()
+
+
+def archived_rows(store):
+    return store.conn.execute("SELECT user_id, name, points FROM ranking_archive ORDER BY user_id").fetchall()
+
+
+def test_archive_waits_for_the_retired_points_then_moves_them(store):
+    store.add_many({"1": ["a", 3]})
+    store.flush()
+    store.add_many({"1": ["a", 2], "2": ["b", 4]})
+    retired = store.reset("daily_ranking")
+    assert store.get("daily_ranking", "1") is None
+
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("n", store.archive("daily_ranking", retired, "2026-10-16")))
+    thread.start()
+    time.sleep(0.2)
+    assert thread.is_alive()
+    store.flush()
+    thread.join(5)
+
+    assert result["n"] == 2
+    assert archived_rows(store) == [("1", "a", 5), ("2", "b", 4)]
+    assert store.conn.execute("SELECT COUNT(*) FROM rankings WHERE ranking = ?", (retired,)).fetchone()[0] == 0
+    assert store.get("historical_ranking", "1")["points"] == 5
+
+
+def test_archive_times_out_while_points_are_unwritten(store):
+    store.archive_timeout = 0.1
+    store.add_many({"1": ["a", 1]})
+    retired = store.reset("daily_ranking")
+    with pytest.raises(TimeoutError):
+        store.archive("daily_ranking", retired)
+
+
+def test_archive_moves_chunks_without_the_store_lock(store, monkeypatch):
+    store.add_many({str(uid): [f"p{uid}", uid] for uid in range(10, 17)})
+    store.flush()
+    retired = store.reset("daily_ranking")
+    store.flush()
+
+    lock_free = []
+    connect = sqlite3.connect
+
+    class Connection:
+        def __init__(self, *args, **kwargs):
+            self.conn = connect(*args, **kwargs)
+
+        def execute(self, query, *args):
+            if query.startswith("INSERT"):
+                # Le letture sul loop possono prendere il lock durante lo spostamento
+                acquired = store._lock.acquire(blocking=False)
+                lock_free.append(acquired)
+                if acquired:
+                    store._lock.release()
+                    store.get("daily_ranking", "10")
+            return self.conn.execute(query, *args)
+
+        def close(self):
+            self.conn.close()
+
+    monkeypatch.setattr(ranking_store.sqlite3, "connect", Connection)
+    assert store.archive("daily_ranking", retired) == 7
+    # 7 righe a blocchi di 2
+    assert lock_free == [True] * 4
+    assert [row[0] for row in archived_rows(store)] == [str(uid) for uid in range(10, 17)]
+
+
+def test_replace_import_is_not_undone_by_a_batch_already_taken(store):
+    store.add_many({"1": ["a", 10]})
+    store.flush()
+    store.add_many({"1": ["a", 5]})
+    taken = store.take_batch()
+    store.import_entries("daily_ranking", {"1": ["Ann", 100], "2": ["Bob", 7]}, merge=False)
+    assert store.get("daily_ranking", "1") == {"name": "Ann", "points": 100}
+
+    # Il batch preso prima dell'import viene scritto dopo: i punti sostituiti non tornano
+    store.write_batch(taken)
+    store.add_many({"1": ["Ann", 1]})
+    store.flush()
+    assert store.get("daily_ranking", "1") == {"name": "Ann", "points": 101}
+    assert store.get("daily_ranking", "2") == {"name": "Bob", "points": 7}
+    assert store.get("historical_ranking", "1")["points"] == 16
+    assert store.page("daily_ranking", 0, 10) == [("1", {"name": "Ann", "points": 101}), ("2", {"name": "Bob", "points": 7})]
+
+
+def test_import_is_buffered_and_merges_with_pending_points(store):
+    store.add_many({"1": ["a", 3]})
+    store.import_entries("daily_ranking", {"1": ["a", 4]}, merge=True)
+    store.import_entries("historical_ranking", {"1": ["a", 50]}, merge=False)
+    # Niente scritto finché il writer non prende il batch
+    assert store.conn.execute("SELECT COUNT(*) FROM rankings").fetchone()[0] == 0
+    assert store.get("daily_ranking", "1")["points"] == 7
+    assert store.get("historical_ranking", "1")["points"] == 50
+    store.flush()
+    assert store.get("daily_ranking", "1")["points"] == 7
+    assert store.get("historical_ranking", "1")["points"] == 50
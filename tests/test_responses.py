@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("discord")
+
+from responses import DEFAULT, TEXTS, compile_template, template_fields
+
+
+@pytest.mark.parametrize("key", sorted(TEXTS))
+def test_compiled_texts_render_like_str_format(key):
+    template = TEXTS[key][DEFAULT]
+    fields = {name: f"<{name}>" for name in template_fields(template)}
+    assert compile_template(template)(fields) == template.format_map(fields)
+
+
+@pytest.mark.parametrize("template", [
+    "",
+    "{{literal}} only",
+    "{a}",
+    "{a}{a}",
+    "x {a!r:>6} | {b:.2f}{{}} {a}",
+])
+def test_escapes_specs_and_repeated_fields(template):
+    fields = {"a": "q", "b": 1.5, "unused": 0}
+    assert compile_template(template)(fields) == template.format_map(fields)
+
+
+def test_unsafe_fields_are_refused():
+    with pytest.raises(ValueError):
+        compile_template("{user.id}")
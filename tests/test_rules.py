@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from rules import DEFAULT_RULES, RULES, GameRules, RuleBook, validate
+
+
+def test_validate_checks_types_and_limits():
+    assert validate("lives", 3) == 3
+    assert validate("turn_rule", False) is False
+    for name, value in [("lives", 0), ("lives", 100), ("lives", True), ("win_bonus", 1001),
+                        ("wrong_penalty", -1), ("points_mode", 1), ("letter_points", "2"), ("speed", 1)]:
+        with pytest.raises(ValueError):
+            validate(name, value)
+
+
+def test_game_rules_are_immutable_values():
+    rules = GameRules(lives=3)
+    assert rules.lives == 3 and rules.win_bonus == RULES["win_bonus"]
+    with pytest.raises(AttributeError):
+        rules.lives = 4
+    assert GameRules.from_dict(rules.to_dict()) == rules
+    assert GameRules.from_dict(None) is DEFAULT_RULES
+    assert rules != DEFAULT_RULES
+
+
+def test_compile_is_cached_and_defaults_are_shared():
+    book = RuleBook()
+    assert book.compile(1) is DEFAULT_RULES
+    rules = book.update(1, {"lives": 8, "turn_rule": False})
+    assert rules.lives == 8 and rules.turn_rule is False
+    assert book.compile(1) is rules
+    assert book.compile(2) is DEFAULT_RULES
+
+
+def test_update_none_restores_the_default():
+    book = RuleBook()
+    book.update(1, {"lives": 8, "win_bonus": 2})
+    assert book.update(1, {"lives": None}).to_dict() == {**RULES, "win_bonus": 2}
+    assert book.update(1, {"win_bonus": None}) is DEFAULT_RULES
+    assert book.stats()["guilds"] == 0
+
+
+def test_invalid_update_changes_nothing():
+    book = RuleBook()
+    before = book.update(1, {"lives": 8})
+    with pytest.raises(ValueError):
+        book.update(1, {"lives": 2, "word_points": -5})
+    assert book.compile(1) is before and before.lives == 8
+
+
+def test_rules_file_round_trip(tmp_path):
+    path = str(tmp_path / "rules.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"default": {"lives": 6}, "7": {"points_mode": True}}, f)
+    book = RuleBook(path)
+    assert book.compile(1).lives == 6
+    assert book.compile(7).points_mode is True and book.compile(7).lives == 6
+
+    # Un altro shard scrive sullo stesso file: le sue voci restano
+    other = RuleBook(path)
+    other.update(9, {"lives": 2})
+    book.update(7, {"points_mode": None})
+    book.update(8, {"word_points": 9})
+    reloaded = RuleBook(path)
+    assert reloaded.compile(9).lives == 2
+    assert reloaded.compile(7) == GameRules(lives=6)
+    assert reloaded.compile(8).word_points == 9
@@ -0,0 +1,52 @@
+import asyncio
+
+from send_queue import OutboundQueue
+
+
+class Channel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+def make_queue(**kwargs):
+    return OutboundQueue(lambda payloads: [str(p) for p in payloads], window=0.01, **kwargs)
+
+
+def test_channels_are_forgotten_once_idle():
+    async def scenario():
+        queue = make_queue(rate=5, per=0.1)
+        channels = [Channel(i) for i in range(50)]
+        for channel in channels:
+            queue.enqueue(channel, "hello")
+        assert queue.stats()["channels"] == 50
+        await queue.drain()
+        await asyncio.sleep(0.15)
+        return queue, channels
+
+    queue, channels = asyncio.run(scenario())
+    assert all(channel.sent == ["hello"] for channel in channels)
+    assert queue.stats()["channels"] == 0
+
+
+def test_channel_keeps_its_budget_until_refilled():
+    async def scenario():
+        queue = make_queue(rate=1, per=0.3)
+        channel = Channel(1)
+        queue.enqueue(channel, "a")
+        await queue.drain()
+        # Il bucket è vuoto: il canale resta e il messaggio successivo aspetta il budget
+        assert queue.stats()["channels"] == 1
+        bucket = queue._channels[1].bucket
+        queue.enqueue(channel, "b")
+        assert queue._channels[1].bucket is bucket
+        await queue.drain()
+        await asyncio.sleep(0.35)
+        return queue, channel
+
+    queue, channel = asyncio.run(scenario())
+    assert channel.sent == ["a", "b"]
+    assert queue.stats()["channels"] == 0
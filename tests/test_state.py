@@ -0,0 +1,89 @@
+from state import GameRegistry, LetterGame
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def registry(**kwargs):
+    clock = Clock()
+    return GameRegistry(LetterGame, clock=clock, **kwargs), clock
+
+
+def test_least_recently_used_game_goes_first_when_full():
+    games, clock = registry(max_games=3, idle_ttl=1000)
+    for key in (1, 2, 3):
+        clock.now += 1
+        games.get(key)
+    clock.now += 1
+    games.get(1)  # 1 torna il più recente
+    games.get(4)
+    assert 2 not in games and {1, 3, 4} <= set(key for key, _ in games.items())
+    assert games.evictions == 1 and len(games) == 3
+
+
+def test_idle_games_are_dropped_on_the_next_creation():
+    games, clock = registry(max_games=100, idle_ttl=10)
+    games.get(1)
+    clock.now = 5
+    games.get(2)
+    clock.now = 12
+    games.get(3)
+    assert 1 not in games and 2 in games and 3 in games
+    clock.now = 100
+    assert games.evict_idle() == 2 and len(games) == 0
+
+
+def test_peek_and_create_false_do_not_create_or_refresh():
+    games, clock = registry(max_games=2, idle_ttl=1000)
+    assert games.get(1, create=False) is None and games.peek(1) is None
+    first = games.get(1)
+    clock.now = 1
+    games.get(2)
+    assert games.peek(1) is first
+    clock.now = 2
+    games.get(3)
+    # peek non ha spostato 1 in fondo all'LRU
+    assert 1 not in games
+
+
+def test_restore_keeps_a_registered_game_and_never_evicts():
+    games, clock = registry(max_games=1, idle_ttl=1000)
+    live = games.get(1)
+    live.letters["A"] = (7, "ann")
+    saved = LetterGame()
+    assert games.restore(1, saved) is live and live.letters["A"] == (7, "ann")
+    games.restore(2, LetterGame())
+    assert len(games) == 2
+
+
+def test_channel_scope_keys():
+    games, _ = registry(per_channel=True)
+    assert games.key_for(1, 2) == (1, 2)
+    assert GameRegistry(LetterGame).key_for(1, 2) == 1
+
+
+def test_games_in_progress_are_not_evicted_to_make_room():
+    games, clock = registry(max_games=2, idle_ttl=1000)
+    running = games.get(1)
+    running.active = True
+    clock.now = 1
+    games.get(2)
+    clock.now = 2
+    games.get(3)
+    # 1 è il meno recente ma è in corso: esce 2
+    assert 1 in games and 2 not in games and 3 in games
+
+    games.get(3).active = True
+    clock.now = 3
+    games.get(4)
+    assert len(games) == 3 and games.peek(1) is running
+
+    # Una partita in corso ferma da più di idle_ttl scade comunque
+    clock.now = 1001
+    games.get(5)
+    assert 1 not in games and 3 in games
@@ -0,0 +1,297 @@
+"""Word bank for unattended rounds: a precompiled, memory-mapped puzzle index.
+
+The source is a UTF-8 text file with one puzzle per line::
+
+    secret<TAB>hint<TAB>language
+
+(hint and language are optional; blank lines and ``#`` comments are
+skipped). ``compile_bank`` turns it into an index file once::
+
+    header    magic, version, entry count, table offsets, source size/mtime
+    records   "secret\\thint" in UTF-8, grouped by bucket
+    offsets   little-endian uint64 start of every record (+ end sentinel)
+    buckets   JSON [[language, letters, words, difficulty, first, count], ...]
+
+Opening the index maps the file and parses only the header and the bucket
+table (one row per distinct key, not per puzzle). Drawing a puzzle picks a
+random position among the matching buckets (a bisect over the buckets) and
+reads two offsets and one record, so neither startup nor a draw depends on
+the size of the bank.
+
+    python word_bank.py compile phrases.tsv [phrases.idx]
+    python word_bank.py info phrases.idx
+"""
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from bisect import bisect_right
+from collections import deque
+
+from guess_engine import normalize_text
+
+MAGIC = b"HANGBANK"
+VERSION = 1
+# magic, version, entries, offsets_at, buckets_at, buckets_size, source_size, source_mtime_ns
+HEADER = struct.Struct("<8sIQQQQQQ")
+OFFSET = struct.Struct("<Q")
+OFFSET_PAIR = struct.Struct("<QQ")
+# Estrazioni al massimo per evitare un enigma recente
+MAX_TRIES = 32
+
+DIFFICULTIES = ("easy", "medium", "hard")
+# Le lettere più frequenti in italiano, inglese e spagnolo: le altre rendono la frase più difficile
+COMMON_LETTERS = frozenset("EAIONRTLSCDU")
+
+
+def difficulty(secret):
+    """``"easy"`` / ``"medium"`` / ``"hard"`` from the secret's set of distinct letters."""
+    return DIFFICULTIES[_level(normalize_text(secret))]
+
+
+def _level(normalized):
+    letters = {c for c in set(normalized) if c.isalpha()}
+    score = len(letters) + 2 * len(letters - COMMON_LETTERS)
+    if score <= 10:
+        return 0
+    if score <= 16:
+        return 1
+    return 2
+
+
+def puzzle_key(secret, language):
+    # ASCII: niente accenti da togliere, si salta la normalizzazione Unicode
+    normalized = secret.upper() if secret.isascii() else normalize_text(secret)
+    return (
+        language,
+        sum(map(str.isalpha, normalized)),
+        len(normalized.split()),
+        _level(normalized),
+    )
+
+
+def parse_line(line, default_language=""):
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    secret, _, rest = line.partition("\t")
+    hint, _, language = rest.partition("\t")
+    secret = " ".join(secret.split())
+    if not secret:
+        return None
+    return secret, hint.strip(), (language.strip() or default_language).lower()
+
+
+def compile_bank(source, index, default_language=""):
+    """Build ``index`` from the text file ``source``; returns the number of puzzles."""
+    buckets = {}
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            puzzle = parse_line(line, default_language)
+            if puzzle is None:
+                continue
+            secret, hint, language = puzzle
+            key = puzzle_key(secret, language)
+            if not key[1]:
+                # Nessuna lettera da indovinare
+                continue
+            buckets.setdefault(key, []).append(f"{secret}\t{hint}".encode("utf-8"))
+
+    stat = os.stat(source)
+    table = []
+    offsets = bytearray()
+    count = 0
+    tmp_path = f"{index}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        position = HEADER.size
+        for key in sorted(buckets):
+            records = buckets[key]
+            table.append(list(key) + [count, len(records)])
+            for record in records:
+                offsets += OFFSET.pack(position)
+                f.write(record)
+                position += len(record)
+            count += len(records)
+        offsets += OFFSET.pack(position)
+        offsets_at = position
+        f.write(offsets)
+        buckets_at = offsets_at + len(offsets)
+        payload = json.dumps(table, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        f.write(payload)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, count, offsets_at, buckets_at, len(payload), stat.st_size, stat.st_mtime_ns))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index)
+    return count
+
+
+class RecentWindow:
+    """The last puzzles drawn by a game, for O(1) "seen recently?" checks."""
+
+    __slots__ = ("order", "members")
+
+    def __init__(self, entries=()):
+        self.order = deque(entries)
+        self.members = set(self.order)
+
+    def add(self, entry, window=None):
+        self.order.append(entry)
+        self.members.add(entry)
+        if window is not None:
+            while len(self.order) > window:
+                self.members.discard(self.order.popleft())
+
+    def __contains__(self, entry):
+        return entry in self.members
+
+    def __len__(self):
+        return len(self.order)
+
+    def to_list(self):
+        return list(self.order)
+
+
+class WordBank:
+    """Read-only view of a compiled index (see the module docstring)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.entries, self._offsets_at, buckets_at, buckets_size, self.source_size, self.source_mtime_ns = (
+            HEADER.unpack_from(self._map, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a word bank index (version {VERSION})")
+        self.buckets = [tuple(row) for row in json.loads(self._map[buckets_at:buckets_at + buckets_size])]
+        self._selections = {}
+
+        self.draws = 0
+        self.rejections = 0
+
+    @classmethod
+    def load(cls, source, index=None, default_language=""):
+        """Open ``index`` (default ``source + ".idx"``), compiling it first if missing or older than ``source``."""
+        index = index or f"{source}.idx"
+        bank = None
+        if os.path.exists(index):
+            bank = cls(index)
+            if os.path.exists(source):
+                stat = os.stat(source)
+                if (stat.st_size, stat.st_mtime_ns) != (bank.source_size, bank.source_mtime_ns):
+                    bank.close()
+                    bank = None
+        if bank is None:
+            count = compile_bank(source, index, default_language)
+            print(f"📚 Compiled {count} puzzles from {source} into {index}")
+            bank = cls(index)
+        return bank
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self.entries
+
+    def entry(self, index):
+        """``(secret, hint)`` of puzzle ``index``."""
+        start, end = OFFSET_PAIR.unpack_from(self._map, self._offsets_at + index * OFFSET.size)
+        secret, _, hint = self._map[start:end].decode("utf-8").partition("\t")
+        return secret, hint
+
+    def select(self, language=None, difficulty=None, words=None, min_letters=None, max_letters=None):
+        """Cumulative counts of the buckets matching a query; cached per query."""
+        query = (language, difficulty, words, min_letters, max_letters)
+        selection = self._selections.get(query)
+        if selection is not None:
+            return selection
+        level = DIFFICULTIES.index(difficulty) if difficulty is not None else None
+        firsts = []
+        ends = []
+        total = 0
+        for bucket_language, letters, bucket_words, bucket_level, first, count in self.buckets:
+            if language is not None and bucket_language != language:
+                continue
+            if level is not None and bucket_level != level:
+                continue
+            if words is not None and bucket_words != words:
+                continue
+            if min_letters is not None and letters < min_letters:
+                continue
+            if max_letters is not None and letters > max_letters:
+                continue
+            total += count
+            firsts.append(first)
+            ends.append(total)
+        selection = self._selections[query] = (firsts, ends)
+        return selection
+
+    def draw(self, recent=(), rng=random, **query):
+        """Random puzzle index matching ``query`` and not in ``recent``, or None if nothing matches.
+
+        Recent puzzles are skipped by redrawing; if almost every match is
+        recent, a recent one is returned after a bounded number of tries
+        instead of failing.
+        """
+        firsts, ends = self.select(**query)
+        if not ends:
+            return None
+        total = ends[-1]
+        self.draws += 1
+        for _ in range(MAX_TRIES):
+            position = rng.randrange(total)
+            bucket = bisect_right(ends, position)
+            index = firsts[bucket] + position - (ends[bucket - 1] if bucket else 0)
+            if index not in recent:
+                return index
+            self.rejections += 1
+        return index
+
+    def stats(self):
+        return {
+            "entries": self.entries,
+            "buckets": len(self.buckets),
+            "draws": self.draws,
+            "rejections": self.rejections,
+            "cached_queries": len(self._selections),
+        }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile or inspect a hangman word bank")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compile_cmd = sub.add_parser("compile")
+    compile_cmd.add_argument("source")
+    compile_cmd.add_argument("index", nargs="?")
+    compile_cmd.add_argument("--language", default="", help="language of lines without one")
+    info_cmd = sub.add_parser("info")
+    info_cmd.add_argument("index")
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        index = args.index or f"{args.source}.idx"
+        count = compile_bank(args.source, index, args.language)
+        print(f"📚 {count} puzzles -> {index} ({os.path.getsize(index)} bytes)")
+        return 0
+
+    bank = WordBank(args.index)
+    summary = {}
+    for language, _, _, level, _, count in bank.buckets:
+        entry = summary.setdefault(language or "-", {name: 0 for name in DIFFICULTIES})
+        entry[DIFFICULTIES[level]] += count
+    print(f"{len(bank)} puzzles in {len(bank.buckets)} buckets")
+    for language, counts in sorted(summary.items()):
+        print(f"  {language:6} " + "  ".join(f"{name} {count}" for name, count in counts.items()))
+    bank.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())